@@ -0,0 +1,131 @@
+import multiprocessing as mp
+
+from functools import partial
+
+def score_transcript(score_fn, transcript):
+    """
+    Score one transcript and prepend its utterance ID to the scores
+
+    Parameters
+    ----------
+    score_fn : function
+        Function that takes the text of a transcript and returns its scores
+        as a list
+    transcript : tuple
+        (utt_id, text) of the transcript to be scored
+
+    Returns
+    -------
+    scores : list
+        Utterance ID followed by the scores of the transcript
+    """
+    utt_id,text = transcript
+
+    scores = score_fn(text)
+    scores.insert(0, utt_id)
+
+    return scores
+
+def iter_scores(transcripts, score_fn, workers = 1, chunksize = 1):
+    """
+    Score a set of transcripts, keeping the order of the transcripts
+
+    Parameters
+    ----------
+    transcripts : iterable of tuples
+        (utt_id, text) of each transcript to be scored
+    score_fn : function
+        Function that takes the text of a transcript and returns its scores
+        as a list
+    workers : int
+        Number of worker processes. Default is 1
+    chunksize : int
+        Number of transcripts sent to a worker at a time. Default is 1
+
+    Yields
+    ------
+    scores : list
+        Utterance ID followed by the scores of each transcript
+    """
+    score_entry = partial(score_transcript, score_fn)
+
+    if workers > 1:
+        # Each worker is a fresh process, which loads the models and word
+        # lists once when it imports the scoring module
+        with mp.get_context("spawn").Pool(processes=workers) as pool:
+            yield from pool.imap(score_entry, transcripts, chunksize)
+    else:
+        for transcript in transcripts:
+            yield score_entry(transcript)
+
+def write_scores(
+    transcripts,
+    score_fn,
+    score_writer,
+    workers = 1,
+    chunksize = 1,
+    cache = None
+):
+    """
+    Score a set of transcripts and write one row per transcript. Rows are
+    always written in the order of the transcripts, so the output is the same
+    whatever the number of workers.
+
+    Parameters
+    ----------
+    transcripts : iterable of tuples
+        (utt_id, text) of each transcript to be scored
+    score_fn : function
+        Function that takes the text of a transcript and returns its scores
+        as a list. For parallel scoring, this must be defined at the top level
+        of a module (or be a functools.partial of one) so that it can be sent
+        to the worker processes.
+    score_writer : class '_csv.writer'
+        Tells where to save the scores for each transcript
+    workers : int
+        Number of worker processes. Default is 1, which scores the
+        transcripts one at a time in the current process.
+    chunksize : int
+        Number of transcripts sent to a worker at a time. Default is 1
+    cache : score_cache.ScoreCache
+        Store of previously computed scores. Only transcripts missing from
+        the cache are scored, and their scores are added to it. Default is
+        None, which means all transcripts are scored. The cache is flushed
+        and its hit and miss counts are printed once all the rows are
+        written.
+
+    Returns
+    -------
+    None
+    """
+    if cache is None:
+        for scores in iter_scores(transcripts, score_fn, workers, chunksize):
+            score_writer.writerow(scores)
+    else:
+        transcripts = list(transcripts)
+        cached_scores = [cache.get(text) for _,text in transcripts]
+        missing = [
+            transcript
+            for transcript, scores in zip(transcripts, cached_scores)
+            if scores is None
+        ]
+        print(
+            f"Found {len(transcripts) - len(missing)} of "
+            f"{len(transcripts)} transcripts in the cache."
+        )
+
+        new_scores = iter_scores(missing, score_fn, workers, chunksize)
+        for (utt_id,text), scores in zip(transcripts, cached_scores):
+            if scores is None:
+                scores = next(new_scores)
+                cache.put(text, scores[1:])
+            else:
+                scores.insert(0, utt_id)
+
+            score_writer.writerow(scores)
+
+        cache.flush()
+        stats = cache.get_stats()
+        print(
+            f"Score cache: {stats['hits']} hits, {stats['misses']} misses."
+        )
@@ -0,0 +1,93 @@
+import argparse
+import subprocess
+import sys
+
+from os.path import abspath, dirname
+from statistics import median
+
+local_dir = dirname(abspath(__file__))
+
+sample_text = (
+    "The quick brown fox jumps over the lazy dog. It was not the first time "
+    "that the fox had done this, and the dog did not seem to mind at all. "
+) * 20
+
+# Statements timed in a fresh interpreter, from the start of the import to
+# the end of the first call
+benchmarks = dict({
+    'import compute_readability': "import compute_readability",
+    'import content_features': "import content_features",
+    'import generate_text_statistics': "import generate_text_statistics",
+    'truncate a text': (
+        "from compute_readability import limit_text_by_word_count\n"
+        "limit_text_by_word_count(sample_text, count_limit = 100)"
+    ),
+    'compute FRE': (
+        "import compute_readability as cr\n"
+        "cr.flesch_reading_ease(sample_text)"
+    )
+})
+
+timer_code = """
+import sys
+import time
+
+sys.path.insert(0, {local_dir!r})
+sample_text = {sample_text!r}
+
+start = time.perf_counter()
+{statement}
+print(time.perf_counter() - start)
+"""
+
+def time_statement(statement, repeat = 5):
+    """
+    Time a statement in fresh interpreters, so that nothing is imported or
+    loaded beforehand
+
+    Parameters
+    ----------
+    statement : string
+        Python code to be timed
+    repeat : int
+        Number of interpreters started. Default is 5
+
+    Returns
+    -------
+    elapsed : float
+        Median time taken by the statement, in seconds, or None if it failed
+    error : string
+        Last line of the error message if the statement failed, else None
+    """
+    timings = []
+    code = timer_code.format(
+        local_dir=local_dir, sample_text=sample_text, statement=statement
+    )
+
+    for _ in range(repeat):
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            error_lines = result.stderr.strip().splitlines()
+            return None, error_lines[-1] if error_lines else "failed"
+        timings.append(float(result.stdout.strip().splitlines()[-1]))
+
+    return median(timings), None
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure the start-up time of the scoring modules"
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for name, statement in benchmarks.items():
+        elapsed, error = time_statement(statement, args.repeat)
+        if error:
+            print(f"{name:<36} failed: {error}")
+        else:
+            print(f"{name:<36} {elapsed:8.3f} s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+import argparse
+import csv
+import numpy as np
+import recognizers as rc
+import speech_recognition as sr
+import time
+import transcribe_speech as tsp
+
+from concurrent.futures import ThreadPoolExecutor
+
+def benchmark_backend(backend, items, concurrency = 1, batch_size = None):
+    """
+    Measure the throughput and latency of a recognition backend, driven the
+    way transcribe_speech.transcribe_from_list drives it
+
+    Parameters
+    ----------
+    backend : string or recognizers.RecognizerBackend
+        Backend to be measured, or its name in recognizers.backends
+    items : list of tuples
+        (utt_id, speech_data) of each utterance or chunk to be recognized, see
+        load_speech_data
+    concurrency : int
+        Number of requests to the backend at a time. Default is 1
+    batch_size : int
+        Number of items per request. Default is None, which means the
+        batch_size of the backend
+
+    Returns
+    -------
+    summary : dict
+        Throughput of the backend, and latency of its requests, in seconds
+    hypotheses : list of strings
+        Hypothesis of each item, None if it couldn't be recognized
+    """
+    backend = rc.get_backend(backend)
+    batch_size = batch_size or backend.batch_size
+
+    audio_seconds = sum(
+        len(speech_data.frame_data)
+        / (speech_data.sample_width * speech_data.sample_rate)
+        for _,speech_data in items
+    )
+    batches = [
+        [speech_data for _,speech_data in items[start:start + batch_size]]
+        for start in range(0, len(items), batch_size)
+    ]
+
+    def recognize_batch(batch):
+        batch_start = time.perf_counter()
+        hypotheses = backend.recognize_batch(batch)
+
+        return hypotheses, time.perf_counter() - batch_start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(recognize_batch, batches))
+    elapsed = time.perf_counter() - start
+
+    hypotheses = [
+        hypothesis for batch_hypotheses,_ in results
+        for hypothesis in batch_hypotheses
+    ]
+    latencies = np.array([latency for _,latency in results])
+
+    summary = dict({
+        'backend': type(backend).__name__,
+        'items': len(items),
+        'requests': len(batches),
+        'unrecognized': hypotheses.count(None),
+        'audio_seconds': audio_seconds,
+        'seconds': elapsed,
+        'items_per_second': len(items) / elapsed,
+        'real_time_factor': elapsed / audio_seconds,
+        'mean_latency': float(np.mean(latencies)),
+        'p50_latency': float(np.percentile(latencies, 50)),
+        'p95_latency': float(np.percentile(latencies, 95))
+    })
+
+    return summary, hypotheses
+
+def load_speech_data(wav_scp_file, split = True):
+    """
+    Load the utterances of a list in the format of Kaldi's wav.scp, as they
+    are given to the recognizer by transcribe_speech
+
+    Parameters
+    ----------
+    wav_scp_file : string
+        Path of the list, with <utterance_ID> <utterance_location> per line
+    split : bool
+        Whether the utterances are split into speech chunks. Default is True
+
+    Returns
+    -------
+    items : list of tuples
+        (utt_id, speech_data) of each utterance, or of each chunk
+    """
+    items = []
+
+    with open(wav_scp_file, mode = 'r') as wav_in_f:
+        for entry in wav_in_f:
+            utt_id,utt_loc = entry.strip().split(" ", maxsplit=1)
+
+            if split:
+                items.extend(
+                    (chunk_id, tsp.get_audio_data(chunk))
+                    for chunk_id, chunk in tsp.split_utterance(utt_id, utt_loc)
+                )
+            else:
+                with sr.AudioFile(utt_loc) as source:
+                    items.append((utt_id, sr.Recognizer().record(source)))
+
+    return items
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure the throughput and latency of speech recognition "
+                    "backends"
+    )
+    parser.add_argument(
+        "wav_scp_file",
+        help="list of utterances, with <utterance_ID> <utterance_location> "
+             "per line"
+    )
+    parser.add_argument(
+        "--backends", nargs="+", default=["fake"],
+        choices=sorted(rc.backends)
+    )
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument(
+        "--no-split", action="store_true",
+        help="recognize whole utterances instead of speech chunks"
+    )
+    parser.add_argument(
+        "--fake-latency", type=float, default=0.0,
+        help="time taken by the fake backend per item, in seconds"
+    )
+    parser.add_argument("--output", default=None, help="CSV file of results")
+    args = parser.parse_args()
+
+    items = load_speech_data(args.wav_scp_file, split=not args.no_split)
+    print(f"Loaded {len(items)} items from {args.wav_scp_file}.")
+
+    summaries = []
+    for name in args.backends:
+        options = dict()
+        if name == "fake":
+            options['latency'] = args.fake_latency
+
+        summary, _ = benchmark_backend(
+            rc.get_backend(name, **options), items, args.concurrency,
+            args.batch_size
+        )
+        summary['backend'] = name
+        summaries.append(summary)
+
+        print(
+            f"{name:>6}: {summary['items_per_second']:.2f} items/s, "
+            f"real-time factor {summary['real_time_factor']:.3f}, "
+            f"latency mean {summary['mean_latency']:.3f} s, "
+            f"p50 {summary['p50_latency']:.3f} s, "
+            f"p95 {summary['p95_latency']:.3f} s, "
+            f"{summary['unrecognized']} unrecognized"
+        )
+
+    if args.output:
+        with open(args.output, mode = 'w', newline = '') as summary_f:
+            summary_writer = csv.DictWriter(summary_f, fieldnames=summaries[0])
+            summary_writer.writeheader()
+            summary_writer.writerows(summaries)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+import content_features as cf
+import csv
+import numpy as np
+import textstat as ts
+import time
+
+from os import makedirs
+from os.path import join
+
+def compare_backends(transcripts, backends, reference = "trf"):
+    """
+    Compute the idea unit length of a set of transcripts with several parser
+    backends, and measure how far each backend is from a reference one
+
+    Parameters
+    ----------
+    transcripts : iterable of tuples
+        (utt_id, text) of each transcript
+    backends : list of strings
+        Parser backends to be compared, see content_features.get_parser
+    reference : string
+        Backend the others are compared with. Default is "trf", the most
+        accurate one
+
+    Returns
+    -------
+    lengths : dict
+        Maps each backend to the idea unit length of each transcript, in the
+        same order as utt_ids
+    utt_ids : list of strings
+        Utterance IDs of the transcripts
+    summary : list of dicts
+        Agreement with the reference and speed of each backend
+    """
+    transcripts = list(transcripts)
+    utt_ids = [utt_id for utt_id,_ in transcripts]
+    word_count = sum(ts.lexicon_count(text) for _,text in transcripts)
+
+    if reference not in backends:
+        backends = [reference] + list(backends)
+
+    lengths = dict()
+    elapsed = dict()
+    for backend in backends:
+        # Load the pipeline first, so that only parsing is timed
+        cf.get_parser(backend)
+
+        start = time.perf_counter()
+        lengths[backend] = np.array([
+            cf.compute_idea_unit_length(text, parser=backend)
+            for _,text in transcripts
+        ])
+        elapsed[backend] = time.perf_counter() - start
+
+    summary = []
+    ref_lengths = lengths[reference]
+    for backend in backends:
+        diffs = np.abs(lengths[backend] - ref_lengths)
+
+        if len(transcripts) > 1 and np.std(lengths[backend]) > 0 and \
+                np.std(ref_lengths) > 0:
+            correlation = np.corrcoef(lengths[backend], ref_lengths)[0, 1]
+        else:
+            correlation = np.nan
+
+        summary.append(dict({
+            'backend': backend,
+            'model': cf.parser_backends.get(backend, backend),
+            'exact_match': float(np.mean(diffs == 0)),
+            'mean_abs_diff': float(np.mean(diffs)),
+            'max_abs_diff': float(np.max(diffs)),
+            'pearson_r': float(correlation),
+            'seconds': elapsed[backend],
+            'words_per_second': word_count / elapsed[backend],
+            'speedup': elapsed[reference] / elapsed[backend]
+        }))
+
+    return lengths, utt_ids, summary
+
+def run_voa_example():
+    """
+    Compare the parser backends on the VOA Learning English transcripts
+    """
+    data_name = "voa"
+    backends = ["trf", "md", "sm"]
+    reference = "trf"
+
+    main_dir = join("data", data_name)
+    texts_dir = join(main_dir, "processed/transcripts")
+    results_dir = join(main_dir, "results/parser_backends")
+    makedirs(results_dir, exist_ok = True)
+
+    lengths, utt_ids, summary = compare_backends(
+        cf.get_transcripts_from_dir(texts_dir), backends, reference
+    )
+
+    lengths_path = join(results_dir, f"idea_unit_length_{data_name}.csv")
+    with open(lengths_path, mode = 'w', newline = '') as lengths_f:
+        lengths_writer = csv.writer(lengths_f)
+        lengths_writer.writerow(["id"] + list(lengths.keys()))
+        for index, utt_id in enumerate(utt_ids):
+            lengths_writer.writerow(
+                [utt_id] + [lengths[backend][index] for backend in lengths]
+            )
+
+    summary_path = join(results_dir, f"agreement_{data_name}.csv")
+    with open(summary_path, mode = 'w', newline = '') as summary_f:
+        summary_writer = csv.DictWriter(summary_f, fieldnames=summary[0])
+        summary_writer.writeheader()
+        summary_writer.writerows(summary)
+
+    print(f"Agreement with {reference} on {len(utt_ids)} transcripts")
+    for entry in summary:
+        print(
+            f"{entry['backend']:>4}: exact {entry['exact_match']:.1%}, "
+            f"mean abs diff {entry['mean_abs_diff']:.3f}, "
+            f"r {entry['pearson_r']:.3f}, "
+            f"{entry['words_per_second']:.0f} words/s "
+            f"({entry['speedup']:.1f}x)"
+        )
+    print("DONE. Results saved in %s." % results_dir)
+
+def main():
+    run_voa_example()
+
+if __name__ == "__main__":
+    main()
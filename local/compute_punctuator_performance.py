@@ -1,15 +1,13 @@
 import csv
 import numpy as np
+import punctuation_store as ps
 import re
 import textstat as ts
 
 from os import listdir, makedirs
 from os.path import isfile, join, splitext
-from punctuator import Punctuator
 from sklearn.metrics import f1_score
 
-p = Punctuator('Demo-Europarl-EN.pcl')
-
 punctuation_map = dict({'all': ["period","qmark","comma","average"],
                         '.': ["period"],
                         '?': ["qmark"],
@@ -19,7 +17,12 @@ system_map = dict({'actual': 'actual',
                    'gws': 'google-web-speech',
                    'ka5': 'kaldi-aspire-s5'})
 
-def compute_f1_from_dir(true_dir, f1_scores_file, punctuation = "all"):
+def compute_f1_from_dir(
+    true_dir,
+    f1_scores_file,
+    punctuation = "all",
+    store_path = None
+):
     """
     Compute the F1 score of the punctuator based on all the text files in the
     specified directory. Returns a score per file, and the scores are saved in
@@ -35,6 +38,10 @@ def compute_f1_from_dir(true_dir, f1_scores_file, punctuation = "all"):
     punctuation    : string
                      Punctuation that will be used for the calculation of the F1
                      score
+    store_path     : string
+                     Location of the store of punctuated texts, see
+                     punctuation_store.punctuate_texts. Default is None, which
+                     means every text is punctuated again
 
     Returns
     -------
@@ -57,7 +64,7 @@ def compute_f1_from_dir(true_dir, f1_scores_file, punctuation = "all"):
                 true_text = true_in_f.read().lower()
 
             pred_text = ts.remove_punctuation(true_text)
-            pred_text = p.punctuate(pred_text)
+            pred_text = ps.punctuate(pred_text, store_path = store_path)
 
             text_f1_score = compute_f1_from_text(true_text,
                                                  pred_text,
@@ -154,13 +161,13 @@ def get_output_labels(tokens, punctuation):
 
     return labels
 
-def punctuate_text(text):
+def punctuate_text(text, store_path = None):
     text = ts.remove_punctuation(text)
-    text = p.punctuate(text)
+    text = ps.punctuate(text, store_path = store_path)
 
     return text
 
-def punctuate_texts_in_dir(texts_dir, out_dir):
+def punctuate_texts_in_dir(texts_dir, out_dir, store_path = None):
     makedirs(out_dir, exist_ok = True)
 
     for entry in sorted(listdir(texts_dir)):
@@ -173,26 +180,34 @@ def punctuate_texts_in_dir(texts_dir, out_dir):
             with open(text_path, mode = 'r') as text_f:
                 text = text_f.read()
 
-            out_text = punctuate_text(text)
+            out_text = punctuate_text(text, store_path = store_path)
             with open(out_path, mode = 'w') as out_f:
                 out_f.write(out_text)
 
-def punctuate_texts_in_list(texts_path, out_dir):
+def punctuate_texts_in_list(texts_path, out_dir, store_path = None):
     makedirs(out_dir, exist_ok = True)
 
+    utt_ids = list()
+    texts = list()
+
     with open(texts_path, 'r') as texts_f:
         for entry in texts_f:
             utt_id,text = entry.strip().split(" ", maxsplit=1)
-            print("Processing %s" % utt_id)
+            utt_ids.append(utt_id)
+            texts.append(ts.remove_punctuation(text))
 
-            out_text = punctuate_text(text)
+    # Punctuate the whole list at once, so repeated transcripts are only
+    # punctuated once, and with a store the new outputs are saved together
+    print("Punctuating %d texts" % len(texts))
+    out_texts = ps.punctuate_texts(texts, store_path = store_path)
 
-            if not utt_id.endswith(".txt"):
-                utt_id = utt_id + ".txt"
-            out_path = join(out_dir, utt_id)
+    for utt_id, out_text in zip(utt_ids, out_texts):
+        if not utt_id.endswith(".txt"):
+            utt_id = utt_id + ".txt"
+        out_path = join(out_dir, utt_id)
 
-            with open(out_path, mode = 'w') as out_f:
-                out_f.write(out_text)
+        with open(out_path, mode = 'w') as out_f:
+            out_f.write(out_text)
 
 def run_demo():
     """
@@ -205,9 +220,10 @@ def run_demo():
     # will be the input to the ASR system
     hyps_dir = join("data", score_type, "hyps")
     puncd_dir = join("data", score_type, "hyps_punctuator")
+    store_path = join("data", "cache", "punctuator.sqlite")
     makedirs(puncd_dir, exist_ok = True)
 
-    punctuate_texts_in_dir(hyps_dir, puncd_dir)
+    punctuate_texts_in_dir(hyps_dir, puncd_dir, store_path = store_path)
 
 def main():
     run_demo()
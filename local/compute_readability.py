@@ -1,26 +1,21 @@
+import batch_scoring as bs
 import csv
+import lexicons as lex
+import models as md
 import numpy as np
-import pandas as pd
+import punctuation_store as ps
 import re
-import spacy
+import score_cache as sc
 import string
+import syllables as sl
 import textstat as ts
 
-from cainesap_syllabify import syllable3
-from nltk import pos_tag
-from nltk.stem import WordNetLemmatizer
-from nltk.tokenize import sent_tokenize, word_tokenize
+from functools import cached_property, partial
 from os import listdir, makedirs
 from os.path import isfile, join, splitext
-from punctuator import Punctuator
 
-lemmatizer = WordNetLemmatizer()
-nlp = spacy.load('en_core_web_sm')
-p = Punctuator('Demo-Europarl-EN.pcl')
-
-wordlists_dir = "local/resources/wordlists"
-dale_list_path = join(wordlists_dir, "dale-chall-detailed.csv")
-dale_df = pd.read_csv(dale_list_path, header=0)
+# Models and word lists are loaded on first use, see models and lexicons
+spacy_model = 'en_core_web_sm'
 
 system_map = dict({
     'actual': 'actual',
@@ -28,11 +23,143 @@ system_map = dict({
     'ka5': 'kaldi-aspire-s5'
 })
 
+class TextDocument:
+    """
+    Parsed version of a transcript that is shared by all the readability
+    formulas. Each text statistic is computed on first use and then kept, so
+    a transcript is tokenized, tagged and syllabified only once no matter how
+    many formulas are applied to it.
+
+    Samples taken from the transcript are also kept as TextDocument objects,
+    which lets the different formulas reuse the statistics of a sample.
+
+    Parameters
+    ----------
+    text : string
+        Transcript to be processed
+    parent : TextDocument
+        Document where the text was taken from, if the text is a sample.
+        Samples reuse the named entities found in their parent document.
+
+    """
+
+    def __init__(self, text, parent=None):
+        self.text = text
+        self.parent = parent
+        self._samples = dict()
+
+    @cached_property
+    def dale_count(self):
+        # Number of words found in the Dale-Chall list of familiar words
+        return float(sum(self.dale_flags))
+
+    @cached_property
+    def dale_flags(self):
+        # Dale-Chall list membership of each tagged token
+        entity_labels = self.entity_labels
+        return [
+            bool(
+                word and
+                (word not in string.punctuation) and
+                is_in_dale_list(word, word_pos, entity_labels)
+            )
+            for word, word_pos in self.tagged_tokens
+        ]
+
+    @cached_property
+    def entity_labels(self):
+        # Named entities, found in one pass over the whole transcript
+        if self.parent is not None:
+            return self.parent.entity_labels
+        return md.get_entity_labels(get_nlp(), self.nltk_sentences)
+
+    @cached_property
+    def nltk_sentences(self):
+        # Sentences as split by NLTK, used for tagging and NER
+        return md.get_sent_tokenizer()(self.text)
+
+    @cached_property
+    def sent_count(self):
+        return ts.sentence_count(self.text)
+
+    @cached_property
+    def sentence_starts(self):
+        # Index of the starting word of each sentence
+        sentence_lengths = [
+            ts.lexicon_count(sentence) for sentence in self.sentences
+        ]
+        return np.insert(np.cumsum(sentence_lengths), 0, 0)
+
+    @cached_property
+    def sentences(self):
+        # Sentences used for getting samples from long texts
+        return re.findall(r'\b[^.!?]+[.!?]*', self.text, re.UNICODE)
+
+    @cached_property
+    def syll_count(self):
+        return sum(self.syllable_counts)
+
+    @cached_property
+    def syllable_counts(self):
+        # Number of syllables of each token
+        return [sl.count_word_syllables(word) for word in self.tokens]
+
+    @cached_property
+    def tagged_tokens(self):
+        # Words and POS tags, following the sentence split of NLTK
+        pos_tag = md.get_pos_tagger()
+        word_tokenize = md.get_word_tokenizer()
+        return [
+            (word, word_pos)
+            for sentence in self.nltk_sentences
+            for word, word_pos in pos_tag(word_tokenize(sentence))
+        ]
+
+    @cached_property
+    def tokens(self):
+        # Words of the text without punctuations
+        return remove_punctuation(self.text).split()
+
+    @cached_property
+    def word_count(self):
+        return ts.lexicon_count(self.text)
+
+    def get_sample(self, index_start, index_end):
+        """
+        Get a sample composed of consecutive sentences of the text
+
+        Parameters
+        ----------
+        index_start : integer
+            Index of the first sentence of the sample
+        index_end : integer
+            Index after the last sentence of the sample. If this goes beyond
+            the number of sentences, the sample extends up to the end of the
+            text.
+
+        Returns
+        -------
+        sample : TextDocument
+            Parsed version of the sample
+        """
+        sample_key = (index_start, index_end)
+
+        if sample_key not in self._samples:
+            if index_end > len(self.sentences):
+                sample = " ".join(self.sentences[index_start:])
+            else:
+                sample = " ".join(self.sentences[index_start:index_end])
+
+            self._samples[sample_key] = TextDocument(sample, parent=self)
+
+        return self._samples[sample_key]
+
 def average_sentence_length(text):
     ave_length = 0.0
+    doc = get_text_document(text)
 
-    sent_count = ts.sentence_count(text)
-    word_count = ts.lexicon_count(text)
+    sent_count = doc.sent_count
+    word_count = doc.word_count
 
     ave_length = word_count / sent_count
 
@@ -40,14 +167,41 @@ def average_sentence_length(text):
 
 def average_word_length(text):
     ave_length = 0.0
+    doc = get_text_document(text)
 
-    syll_count = count_syllables_cainesap(text)
-    word_count = ts.lexicon_count(text)
+    syll_count = doc.syll_count
+    word_count = doc.word_count
 
     ave_length = syll_count / word_count
 
     return ave_length
 
+def compare_entity_labels(text):
+    """
+    Compare the proper noun decisions made with the batched NER pass against
+    the ones made by running NER on each proper noun by itself, see
+    models.compare_entity_labels
+
+    Parameters
+    ----------
+    text : string or TextDocument
+        Transcript to be processed
+
+    Returns
+    -------
+    divergences : list of tuples
+        (word, word_label, batch_label) for each proper noun where only one
+        of the two approaches finds a PERSON or GPE entity. A label is None
+        if no entity was found.
+    """
+    doc = get_text_document(text)
+
+    divergences = md.compare_entity_labels(
+        get_nlp(), doc.tagged_tokens, doc.entity_labels
+    )
+
+    return divergences
+
 def compute_dcr(text, words_in_sample = 100, sample_count = 3):
     """
     This function computes the Dale-Chall Readability (DCR) score based from 
@@ -56,7 +210,7 @@ def compute_dcr(text, words_in_sample = 100, sample_count = 3):
 
     Parameters
     ----------
-    text : string
+    text : string or TextDocument
         Transcript to be processed
     words_in_sample : integer
         Number of words for each sample from the text, default is 100 words
@@ -71,69 +225,14 @@ def compute_dcr(text, words_in_sample = 100, sample_count = 3):
         samples
 
     """
-    score = 0.0
-    text_length = ts.lexicon_count(text)
-    # Dale-Chall suggests the following for getting samples from long texts
-    # * About four 100-word samples per 2,000 words.
-    # * For passages of about 200 to 300 words, analyse the entire passage
-    # From this, we made the following assumptions
-    # * long texts = word counts > 300
-    # * lower limit of 3 samples for long texts
-    # * beginnings of a paragraph may not always be available (e.g., transcript
-    # generated by an ASR)
-    # * samples are not exactly composed of 100 words (considering end of
-    # sentences) and might be over 100
-    # * minimize, if not avoid, overlaps among samples
-    word_low_limit = 300
+    score,scores = compute_sampled_scores(
+        text,
+        {'dcr': dale_chall_readability_raw},
+        words_in_sample,
+        sample_count
+    )['dcr']
 
-    if text_length <= word_low_limit:
-        # Text is too short, use the entire text
-        score = dale_chall_readability_raw(text)
-        scores = np.empty((1,sample_count))
-        scores[:] = np.nan
-    else:
-        scores = []
-
-        # Ensure equal spacing among samples
-        target_starts = np.arange(0, sample_count) * np.floor(
-            text_length / sample_count
-        )
-
-        # Split text into sentences, determine lengths and index of starting
-        # words
-        sentences = re.findall(r'\b[^.!?]+[.!?]*', text, re.UNICODE)
-        sentence_lengths = [
-            ts.lexicon_count(sentence) for sentence in sentences
-        ]
-        sentence_starts = np.insert(np.cumsum(sentence_lengths), 0, 0)
-
-        # Get text samples and compute the readability scores
-        for target_start in target_starts:
-            # Get index of starting sentence
-            start_dist = sentence_starts - target_start
-            index_start = np.where(
-                start_dist >= 0, start_dist, np.inf
-            ).argmin()
-
-            # Get index of ending sentence
-            end_dist = start_dist - (words_in_sample + 1)
-            index_end = np.abs(end_dist).argmin()
-            if index_end == index_start:
-                index_end += 1
-
-            if index_end > len(sentences):
-                sample = " ".join(sentences[index_start:])
-            else:
-                sample = " ".join(sentences[index_start:index_end])
-
-            # Compute the score for the text sample
-            scores.append(dale_chall_readability_raw(sample))
-
-        # Get the average
-        score = sum(scores) / len(scores)
-        scores = np.array(scores)
-
-    return round(score, 4),scores
+    return score,scores
 
 def compute_fkgl(text, words_in_sample = 100, sample_count = 3):
     """
@@ -144,7 +243,7 @@ def compute_fkgl(text, words_in_sample = 100, sample_count = 3):
 
     Parameters
     ----------
-    text : string
+    text : string or TextDocument
         Transcript to be processed
     words_in_sample : integer
         Number of words for each sample from the text, default is 100 words
@@ -159,60 +258,14 @@ def compute_fkgl(text, words_in_sample = 100, sample_count = 3):
         samples
 
     """
-    score = 0.0
-    text_length = ts.lexicon_count(text)
-    # There are no specific instructions for dealing with long texts, so we
-    # adopt the same assumptions used in the calculation of the other metrics.
-    word_low_limit = 300
+    score,scores = compute_sampled_scores(
+        text,
+        {'fkgl': flesch_kincaid_grade_level},
+        words_in_sample,
+        sample_count
+    )['fkgl']
 
-    if text_length <= word_low_limit:
-        # Text is too short, use the entire text
-        score = flesch_kincaid_grade_level(text)
-        scores = np.empty((1,sample_count))
-        scores[:] = np.nan
-    else:
-        scores = []
-
-        # Ensure equal spacing among samples
-        target_starts = np.arange(0, sample_count) * np.floor(
-            text_length / sample_count
-        )
-
-        # Split text into sentences, determine lengths and index of starting
-        # words
-        sentences = re.findall(r'\b[^.!?]+[.!?]*', text, re.UNICODE)
-        sentence_lengths = [
-            ts.lexicon_count(sentence) for sentence in sentences
-        ]
-        sentence_starts = np.insert(np.cumsum(sentence_lengths), 0, 0)
-
-        # Get text samples and compute the readability scores
-        for target_start in target_starts:
-            # Get index of starting sentence
-            start_dist = sentence_starts - target_start
-            index_start = np.where(
-                start_dist >= 0, start_dist, np.inf
-            ).argmin()
-
-            # Get index of ending sentence
-            end_dist = start_dist - (words_in_sample + 1)
-            index_end = np.abs(end_dist).argmin()
-            if index_end == index_start:
-                index_end += 1
-
-            if index_end > len(sentences):
-                sample = " ".join(sentences[index_start:])
-            else:
-                sample = " ".join(sentences[index_start:index_end])
-
-            # Compute the score for the text sample
-            scores.append(flesch_kincaid_grade_level(sample))
-
-        # Get the average
-        score = sum(scores) / len(scores)
-        scores = np.array(scores)
-
-    return round(score, 4),scores
+    return score,scores
 
 def compute_fre(text, words_in_sample = 100, sample_count = 3):
     """
@@ -221,7 +274,7 @@ def compute_fre(text, words_in_sample = 100, sample_count = 3):
 
     Parameters
     ----------
-    text : string
+    text : string or TextDocument
         Transcript to be processed
     words_in_sample : integer
         Number of words for each sample from the text, default is 100 words
@@ -236,70 +289,14 @@ def compute_fre(text, words_in_sample = 100, sample_count = 3):
         samples
 
     """
-    score = 0.0
-    text_length = ts.lexicon_count(text)
-    # Flesch suggests using 3 to 5 100-word samples of an article for
-    # computing the readability score, and sample must start at the beginning
-    # of a paragraph.
-    # From this we made the following assumptions
-    # * long texts = word counts > 300
-    # * lower limit of 3 samples for long texts
-    # * beginnings of a paragraph may not always be available (e.g., transcript
-    # generated by an ASR)
-    # * samples are not exactly composed of 100 words (considering end of
-    # sentences) and might be over 100
-    # * minimize, if not avoid, overlaps among samples
-    word_low_limit = 300
-
-
-    if text_length <= word_low_limit:
-        # Text is too short, use the entire text
-        score = flesch_reading_ease(text)
-        scores = np.empty((1,sample_count))
-        scores[:] = np.nan
-    else:
-        scores = []
+    score,scores = compute_sampled_scores(
+        text,
+        {'fre': flesch_reading_ease},
+        words_in_sample,
+        sample_count
+    )['fre']
 
-        # Ensure equal spacing among samples
-        target_starts = np.arange(0, sample_count) * np.floor(
-            text_length / sample_count
-        )
-
-        # Split text into sentences, determine lengths and index of starting
-        # words
-        sentences = re.findall(r'\b[^.!?]+[.!?]*', text, re.UNICODE)
-        sentence_lengths = [
-            ts.lexicon_count(sentence) for sentence in sentences
-        ]
-        sentence_starts = np.insert(np.cumsum(sentence_lengths), 0, 0)
-
-        # Get text samples and compute the readability scores
-        for target_start in target_starts:
-            # Get index of starting sentence
-            start_dist = sentence_starts - target_start
-            index_start = np.where(
-                start_dist >= 0, start_dist, np.inf
-            ).argmin()
-
-            # Get index of ending sentence
-            end_dist = start_dist - (words_in_sample + 1)
-            index_end = np.abs(end_dist).argmin()
-            if index_end == index_start:
-                index_end += 1
-
-            if index_end > len(sentences):
-                sample = " ".join(sentences[index_start:])
-            else:
-                sample = " ".join(sentences[index_start:index_end])
-
-            # Compute the score for the text sample
-            scores.append(flesch_reading_ease(sample))
-
-        # Get the average
-        score = sum(scores) / len(scores)
-        scores = np.array(scores)
-
-    return round(score, 4),scores
+    return score,scores
 
 def compute_from_dir(
     texts_dir, 
@@ -307,7 +304,12 @@ def compute_from_dir(
     is_punct = False,
     is_limit = False,
     count_limit = 100,
-    is_save = True
+    is_save = True,
+    words_in_sample = 100,
+    sample_count = 3,
+    workers = 1,
+    cache_path = None,
+    punct_store_path = None
 ):
     """
     This function calculates readability scores of all transcripts in a
@@ -333,6 +335,22 @@ def compute_from_dir(
         This means that if the limit cuts the text in the middle of the
         sentence and this option is True, then the entire sentence will still
         be included in the truncated text instead.
+    words_in_sample : integer
+        Number of words for each sample from the text, default is 100 words
+    sample_count : integer
+        Number of samples to be extracted from long texts, default is 3 samples
+    workers : int
+        Number of processes used to score the transcripts. Default is 1,
+        which scores the transcripts one at a time
+    cache_path : string
+        Location of the cache of previously computed scores. Transcripts
+        already scored with the same options and resources are taken from the
+        cache instead of being scored again. Default is None, which means no
+        cache is used
+    punct_store_path : string
+        Location of the store of punctuated texts, see
+        punctuation_store.punctuate_texts. All the transcripts are punctuated
+        at once before scoring. Default is None, which means no store is used
 
     Returns
     -------
@@ -340,28 +358,38 @@ def compute_from_dir(
 
     """
 
-    for entry in sorted(listdir(texts_dir)):
-        text_path = join(texts_dir, entry)
-        utt_id = splitext(entry)[0]
-
-        if isfile(text_path) and entry.endswith(".txt"):
-            print("Analyzing %s" % entry)
-            text_f = open(text_path, mode = 'r')
-            text = text_f.read()
-            text_f.close()
-
-            text = text.replace('\n', ' ').strip()
-
-            scores = compute_scores(
-                text, 
-                is_punct = is_punct,
-                is_limit = is_limit,
-                count_limit = count_limit,
-                is_save = is_save
-            )
+    options = dict(
+        is_punct = is_punct,
+        is_limit = is_limit,
+        count_limit = count_limit,
+        is_save = is_save,
+        words_in_sample = words_in_sample,
+        sample_count = sample_count
+    )
+    transcripts = get_transcripts_from_dir(texts_dir)
+    score_fn = partial(compute_scores, **options)
+    if is_punct:
+        # Punctuate the whole batch before scoring, the texts are scored as
+        # they are
+        transcripts = punctuate_transcripts(transcripts, punct_store_path)
+        score_fn = partial(compute_scores, **dict(options, is_punct = False))
+
+    cache = None
+    if cache_path:
+        cache = sc.ScoreCache(
+            cache_path,
+            "compute_readability.compute_scores",
+            options,
+            get_resource_version()
+        )
 
-            scores.insert(0, utt_id)
-            score_writer.writerow(scores)
+    bs.write_scores(
+        transcripts,
+        score_fn,
+        score_writer,
+        workers = workers,
+        cache = cache
+    )
 
 def compute_from_list(
     transcript_file, 
@@ -369,7 +397,12 @@ def compute_from_list(
     is_punct = False,
     is_limit = False,
     count_limit = 100,
-    is_save = True
+    is_save = True,
+    words_in_sample = 100,
+    sample_count = 3,
+    workers = 1,
+    cache_path = None,
+    punct_store_path = None
 ):
     """
     Calculate readability scores of all files in a directory
@@ -395,6 +428,22 @@ def compute_from_list(
         This means that if the limit cuts the text in the middle of the
         sentence and this option is True, then the entire sentence will still
         be included in the truncated text instead.
+    words_in_sample : integer
+        Number of words for each sample from the text, default is 100 words
+    sample_count : integer
+        Number of samples to be extracted from long texts, default is 3 samples
+    workers : int
+        Number of processes used to score the transcripts. Default is 1,
+        which scores the transcripts one at a time
+    cache_path : string
+        Location of the cache of previously computed scores. Transcripts
+        already scored with the same options and resources are taken from the
+        cache instead of being scored again. Default is None, which means no
+        cache is used
+    punct_store_path : string
+        Location of the store of punctuated texts, see
+        punctuation_store.punctuate_texts. All the transcripts are punctuated
+        at once before scoring. Default is None, which means no store is used
 
     Returns
     -------
@@ -402,24 +451,38 @@ def compute_from_list(
 
     """
 
-    with open(transcript_file, 'r') as tr_in_f:
-        for entry in tr_in_f:
-            utt_id,text = entry.strip().split(" ", maxsplit=1)
-            print("Analyzing %s" % utt_id)
-
-            text = re.sub(r'\[NOISE\]', "", text)
-            text = re.sub(r' +', " ", text)
-
-            scores = compute_scores(
-                text, 
-                is_punct = is_punct,
-                is_limit = is_limit,
-                count_limit = count_limit,
-                is_save = is_save
-            )
+    options = dict(
+        is_punct = is_punct,
+        is_limit = is_limit,
+        count_limit = count_limit,
+        is_save = is_save,
+        words_in_sample = words_in_sample,
+        sample_count = sample_count
+    )
+    transcripts = get_transcripts_from_list(transcript_file)
+    score_fn = partial(compute_scores, **options)
+    if is_punct:
+        # Punctuate the whole batch before scoring, the texts are scored as
+        # they are
+        transcripts = punctuate_transcripts(transcripts, punct_store_path)
+        score_fn = partial(compute_scores, **dict(options, is_punct = False))
+
+    cache = None
+    if cache_path:
+        cache = sc.ScoreCache(
+            cache_path,
+            "compute_readability.compute_scores",
+            options,
+            get_resource_version()
+        )
 
-            scores.insert(0, utt_id)
-            score_writer.writerow(scores)
+    bs.write_scores(
+        transcripts,
+        score_fn,
+        score_writer,
+        workers = workers,
+        cache = cache
+    )
 
 def compute_lw(text, words_in_sample = 100, sample_count = 3):
     """
@@ -429,7 +492,7 @@ def compute_lw(text, words_in_sample = 100, sample_count = 3):
 
     Parameters
     ----------
-    text : string
+    text : string or TextDocument
         Transcript to be processed
     words_in_sample : integer
         Number of words for each sample from the text, default is 100 words
@@ -444,77 +507,14 @@ def compute_lw(text, words_in_sample = 100, sample_count = 3):
         samples
 
     """
-    score = 0.0
-    text_length = ts.lexicon_count(text)
-    # From this we made the following assumptions
-    # * long texts = word counts > 300
-    # * lower limit of 3 samples for long texts
-    # * beginnings of a paragraph may not always be available (e.g., transcript
-    # generated by an ASR)
-    # * samples are not exactly composed of 100 words (considering end of
-    # sentences) and might be over 100
-    # * minimize, if not avoid, overlaps among samples
-    word_low_limit = 300
-
-    # Split text into sentences, determine lengths and index of starting
-    # words
-    sentences = re.findall(r'\b[^.!?]+[.!?]*', text, re.UNICODE)
-    sentence_lengths = [ts.lexicon_count(sentence) for sentence in sentences]
-    sentence_starts = np.insert(np.cumsum(sentence_lengths), 0, 0)
+    score,scores = compute_sampled_scores(
+        text,
+        {'lw': lensear_write},
+        words_in_sample,
+        sample_count
+    )['lw']
 
-    if text_length <= word_low_limit:
-        # Text is too short, get one sample only
-        index_start = 0
-
-        # Get index of ending sentence
-        end_dist = sentence_starts - (words_in_sample + 1)
-        index_end = np.abs(end_dist).argmin()
-        if index_end == index_start:
-            index_end += 1
-
-        if index_end > len(sentences):
-            sample = " ".join(sentences[index_start:])
-        else:
-            sample = " ".join(sentences[index_start:index_end])
-
-        score = lensear_write(text)
-        scores = np.empty((1,sample_count))
-        scores[:] = np.nan
-    else:
-        scores = []
-
-        # Ensure equal spacing among samples
-        target_starts = np.arange(0, sample_count) * np.floor(
-            text_length / sample_count
-        )
-
-        # Get text samples and compute the readability scores
-        for target_start in target_starts:
-            # Get index of starting sentence
-            start_dist = sentence_starts - target_start
-            index_start = np.where(
-                start_dist >= 0, start_dist, np.inf
-            ).argmin()
-
-            # Get index of ending sentence
-            end_dist = start_dist - (words_in_sample + 1)
-            index_end = np.abs(end_dist).argmin()
-            if index_end == index_start:
-                index_end += 1
-
-            if index_end > len(sentences):
-                sample = " ".join(sentences[index_start:])
-            else:
-                sample = " ".join(sentences[index_start:index_end])
-
-            # Compute the score for the text sample
-            scores.append(lensear_write(sample))
-
-        # Get the average
-        score = sum(scores) / len(scores)
-        scores = np.array(scores)
-
-    return round(score, 4),scores
+    return score,scores
 
 def compute_mer(text, words_in_sample = 100, sample_count = 3):
     """
@@ -523,7 +523,7 @@ def compute_mer(text, words_in_sample = 100, sample_count = 3):
 
     Parameters
     ----------
-    text : string
+    text : string or TextDocument
         Transcript to be processed
     words_in_sample : integer
         Number of words for each sample from the text, default is 100 words
@@ -538,64 +538,79 @@ def compute_mer(text, words_in_sample = 100, sample_count = 3):
         samples
 
     """
-    score = 0.0
-    text_length = ts.lexicon_count(text)
-    # There are no specific instructions for dealing with long texts, so we
-    # adopt the same assumptions used in the calculation of the other metrics.
-    word_low_limit = 300
-
-
-    if text_length <= word_low_limit:
-        # Text is too short, use the entire text
-        score = ts.mcalpine_eflaw(text)
-        scores = np.empty((1,sample_count))
-        scores[:] = np.nan
-    else:
-        scores = []
+    score,scores = compute_sampled_scores(
+        text,
+        {'mer': mcalpine_eflaw},
+        words_in_sample,
+        sample_count
+    )['mer']
+
+    return score,scores
+
+def compute_sampled_scores(
+    text,
+    formulas,
+    words_in_sample = 100,
+    sample_count = 3
+):
+    """
+    Compute several readability formulas on the same samples of a text. The
+    sentence boundaries and the sample windows are found only once, and each
+    formula is then applied to every sample.
 
-        # Ensure equal spacing among samples
-        target_starts = np.arange(0, sample_count) * np.floor(
-            text_length / sample_count
-        )
+    Parameters
+    ----------
+    text : string or TextDocument
+        Transcript to be processed
+    formulas : dict
+        Maps the name of each formula to a function that takes a string or a
+        TextDocument and returns its score, e.g. {'fre': flesch_reading_ease}
+    words_in_sample : integer
+        Number of words for each sample from the text, default is 100 words
+    sample_count : integer
+        Number of samples to be extracted from long texts, default is 3 samples
 
-        # Split text into sentences, determine lengths and index of starting
-        # words
-        sentences = re.findall(r'\b[^.!?]+[.!?]*', text, re.UNICODE)
-        sentence_lengths = [
-            ts.lexicon_count(sentence) for sentence in sentences
-        ]
-        sentence_starts = np.insert(np.cumsum(sentence_lengths), 0, 0)
-
-        # Get text samples and compute the readability scores
-        for target_start in target_starts:
-            # Get index of starting sentence
-            start_dist = sentence_starts - target_start
-            index_start = np.where(
-                start_dist >= 0, start_dist, np.inf
-            ).argmin()
-
-            # Get index of ending sentence
-            end_dist = start_dist - (words_in_sample + 1)
-            index_end = np.abs(end_dist).argmin()
-            if index_end == index_start:
-                index_end += 1
-
-            if index_end > len(sentences):
-                sample = " ".join(sentences[index_start:])
-            else:
-                sample = " ".join(sentences[index_start:index_end])
+    Returns
+    -------
+    sampled_scores : dict
+        Maps the name of each formula to its (score, scores) pair, where score
+        is the score of the entire text, or for long texts the average score
+        of the samples, and scores are the scores of each sample (all NaN for
+        short texts)
+    """
+    sampled_scores = dict()
+    doc = get_text_document(text)
+    windows = get_sample_windows(doc, words_in_sample, sample_count)
+
+    for name, formula in formulas.items():
+        if windows is None:
+            # Text is too short, use the entire text
+            score = formula(doc)
+            scores = np.empty((1,sample_count))
+            scores[:] = np.nan
+        else:
+            scores = [
+                formula(doc.get_sample(index_start, index_end))
+                for index_start, index_end in windows
+            ]
 
-            # Compute the score for the text sample
-            scores.append(ts.mcalpine_eflaw(sample))
+            # Get the average
+            score = sum(scores) / len(scores)
+            scores = np.array(scores)
 
-        # Get the average
-        score = sum(scores) / len(scores)
-        scores = np.array(scores)
+        sampled_scores[name] = (round(score, 4), scores)
 
-    return round(score, 4),scores
+    return sampled_scores
 
 def compute_scores(
-    text, is_punct = False, is_limit = False, count_limit = 100, is_save = True
+    text,
+    is_punct = False,
+    is_limit = False,
+    count_limit = 100,
+    is_save = True,
+    words_in_sample = 100,
+    sample_count = 3,
+    punct_store_path = None
 ):
     """
     Calculate readability scores of all files in a directory
@@ -618,6 +633,14 @@ def compute_scores(
         This means that if the limit cuts the text in the middle of the
         sentence and this option is True, then the entire sentence will still
         be included in the truncated text instead.
+    words_in_sample : integer
+        Number of words for each sample from the text, default is 100 words
+    sample_count : integer
+        Number of samples to be extracted from long texts, default is 3 samples
+    punct_store_path : string
+        Location of the store of punctuated texts, see
+        punctuation_store.punctuate. Default is None, which means no store is
+        used
     Returns
     -------
     scores : list
@@ -626,23 +649,38 @@ def compute_scores(
 
     if is_punct:
         text = remove_punctuation(text)
-        text = p.punctuate(text.lower())
+        text = ps.punctuate(text.lower(), store_path = punct_store_path)
 
     if is_limit:
         text = limit_text_by_word_count(
             text, count_limit = count_limit, is_save = is_save
         )
 
-    all_dcr = dale_chall_readability_raw(text)
-    all_fkgl = flesch_kincaid_grade_level(text)
-    all_fre = flesch_reading_ease(text)
-    all_lw = lensear_write(text)
-    all_mer = ts.mcalpine_eflaw(text)
-    udcr,samp_dcr = compute_dcr(text)
-    ufkgl,samp_fkgl = compute_fkgl(text)
-    ufre,samp_fre = compute_fre(text)
-    ulw,samp_lw = compute_lw(text)
-    umer,samp_mer = compute_mer(text)
+    # Parse the text once, all formulas read from the same document
+    doc = TextDocument(text)
+
+    all_dcr = dale_chall_readability_raw(doc)
+    all_fkgl = flesch_kincaid_grade_level(doc)
+    all_fre = flesch_reading_ease(doc)
+    all_lw = lensear_write(doc)
+    all_mer = mcalpine_eflaw(doc)
+    sampled_scores = compute_sampled_scores(
+        doc,
+        {
+            'dcr': dale_chall_readability_raw,
+            'fkgl': flesch_kincaid_grade_level,
+            'fre': flesch_reading_ease,
+            'lw': lensear_write,
+            'mer': mcalpine_eflaw
+        },
+        words_in_sample,
+        sample_count
+    )
+    udcr,samp_dcr = sampled_scores['dcr']
+    ufkgl,samp_fkgl = sampled_scores['fkgl']
+    ufre,samp_fre = sampled_scores['fre']
+    ulw,samp_lw = sampled_scores['lw']
+    umer,samp_mer = sampled_scores['mer']
     scores = [
         all_dcr, all_fkgl, all_fre, all_lw, all_mer, 
         udcr, ufkgl, ufre, ulw, umer, 
@@ -652,18 +690,7 @@ def compute_scores(
     return scores
 
 def count_in_dale_list(text):
-    count = 0.0
-
-    sentences = sent_tokenize(text)
-
-    for sentence in sentences:
-        for word, word_pos in pos_tag(word_tokenize(sentence)):
-            if (
-                word and 
-                (word not in string.punctuation) and 
-                is_in_dale_list(word, word_pos)
-            ):
-                count += 1
+    count = get_text_document(text).dale_count
 
     return count
 
@@ -672,24 +699,18 @@ def count_syllables_cainesap(text):
     text = remove_punctuation(text)
 
     for word in text.split():
-        syllables = syllable3.generate(word)
-        if syllables:
-            try:
-                count += len(list(syllables)[0])
-            except:
-                # print("WARNING: cannot process %s. Defaults to pyphen." \
-                #       % (word.upper()))
-                count += ts.syllable_count(word)
-                pass
+        count += sl.count_word_syllables(word)
+
     return count
 
 def dale_chall_readability_raw(text):
     score = 0.0
+    doc = get_text_document(text)
 
-    word_count = ts.lexicon_count(text)
-    not_in_dale_count = word_count - count_in_dale_list(text)
+    word_count = doc.word_count
+    not_in_dale_count = word_count - count_in_dale_list(doc)
 
-    ave_sent_len = average_sentence_length(text)
+    ave_sent_len = average_sentence_length(doc)
     dale_score = not_in_dale_count * 100 / word_count
 
     score = (0.0496 * ave_sent_len) + (0.1579 * dale_score)
@@ -719,10 +740,177 @@ def flesch_reading_ease(text):
 
     return score
 
-def is_in_dale_list(word, word_pos):
+def get_nlp():
+    """
+    Get the spaCy pipeline used for NER, loaded on first use
+    """
+    return md.get_spacy_model(spacy_model)
+
+def get_resource_version():
+    """
+    Get the version of the code, word lists and models used for scoring,
+    which tells apart scores computed with different resources in the cache
+    of scores
+
+    Returns
+    -------
+    version : string
+        Digest describing the resources
+    """
+    version = sc.get_resource_version(
+        resource_paths = [
+            __file__, lex.__file__, md.__file__, ps.__file__, sl.__file__,
+            sl.syllable_table_path, sl.get_syllabifier_path(),
+            lex.dale_list_path, ps.get_model_path()
+        ],
+        packages = [spacy_model, "nltk", "punctuator", "textstat"]
+    )
+
+    return version
+
+def get_sample_windows(doc, words_in_sample = 100, sample_count = 3):
+    """
+    Find the samples to be taken from a long text, shared by all the formulas
+
+    Parameters
+    ----------
+    doc : TextDocument
+        Parsed version of the transcript
+    words_in_sample : integer
+        Number of words for each sample from the text, default is 100 words
+    sample_count : integer
+        Number of samples to be extracted from long texts, default is 3 samples
+
+    Returns
+    -------
+    windows : list of tuples
+        (index_start, index_end) of the sentences of each sample, or None if
+        the text is short enough to be used entirely
+    """
+    # Flesch and Dale-Chall suggest using 3 to 5 100-word samples per article
+    # (about four per 2,000 words), and analysing the entire passage for
+    # texts of about 200 to 300 words. The same is done for all the formulas,
+    # with the following assumptions
+    # * long texts = word counts > 300
+    # * lower limit of 3 samples for long texts
+    # * beginnings of a paragraph may not always be available (e.g., transcript
+    # generated by an ASR)
+    # * samples are not exactly composed of 100 words (considering end of
+    # sentences) and might be over 100
+    # * minimize, if not avoid, overlaps among samples
+    word_low_limit = 300
+    text_length = doc.word_count
+
+    if text_length <= word_low_limit:
+        return None
+
+    windows = []
+
+    # Ensure equal spacing among samples
+    target_starts = np.arange(0, sample_count) * np.floor(
+        text_length / sample_count
+    )
+
+    # Index of starting words of the sentences
+    sentence_starts = doc.sentence_starts
+
+    for target_start in target_starts:
+        # Get index of starting sentence
+        start_dist = sentence_starts - target_start
+        index_start = np.where(
+            start_dist >= 0, start_dist, np.inf
+        ).argmin()
+
+        # Get index of ending sentence
+        end_dist = start_dist - (words_in_sample + 1)
+        index_end = np.abs(end_dist).argmin()
+        if index_end == index_start:
+            index_end += 1
+
+        windows.append((index_start, index_end))
+
+    return windows
+
+def get_text_document(text):
+    """
+    Get the parsed version of a text, parsing it only if it hasn't been parsed
+
+    Parameters
+    ----------
+    text : string or TextDocument
+        Transcript to be processed
+
+    Returns
+    -------
+    doc : TextDocument
+        Parsed version of the text
+    """
+    if isinstance(text, TextDocument):
+        doc = text
+    else:
+        doc = TextDocument(text)
+
+    return doc
+
+def get_transcripts_from_dir(texts_dir):
+    """
+    Read all transcripts in a directory. It assumes that one file contains
+    one transcript only.
+
+    Parameters
+    ----------
+    texts_dir : string
+        Directory where all the transcripts are stored
+
+    Yields
+    ------
+    transcript : tuple
+        (utt_id, text) of each transcript, in order of file name
+    """
+    for entry in sorted(listdir(texts_dir)):
+        text_path = join(texts_dir, entry)
+        utt_id = splitext(entry)[0]
+
+        if isfile(text_path) and entry.endswith(".txt"):
+            print("Analyzing %s" % entry)
+            text_f = open(text_path, mode = 'r')
+            text = text_f.read()
+            text_f.close()
+
+            text = text.replace('\n', ' ').strip()
+
+            yield utt_id,text
+
+def get_transcripts_from_list(transcript_file):
+    """
+    Read all transcripts in a text file
+
+    Parameters
+    ----------
+    transcript_file : string
+        Text file containing all the transcripts. One line contains one
+        transcript. Format is <utt_id> <transcript>
+
+    Yields
+    ------
+    transcript : tuple
+        (utt_id, text) of each transcript, in order of appearance in the file
+    """
+    with open(transcript_file, 'r') as tr_in_f:
+        for entry in tr_in_f:
+            utt_id,text = entry.strip().split(" ", maxsplit=1)
+            print("Analyzing %s" % utt_id)
+
+            text = re.sub(r'\[NOISE\]', "", text)
+            text = re.sub(r' +', " ", text)
+
+            yield utt_id,text
+
+def is_in_dale_list(word, word_pos, entity_labels=None):
     bool_in_dale = False 
+    dale_index = lex.get_dale_index()
 
-    if (dale_df['word'].eq(word.lower())).any():
+    if word.lower() in dale_index['word']:
         bool_in_dale = True
     elif word.isnumeric():
         # number
@@ -732,36 +920,39 @@ def is_in_dale_list(word, word_pos):
         bool_in_dale = False
     elif word_pos == "NNP":
         # noun
-        check_ner = [ent.label_ for ent in nlp(word).ents]
+        if entity_labels is None:
+            # Run NER on the word by itself
+            check_ner = [ent.label_ for ent in get_nlp()(word).ents]
+        else:
+            check_ner = [entity_labels[word]] if word in entity_labels else []
         if check_ner:
             word_ner = check_ner[0]
             if word_ner and word_ner in ["PERSON", "GPE"]:
                 bool_in_dale = True
     elif word_pos in ["VB", "VBD", "VBG", "VBN", "VBP", "VBZ"]:
         # verb
-        word_lemma = lemmatizer.lemmatize(word.lower(), pos='v')
-        if (dale_df['lemma_v'].eq(word_lemma)).any():
+        word_lemma = md.get_lemmatizer().lemmatize(word.lower(), pos='v')
+        if word_lemma in dale_index['lemma_v']:
             bool_in_dale = True
     elif word_pos in ["JJ", "JJR", "JJS"]:
         # adjective
-        if (dale_df['lemma_a'].eq(
-            re.sub(r'e[rs]t?$', "", word.lower()))).any():
+        if re.sub(r'e[rs]t?$', "", word.lower()) in dale_index['lemma_a']:
             # comparative or superlative
             bool_in_dale = True
         elif word.endswith("n"):
             word_lemma = word[:-1]
-            word_lemma_pos = pos_tag([word_lemma])[0][1]
+            word_lemma_pos = md.get_pos_tagger()([word_lemma])[0][1]
             if word_lemma_pos in ["NN", "NNP", "NNS"]:
                 # formed from a noun
                 bool_in_dale = True
     elif word_pos == "RB":
         # adverb
-        if (dale_df['word'].eq(re.sub(r'ly$','',word.lower()))).any():
+        if re.sub(r'ly$','',word.lower()) in dale_index['word']:
             bool_in_dale = True
     elif "-" in word:
         # hypenated word
         if all(
-            (dale_df['word'].eq(w)).any() 
+            w in dale_index['word']
             for w in re.sub("-", " ", word.lower()).split()
         ):
             bool_in_dale = True
@@ -775,7 +966,7 @@ def lensear_write(text):
 
     Parameters
     ----------
-    text : string
+    text : string or TextDocument
         Transcript to be processed
     Returns
     -------
@@ -794,22 +985,26 @@ def lensear_write(text):
     # sentence to get your grade.
     # 5. If your piece has less than 100 words, multiply your tally to get the
     # equivalent of 100
-    ignore_words = ["the", "is", "are", "was", "were"]
     monosyl_count = 0
     score = 0.0
-    word_count = ts.lexicon_count(text)
+    doc = get_text_document(text)
+    word_count = doc.word_count
 
-    text = remove_punctuation(text)
+    # Words and syllable counts of the text without punctuations
+    words = doc.tokens
+    syllable_counts = doc.syllable_counts
 
     if word_count > 100:
-        text = " ".join(text.split()[0:100])
+        words = words[0:100]
+        syllable_counts = syllable_counts[0:100]
 
+    text = " ".join(words)
     sent_count = ts.sentence_count(text)
     word_count = ts.lexicon_count(text)
     
-    for word in text.split():
-        if word.lower() not in ignore_words:
-            if count_syllables_cainesap(word) == 1:
+    for word, syll_count in zip(words, syllable_counts):
+        if word.lower() not in lex.lw_ignore_words:
+            if syll_count == 1:
                 monosyl_count +=1
 
     score = monosyl_count + (3.0 * sent_count)
@@ -842,21 +1037,86 @@ def limit_text_by_word_count(text, count_limit = 100, is_save = True):
 
     if is_save:
         current_count = 0
-        limited_text = ""
+        limited_sentences = []
 
         sentences = re.findall(r'\b[^.!?]+[.!?]*', text, re.UNICODE)
 
+        # Word counts add up across the sentences, so only the words of each
+        # new sentence need to be counted
         for sentence in sentences:
-            limited_text = limited_text + " " + sentence
-            current_count = ts.lexicon_count(limited_text)
+            limited_sentences.append(sentence)
+            current_count += ts.lexicon_count(sentence)
 
             if current_count >= count_limit:
                 break
+
+        limited_text = "".join(
+            " " + sentence for sentence in limited_sentences
+        )
     else:
         limited_text = " ".join(text.split()[:count_limit])
 
     return limited_text
 
+def limit_texts_by_word_count(texts, count_limit = 100, is_save = True):
+    """
+    Truncate a stream of texts based on a word count limit
+
+    Parameters
+    ----------
+    texts : iterable of strings
+        Transcripts to be processed
+    count_limit : int
+        Target word count of each truncated text. Default is 100 words
+    is_save : boolean
+        Option to keep complete sentences when a word count limit is imposed.
+        See limit_text_by_word_count
+
+    Yields
+    ------
+    limited_text : string
+        Truncated version of each text, in the same order as the texts
+    """
+    for text in texts:
+        yield limit_text_by_word_count(text, count_limit, is_save)
+
+def mcalpine_eflaw(text):
+    score = ts.mcalpine_eflaw(get_text_document(text).text)
+
+    return score
+
+def punctuate_transcripts(transcripts, store_path = None):
+    """
+    Punctuate a set of transcripts at once, the same way compute_scores does
+    with is_punct, so that repeated transcripts are only punctuated once and
+    the punctuator is only loaded if some transcript is missing from the store
+
+    Parameters
+    ----------
+    transcripts : iterable of tuples
+        (utt_id, text) of each transcript
+    store_path : string
+        Location of the store of punctuated texts, see
+        punctuation_store.punctuate_texts. Default is None, which means no
+        store is used
+
+    Returns
+    -------
+    transcripts : list of tuples
+        (utt_id, punctuated_text) of each transcript, in the same order
+    """
+    transcripts = list(transcripts)
+
+    punctuated_texts = ps.punctuate_texts(
+        [remove_punctuation(text).lower() for _,text in transcripts],
+        store_path = store_path
+    )
+
+    return [
+        (utt_id, punctuated_text)
+        for (utt_id,_), punctuated_text in zip(transcripts, punctuated_texts)
+    ]
+
 def remove_punctuation(text):
     """
     Remove punctuations from text
@@ -886,6 +1146,9 @@ def run_voa_example():
     is_limit = False
     count_limit = 100
     is_save = True
+    workers = 1         # number of processes used for scoring
+    cache_path = None   # cache of scores, e.g. "data/cache/scores.sqlite"
+    punct_store_path = "data/cache/punctuator.sqlite"  # punctuated texts
 
     data_name = "voa"
     sys_name = "ka5"
@@ -930,7 +1193,10 @@ def run_voa_example():
                 is_punct = is_punct, 
                 is_limit = is_limit, 
                 count_limit = count_limit, 
-                is_save = is_save
+                is_save = is_save,
+                workers = workers,
+                cache_path = cache_path,
+                punct_store_path = punct_store_path
             )
         elif sys_name in ["gws", "ka5"]:
             compute_from_list( 
@@ -939,7 +1205,10 @@ def run_voa_example():
                 is_punct = is_punct, 
                 is_limit = is_limit, 
                 count_limit = count_limit, 
-                is_save = is_save
+                is_save = is_save,
+                workers = workers,
+                cache_path = cache_path,
+                punct_store_path = punct_store_path
             )
         else:
             print("Please specify valid system name")
@@ -1,49 +1,49 @@
+import batch_scoring as bs
 import csv
+import hashlib
+import lexicons as lex
+import models as md
 import normalize_word as nw
-import pandas as pd
+import punctuation_store as ps
 import re
-import spacy
+import score_cache as sc
 import string
+import syllables as sl
 import textstat as ts
 
-from cainesap_syllabify import syllable3
-from nltk import pos_tag
-from nltk.stem import WordNetLemmatizer
-from nltk.tokenize import sent_tokenize, word_tokenize
+from functools import partial
 from os import listdir, makedirs
 from os.path import isfile, join, splitext
-from punctuator import Punctuator
-
-# Load knowledge sources
-en_compounds_path = "local/resources/wordlists/ogden_compound-words.csv"
-with open(en_compounds_path, mode="r") as cw_f:
-    cw_reader = csv.reader(cw_f)
-    en_cw_dict = {entry[0]:entry[1] for entry in cw_reader}
-
-en_dep_markers_path = "local/resources/wordlists/en_dep_markers.txt"
-with open(en_dep_markers_path, mode="r") as dep_f:
-    en_dep_markers = dep_f.read().strip().split(",")
-
-en_stopwords_path = "local/resources/wordlists/en_stopwords.txt"
-sw_f = open(en_stopwords_path, "r")
-try:
-    content = sw_f.read()
-    en_stopwords = content.split(",")
-finally:
-    sw_f.close()
 
-wordlists_dir = "local/resources/wordlists"
-dale_list_path = join(wordlists_dir, "dale-chall-detailed.csv")
-dale_df = pd.read_csv(dale_list_path, header=0)
+# Knowledge sources, compiled by lexicons on first use
+en_compounds_path = lex.compounds_path
+en_dep_markers_path = lex.dep_markers_path
+en_stopwords_path = lex.stopwords_path
 
 wordlists_dir = "local/resources/wordlists"
 en_headword_path = join(wordlists_dir, "bnc-coca_master-list-detailed.csv")
-en_hw_df = pd.read_csv(en_headword_path, header=0)
 
-# Load models
-lemmatizer = WordNetLemmatizer()
-nlp = spacy.load('en_core_web_trf')
-p = Punctuator('Demo-Europarl-EN.pcl')
+# Models and the larger word lists are loaded on first use, see models and
+# lexicons
+spacy_model = 'en_core_web_trf'
+# spaCy pipelines that can be used for finding clauses, which only needs POS
+# tags and dependency labels. Any other installed pipeline with a tagger and
+# a parser can also be given by its package name or path.
+parser_backends = dict({
+    'trf': 'en_core_web_trf',
+    'lg': 'en_core_web_lg',
+    'md': 'en_core_web_md',
+    'sm': 'en_core_web_sm'
+})
+parser_backend = 'trf'
+# Components not needed when only looking for clauses
+clause_disabled_pipes = ["ner", "lemmatizer"]
+# Number of sentences parsed together when looking for clauses
+clause_batch_size = 32
+
+# Clauses found in each sentence, kept for the most recent sentences
+clause_cache = dict()
+clause_cache_size = 100000
 
 # Set up mappings
 system_map = dict({
@@ -80,13 +80,50 @@ def average_word_length(text):
 
     return ave_length
 
+def compare_entity_labels(text):
+    """
+    Compare the proper noun decisions made with the batched NER pass against
+    the ones made by running NER on each proper noun by itself, see
+    models.compare_entity_labels
+
+    Parameters
+    ----------
+    text : string
+        Transcript to be processed
+
+    Returns
+    -------
+    divergences : list of tuples
+        (word, word_label, batch_label) for each proper noun where only one
+        of the two approaches finds a PERSON or GPE entity. A label is None
+        if no entity was found.
+    """
+    pos_tag = md.get_pos_tagger()
+    word_tokenize = md.get_word_tokenizer()
+
+    sentences = md.get_sent_tokenizer()(text)
+    tagged_tokens = [
+        tagged_token
+        for sentence in sentences
+        for tagged_token in pos_tag(word_tokenize(sentence))
+    ]
+
+    divergences = md.compare_entity_labels(
+        get_nlp(), tagged_tokens, md.get_entity_labels(get_nlp(), sentences)
+    )
+
+    return divergences
+
 def compute_from_dir(
     texts_dir, 
     score_writer,
     is_punct = False,
     is_limit = False,
     count_limit = 100,
-    is_save = True
+    is_save = True,
+    workers = 1,
+    cache_path = None,
+    punct_store_path = None
 ):
     """
     This function calculates readability scores of all transcripts in a
@@ -112,6 +149,18 @@ def compute_from_dir(
         This means that if the limit cuts the text in the middle of the
         sentence and this option is True, then the entire sentence will still
         be included in the truncated text instead.
+    workers : int
+        Number of processes used to score the transcripts. Default is 1,
+        which scores the transcripts one at a time
+    cache_path : string
+        Location of the cache of previously computed scores. Transcripts
+        already scored with the same options and resources are taken from the
+        cache instead of being scored again. Default is None, which means no
+        cache is used
+    punct_store_path : string
+        Location of the store of punctuated texts, see
+        punctuation_store.punctuate_texts. All the transcripts are punctuated
+        at once before scoring. Default is None, which means no store is used
 
     Returns
     -------
@@ -119,28 +168,36 @@ def compute_from_dir(
 
     """
 
-    for entry in sorted(listdir(texts_dir)):
-        text_path = join(texts_dir, entry)
-        utt_id = splitext(entry)[0]
-
-        if isfile(text_path) and entry.endswith(".txt"):
-            print("Analyzing %s" % entry)
-            text_f = open(text_path, mode = 'r')
-            text = text_f.read()
-            text_f.close()
-
-            text = text.replace('\n', ' ').strip()
-
-            scores = compute_scores(
-                text, 
-                is_punct = is_punct,
-                is_limit = is_limit,
-                count_limit = count_limit,
-                is_save = is_save
-            )
+    options = dict(
+        is_punct = is_punct,
+        is_limit = is_limit,
+        count_limit = count_limit,
+        is_save = is_save
+    )
+    transcripts = get_transcripts_from_dir(texts_dir)
+    score_fn = partial(compute_scores, **options)
+    if is_punct:
+        # Punctuate the whole batch before scoring, the texts are scored as
+        # they are
+        transcripts = punctuate_transcripts(transcripts, punct_store_path)
+        score_fn = partial(compute_scores, **dict(options, is_punct = False))
+
+    cache = None
+    if cache_path:
+        cache = sc.ScoreCache(
+            cache_path,
+            "content_features.compute_scores",
+            options,
+            get_resource_version()
+        )
 
-            scores.insert(0, utt_id)
-            score_writer.writerow(scores)
+    bs.write_scores(
+        transcripts,
+        score_fn,
+        score_writer,
+        workers = workers,
+        cache = cache
+    )
 
 def compute_from_list(
     transcript_file, 
@@ -148,7 +205,10 @@ def compute_from_list(
     is_punct = False,
     is_limit = False,
     count_limit = 100,
-    is_save = True
+    is_save = True,
+    workers = 1,
+    cache_path = None,
+    punct_store_path = None
 ):
     """
     Calculate readability scores of all files in a directory
@@ -174,6 +234,18 @@ def compute_from_list(
         This means that if the limit cuts the text in the middle of the
         sentence and this option is True, then the entire sentence will still
         be included in the truncated text instead.
+    workers : int
+        Number of processes used to score the transcripts. Default is 1,
+        which scores the transcripts one at a time
+    cache_path : string
+        Location of the cache of previously computed scores. Transcripts
+        already scored with the same options and resources are taken from the
+        cache instead of being scored again. Default is None, which means no
+        cache is used
+    punct_store_path : string
+        Location of the store of punctuated texts, see
+        punctuation_store.punctuate_texts. All the transcripts are punctuated
+        at once before scoring. Default is None, which means no store is used
 
     Returns
     -------
@@ -181,26 +253,40 @@ def compute_from_list(
 
     """
 
-    with open(transcript_file, 'r') as tr_in_f:
-        for entry in tr_in_f:
-            utt_id,text = entry.strip().split(" ", maxsplit=1)
-            print("Analyzing %s" % utt_id)
-
-            text = re.sub(r'\[NOISE\]', "", text)
-            text = re.sub(r' +', " ", text)
-
-            scores = compute_scores(
-                text, 
-                is_punct = is_punct,
-                is_limit = is_limit,
-                count_limit = count_limit,
-                is_save = is_save
-            )
+    options = dict(
+        is_punct = is_punct,
+        is_limit = is_limit,
+        count_limit = count_limit,
+        is_save = is_save
+    )
+    transcripts = get_transcripts_from_list(transcript_file)
+    score_fn = partial(compute_scores, **options)
+    if is_punct:
+        # Punctuate the whole batch before scoring, the texts are scored as
+        # they are
+        transcripts = punctuate_transcripts(transcripts, punct_store_path)
+        score_fn = partial(compute_scores, **dict(options, is_punct = False))
+
+    cache = None
+    if cache_path:
+        cache = sc.ScoreCache(
+            cache_path,
+            "content_features.compute_scores",
+            options,
+            get_resource_version()
+        )
 
-            scores.insert(0, utt_id)
-            score_writer.writerow(scores)
+    bs.write_scores(
+        transcripts,
+        score_fn,
+        score_writer,
+        workers = workers,
+        cache = cache
+    )
 
-def compute_idea_unit_length(text):
+def compute_idea_unit_length(
+    text, batch_size = clause_batch_size, parser = None
+):
     idea_unit_length = 0.0
     ind_clause_count = 0.0
 
@@ -210,9 +296,12 @@ def compute_idea_unit_length(text):
     word_count = ts.lexicon_count(text)
 
     sentences = re.findall(r'\b[^.!?]+[.!?]*', text, re.UNICODE)
-    for sentence in sentences:
+
+    # Parse all the sentences of the text together
+    sentence_clauses = get_sentence_clauses(sentences, batch_size, parser)
+    for sentence, clauses in zip(sentences, sentence_clauses):
         ind_clause_count += count_independent_clause(
-            sentence, dep_markers=en_dep_markers
+            sentence, clauses=clauses
         )
 
     try:
@@ -227,7 +316,8 @@ def compute_scores(
     is_punct = False,
     is_limit = False,
     count_limit = 100,
-    is_save = True
+    is_save = True,
+    punct_store_path = None
 ):
     """
     Calculate readability scores of all files in a directory
@@ -250,6 +340,10 @@ def compute_scores(
         This means that if the limit cuts the text in the middle of the
         sentence and this option is True, then the entire sentence will still
         be included in the truncated text instead.
+    punct_store_path : string
+        Location of the store of punctuated texts, see
+        punctuation_store.punctuate. Default is None, which means no store is
+        used
     Returns
     -------
     scores : list
@@ -258,7 +352,7 @@ def compute_scores(
 
     if is_punct:
         text = remove_punctuation(text)
-        text = p.punctuate(text.lower())
+        text = ps.punctuate(text.lower(), store_path = punct_store_path)
 
     if is_limit:
         text = limit_text_by_word_count(
@@ -287,22 +381,28 @@ def compute_scores(
     return scores
 
 def count_in_dale_list(text):
+    pos_tag = md.get_pos_tagger()
+    word_tokenize = md.get_word_tokenizer()
+
     count = 0.0
 
-    sentences = sent_tokenize(text)
+    sentences = md.get_sent_tokenizer()(text)
+
+    # Find the named entities of the whole text in one pass
+    entity_labels = md.get_entity_labels(get_nlp(), sentences)
 
     for sentence in sentences:
         for word, word_pos in pos_tag(word_tokenize(sentence)):
             if (
                 word and 
                 (word not in string.punctuation) and 
-                is_in_dale_list(word, word_pos)
+                is_in_dale_list(word, word_pos, entity_labels)
             ):
                 count += 1
 
     return count
 
-def count_independent_clause(sentence, dep_markers=en_dep_markers):
+def count_independent_clause(sentence, dep_markers=None, clauses=None):
     """
     Return number of independent clauses in a sentence
 
@@ -311,7 +411,11 @@ def count_independent_clause(sentence, dep_markers=en_dep_markers):
     sentence : string
         Sentence to be processed
     dep_markers : list of strings
-        List of dependent clause markers, default uses English language markers
+        List of dependent clause markers. Default is None, which means the
+        English language markers
+    clauses : list of strings
+        Clauses of the sentence, as found by get_clauses. Default is None,
+        which means the sentence is parsed here
 
     Returns
     -------
@@ -320,23 +424,28 @@ def count_independent_clause(sentence, dep_markers=en_dep_markers):
     """
     ind_clause_count = 0.0
 
-    clauses = get_clauses(sentence)
+    if clauses is None:
+        clauses = get_clauses(sentence)
 
-    dep_clauses = list(filter(
-        lambda x: x.startswith(tuple(dep_markers)), clauses
-    ))
-    ind_clause_count = float(len(clauses) - len(dep_clauses))
+    if dep_markers is None:
+        dep_pattern = lex.get_dep_marker_pattern(en_dep_markers_path)
+    else:
+        dep_pattern = lex.get_prefix_pattern(tuple(dep_markers))
+
+    dep_clause_count = sum(
+        1 for clause in clauses if dep_pattern.match(clause)
+    )
+    ind_clause_count = float(len(clauses) - dep_clause_count)
 
     return ind_clause_count
 
 def count_monosyllables(text):
     count = 0.0
-    ignore_words = ["the", "is", "are", "was", "were"]
     text = remove_punctuation(text)
 
     for word in text.split():
-        if word.lower() not in ignore_words:
-            if count_syllables_cainesap(word) == 1:
+        if word.lower() not in lex.lw_ignore_words:
+            if sl.count_word_syllables(word) == 1:
                 count +=1
 
     return count
@@ -346,17 +455,8 @@ def count_syllables_cainesap(text):
     text = remove_punctuation(text)
 
     for word in text.split():
-        syllables = syllable3.generate(word)
-        if syllables:
-            try:
-                count += len(list(syllables)[0])
-            except:
-                # print(
-                #     f"WARNING: cannot process {word.upper()}. "
-                #     f"Defaults to pyphen."
-                # )
-                count += ts.syllable_count(word)
-                pass
+        count += sl.count_word_syllables(word)
+
     return count
 
 def find_other_verbs(doc, root_token):
@@ -399,13 +499,18 @@ def get_clause_token_span_for_verb(verb, doc, all_verbs):
                 last_token_index = child.i
     return(first_token_index, last_token_index)
 
-def get_clauses(sentence):
+def get_clauses(sentence, parser = None):
     """
-    From Packt>
+    Get the clauses of a sentence, see get_sentence_clauses
     """
-    sentence = ' '.join(sentence.split())
-    doc = nlp(sentence)
+    clauses_text = get_sentence_clauses([sentence], parser=parser)[0]
+
+    return clauses_text
 
+def get_clauses_from_doc(doc):
+    """
+    From Packt>
+    """
     root_token = find_root_of_sentence(doc)
     other_verbs = find_other_verbs(doc, root_token)
 
@@ -433,7 +538,7 @@ def get_clauses(sentence):
     return clauses_text
 
 def get_compound_class(
-    compound, compound_pos, cw_dict=en_cw_dict, hw_df=en_hw_df
+    compound, compound_pos, cw_dict=None, hw_index=None
 ):
     """
     Get headword class for a given compound word
@@ -444,8 +549,14 @@ def get_compound_class(
         Compound word to be analyzed
     compound_pos : string
         POS tag of the given compound word
-    hw_df : pandas.DataFrame
-        Record of headwords and corresponding classes
+    cw_dict : dict
+        Compound words and their components, as loaded by
+        lexicons.get_compound_words. Default is None, which means Ogden's
+        list of compound words
+    hw_index : dict
+        Record of headwords and corresponding classes, as built by
+        lexicons.get_headword_index. Default is None, which means the
+        BNC-COCA headword list
 
     Returns
     -------
@@ -455,18 +566,22 @@ def get_compound_class(
     # Default: if all components of a compound word are stopwords, assign a
     # level of 1
     compound_class = 1.0
+    if cw_dict is None:
+        cw_dict = lex.get_compound_words(en_compounds_path)
+    if hw_index is None:
+        hw_index = get_headword_index()
 
     words = cw_dict[compound].split()
 
     for word in words:
         # Highest difficulty class assigned to a component is the class of the
         # compound word
-        word_class = get_word_class(word, compound_pos, hw_df)
+        word_class = get_word_class(word, compound_pos, hw_index)
         compound_class = max(compound_class, word_class)
 
     return compound_class
 
-def get_headword_class(headword, hw_df=en_hw_df):
+def get_headword_class(headword, hw_index=None):
     """
     Get class for a word's headword
 
@@ -474,24 +589,30 @@ def get_headword_class(headword, hw_df=en_hw_df):
     ----------
     headword : string
         Headword to be searched in the list of headwords
-    hw_df : pandas.DataFrame
-        Record of headwords and corresponding classes
+    hw_index : dict
+        Record of headwords and corresponding classes, as built by
+        lexicons.get_headword_index. Default is None, which means the
+        BNC-COCA headword list
 
     Returns
     -------
     word_class : float
         Corresponding headword class or rank of the word
     """
-    headword_class = 11.0
-
-    headword_match = hw_df.loc[hw_df["word"] == headword, "hw_class"]
+    if hw_index is None:
+        hw_index = get_headword_index()
 
-    if not headword_match.empty:
-        headword_class = float(headword_match.iloc[0])
+    headword_class = hw_index["word"].get(headword, 11.0)
 
     return headword_class
 
-def get_lemma_class(word, raw_pos_tag, hw_df=en_hw_df):
+def get_headword_index():
+    """
+    Get the index of the BNC-COCA headword list, loaded on first use
+    """
+    return lex.get_headword_index(en_headword_path)
+
+def get_lemma_class(word, raw_pos_tag, hw_index=None):
     """
     Get headword class for a word's lemma
 
@@ -501,8 +622,10 @@ def get_lemma_class(word, raw_pos_tag, hw_df=en_hw_df):
         Word to be lemmatized, lemma to be searched in the list of headwords
     raw_pos_tag : string
         Part-of-speech (POS) tag of the word
-    hw_df : pandas.DataFrame
-        Record of headwords and corresponding classes
+    hw_index : dict
+        Record of headwords and corresponding classes, as built by
+        lexicons.get_headword_index. Default is None, which means the
+        BNC-COCA headword list
 
     Returns
     -------
@@ -513,22 +636,131 @@ def get_lemma_class(word, raw_pos_tag, hw_df=en_hw_df):
     """
     lemma_class = 11.0
     word_lemma = ""
+    if hw_index is None:
+        hw_index = get_headword_index()
 
     word_lemma = nw.get_lemma(word, raw_pos_tag)
     word_lemma_type = "lemma_" + nw.get_pos_tag_for_lemmatizer(raw_pos_tag)
 
-    lemma_match = hw_df.loc[hw_df[word_lemma_type] == word_lemma, "hw_class"]
+    lemma_class = hw_index[word_lemma_type].get(word_lemma, 11.0)
 
-    if not lemma_match.empty:
-        lemma_class = float(lemma_match.iloc[0])
-
-    headword_class = get_headword_class(word_lemma, hw_df)
+    headword_class = get_headword_class(word_lemma, hw_index)
 
     lemma_class = min(lemma_class, headword_class)
 
     return lemma_class,word_lemma
 
-def get_stem_class(word, hw_df=en_hw_df):
+def get_nlp():
+    """
+    Get the spaCy pipeline used for NER and clause extraction, loaded on
+    first use
+    """
+    return md.get_spacy_model(spacy_model)
+
+def get_parser(parser = None):
+    """
+    Get the spaCy pipeline of a parser backend, loaded on first use
+
+    Parameters
+    ----------
+    parser : string
+        Name of the backend in parser_backends, or package name or path of
+        any other spaCy pipeline. Default is None, which means the backend
+        set in parser_backend
+
+    Returns
+    -------
+    parser_nlp : class 'spacy.language.Language'
+        Loaded pipeline
+    """
+    if parser is None:
+        parser = parser_backend
+
+    return md.get_spacy_model(parser_backends.get(parser, parser))
+
+def get_resource_version():
+    """
+    Get the version of the code, word lists and models used for scoring,
+    which tells apart scores computed with different resources in the cache
+    of scores
+
+    Returns
+    -------
+    version : string
+        Digest describing the resources
+    """
+    version = sc.get_resource_version(
+        resource_paths = [
+            __file__, lex.__file__, md.__file__, nw.__file__, ps.__file__,
+            sl.__file__, sl.syllable_table_path, sl.get_syllabifier_path(),
+            lex.dale_list_path, en_headword_path, en_compounds_path,
+            en_dep_markers_path, en_stopwords_path, ps.get_model_path()
+        ],
+        packages = [spacy_model, "nltk", "punctuator", "textstat"]
+    )
+
+    return version
+
+def get_sentence_clauses(
+    sentences, batch_size = clause_batch_size, parser = None
+):
+    """
+    Get the clauses of several sentences. Sentences that were not seen
+    recently are parsed together in batches, which is much faster than
+    parsing them one at a time, especially with a transformer pipeline.
+
+    Parameters
+    ----------
+    sentences : list of strings
+        Sentences to be processed
+    batch_size : int
+        Number of sentences parsed together. Default is 32 sentences
+    parser : string
+        Parser backend, see get_parser. Default is None, which means the
+        backend set in parser_backend
+
+    Returns
+    -------
+    sentence_clauses : list of lists of strings
+        Lowercase clauses of each sentence, in the same order as the
+        sentences
+    """
+    if parser is None:
+        parser = parser_backend
+    parser_model = parser_backends.get(parser, parser)
+
+    sentences = [' '.join(sentence.split()) for sentence in sentences]
+    keys = [
+        (parser_model, hashlib.sha1(sentence.encode("utf-8")).hexdigest())
+        for sentence in sentences
+    ]
+
+    found = dict()
+    missing = dict()
+    for key, sentence in zip(keys, sentences):
+        if key in clause_cache:
+            found[key] = clause_cache[key]
+        else:
+            missing[key] = sentence
+
+    sent_docs = get_parser(parser).pipe(
+        missing.values(),
+        batch_size=batch_size,
+        disable=clause_disabled_pipes
+    )
+    for key, sent_doc in zip(missing.keys(), sent_docs):
+        found[key] = get_clauses_from_doc(sent_doc)
+
+        if len(clause_cache) >= clause_cache_size:
+            # Drop the oldest entry
+            del clause_cache[next(iter(clause_cache))]
+        clause_cache[key] = found[key]
+
+    sentence_clauses = [list(found[key]) for key in keys]
+
+    return sentence_clauses
+
+def get_stem_class(word, hw_index=None):
     """
     Get headword class for a word's stem
 
@@ -536,8 +768,10 @@ def get_stem_class(word, hw_df=en_hw_df):
     ----------
     word : string
         Word to be stemmed, stem to be searched in the list of headwords
-    hw_df : pandas.DataFrame
-        Record of headwords and corresponding classes
+    hw_index : dict
+        Record of headwords and corresponding classes, as built by
+        lexicons.get_headword_index. Default is None, which means the
+        BNC-COCA headword list
 
     Returns
     -------
@@ -548,20 +782,73 @@ def get_stem_class(word, hw_df=en_hw_df):
     """
     stem_class = 11.0
     word_stem = ""
+    if hw_index is None:
+        hw_index = get_headword_index()
 
     word_stem = nw.get_stem(word)
-    stem_match = hw_df.loc[hw_df["stem"] == word_stem, "hw_class"]
-
-    if not stem_match.empty:
-        stem_class = float(stem_match.iloc[0])
+    stem_class = hw_index["stem"].get(word_stem, 11.0)
 
-    headword_class = get_headword_class(word_stem, hw_df)
+    headword_class = get_headword_class(word_stem, hw_index)
 
     stem_class = min(stem_class, headword_class)
 
     return stem_class,word_stem
 
-def get_word_class(word, word_pos, hw_df=en_hw_df):
+def get_transcripts_from_dir(texts_dir):
+    """
+    Read all transcripts in a directory. It assumes that one file contains
+    one transcript only.
+
+    Parameters
+    ----------
+    texts_dir : string
+        Directory where all the transcripts are stored
+
+    Yields
+    ------
+    transcript : tuple
+        (utt_id, text) of each transcript, in order of file name
+    """
+    for entry in sorted(listdir(texts_dir)):
+        text_path = join(texts_dir, entry)
+        utt_id = splitext(entry)[0]
+
+        if isfile(text_path) and entry.endswith(".txt"):
+            print("Analyzing %s" % entry)
+            text_f = open(text_path, mode = 'r')
+            text = text_f.read()
+            text_f.close()
+
+            text = text.replace('\n', ' ').strip()
+
+            yield utt_id,text
+
+def get_transcripts_from_list(transcript_file):
+    """
+    Read all transcripts in a text file
+
+    Parameters
+    ----------
+    transcript_file : string
+        Text file containing all the transcripts. One line contains one
+        transcript. Format is <utt_id> <transcript>
+
+    Yields
+    ------
+    transcript : tuple
+        (utt_id, text) of each transcript, in order of appearance in the file
+    """
+    with open(transcript_file, 'r') as tr_in_f:
+        for entry in tr_in_f:
+            utt_id,text = entry.strip().split(" ", maxsplit=1)
+            print("Analyzing %s" % utt_id)
+
+            text = re.sub(r'\[NOISE\]', "", text)
+            text = re.sub(r' +', " ", text)
+
+            yield utt_id,text
+
+def get_word_class(word, word_pos, hw_index=None):
     """
     Get headword class for a given word
 
@@ -571,8 +858,10 @@ def get_word_class(word, word_pos, hw_df=en_hw_df):
         Word to be analyzed
     word_pos : string
         POS tag of the given word
-    hw_df : pandas.DataFrame
-        Record of headwords and corresponding classes
+    hw_index : dict
+        Record of headwords and corresponding classes, as built by
+        lexicons.get_headword_index. Default is None, which means the
+        BNC-COCA headword list
 
     Returns
     -------
@@ -585,17 +874,19 @@ def get_word_class(word, word_pos, hw_df=en_hw_df):
     # Default: if word is not found in the headwords list, assign a difficulty
     # level of 11
     word_class = 11.0
+    if hw_index is None:
+        hw_index = get_headword_index()
 
     # Extract the word's class
-    if word in en_stopwords:
+    if word in lex.get_stopwords(en_stopwords_path):
         word_class = 1.0
     else:
-        word_class = get_headword_class(word, hw_df)
+        word_class = get_headword_class(word, hw_index)
 
         if word_class == 11.0:
             # Use the word's stem and lemma to find the word's class
-            stem_class,word_stem = get_stem_class(word, hw_df)
-            lemma_class,word_lemma = get_lemma_class(word, word_pos, hw_df)
+            stem_class,word_stem = get_stem_class(word, hw_index)
+            lemma_class,word_lemma = get_lemma_class(word, word_pos, hw_index)
 
             word_class = float(min(stem_class, lemma_class))
 
@@ -603,10 +894,11 @@ def get_word_class(word, word_pos, hw_df=en_hw_df):
 
     return word_class
 
-def is_in_dale_list(word, word_pos):
+def is_in_dale_list(word, word_pos, entity_labels=None):
     bool_in_dale = False 
+    dale_index = lex.get_dale_index()
 
-    if (dale_df['word'].eq(word.lower())).any():
+    if word.lower() in dale_index['word']:
         bool_in_dale = True
     elif word.isnumeric():
         # number
@@ -616,35 +908,38 @@ def is_in_dale_list(word, word_pos):
         bool_in_dale = False
     elif word_pos == "NNP":
         # noun
-        check_ner = [ent.label_ for ent in nlp(word).ents]
+        if entity_labels is None:
+            # Run NER on the word by itself
+            check_ner = [ent.label_ for ent in get_nlp()(word).ents]
+        else:
+            check_ner = [entity_labels[word]] if word in entity_labels else []
         if check_ner:
             word_ner = check_ner[0]
             if word_ner and word_ner in ["PERSON", "GPE"]:
                 bool_in_dale = True
     elif word_pos in ["VB", "VBD", "VBG", "VBN", "VBP", "VBZ"]:
         # verb
-        word_lemma = lemmatizer.lemmatize(word.lower(), pos='v')
-        if (dale_df['lemma_v'].eq(word_lemma)).any():
+        word_lemma = md.get_lemmatizer().lemmatize(word.lower(), pos='v')
+        if word_lemma in dale_index['lemma_v']:
             bool_in_dale = True
     elif word_pos in ["JJ", "JJR", "JJS"]:
         # adjective
-        if (dale_df['lemma_a'].eq(
-            re.sub(r'e[rs]t?$', "", word.lower()))).any():
+        if re.sub(r'e[rs]t?$', "", word.lower()) in dale_index['lemma_a']:
             # comparative or superlative
             bool_in_dale = True
         elif word.endswith("n"):
             word_lemma = word[:-1]
-            word_lemma_pos = pos_tag([word_lemma])[0][1]
+            word_lemma_pos = md.get_pos_tagger()([word_lemma])[0][1]
             if word_lemma_pos in ["NN", "NNP", "NNS"]:
                 # formed from a noun
                 bool_in_dale = True
     elif word_pos == "RB":
         # adverb
-        if (dale_df['word'].eq(re.sub(r'ly$','',word.lower()))).any():
+        if re.sub(r'ly$','',word.lower()) in dale_index['word']:
             bool_in_dale = True
     elif "-" in word:
         # hypenated word
-        if all((dale_df['word'].eq(w)).any() 
+        if all(w in dale_index['word']
                for w in re.sub("-", " ", word.lower()).split()):
             bool_in_dale = True
     
@@ -674,21 +969,59 @@ def limit_text_by_word_count(text, count_limit = 100, is_save = True):
 
     if is_save:
         current_count = 0
-        limited_text = ""
+        limited_sentences = []
 
         sentences = re.findall(r'\b[^.!?]+[.!?]*', text, re.UNICODE)
 
+        # Word counts add up across the sentences, so only the words of each
+        # new sentence need to be counted
         for sentence in sentences:
-            limited_text = limited_text + " " + sentence
-            current_count = ts.lexicon_count(limited_text)
+            limited_sentences.append(sentence)
+            current_count += ts.lexicon_count(sentence)
 
             if current_count >= count_limit:
                 break
+
+        limited_text = "".join(
+            " " + sentence for sentence in limited_sentences
+        )
     else:
         limited_text = " ".join(text.split()[:count_limit])
 
     return limited_text
 
+def punctuate_transcripts(transcripts, store_path = None):
+    """
+    Punctuate a set of transcripts at once, the same way compute_scores does
+    with is_punct, so that repeated transcripts are only punctuated once and
+    the punctuator is only loaded if some transcript is missing from the store
+
+    Parameters
+    ----------
+    transcripts : iterable of tuples
+        (utt_id, text) of each transcript
+    store_path : string
+        Location of the store of punctuated texts, see
+        punctuation_store.punctuate_texts. Default is None, which means no
+        store is used
+
+    Returns
+    -------
+    transcripts : list of tuples
+        (utt_id, punctuated_text) of each transcript, in the same order
+    """
+    transcripts = list(transcripts)
+
+    punctuated_texts = ps.punctuate_texts(
+        [remove_punctuation(text).lower() for _,text in transcripts],
+        store_path = store_path
+    )
+
+    return [
+        (utt_id, punctuated_text)
+        for (utt_id,_), punctuated_text in zip(transcripts, punctuated_texts)
+    ]
+
 def remove_punctuation(text):
     """
     Remove punctuations from text
@@ -714,6 +1047,9 @@ def remove_punctuation(text):
 def run_voa_example():
     data_name = "voa"
     sys_name = "ka5"
+    workers = 1         # number of processes used for scoring
+    cache_path = None   # cache of scores, e.g. "data/cache/scores.sqlite"
+    punct_store_path = "data/cache/punctuator.sqlite"  # punctuated texts
     header = [
         "id", "sent_count", "syll_count", "word_count", 
         "miniw_count", "monosyll_count", "not_in_dale_count", 
@@ -769,7 +1105,10 @@ def run_voa_example():
                 is_punct = is_punct, 
                 is_limit = is_limit, 
                 count_limit = count_limit, 
-                is_save = is_save
+                is_save = is_save,
+                workers = workers,
+                cache_path = cache_path,
+                punct_store_path = punct_store_path
             )
         elif sys_name in ["gws", "ka5"]:
             compute_from_list(
@@ -778,7 +1117,10 @@ def run_voa_example():
                 is_punct = is_punct, 
                 is_limit = is_limit, 
                 count_limit = count_limit, 
-                is_save = is_save
+                is_save = is_save,
+                workers = workers,
+                cache_path = cache_path,
+                punct_store_path = punct_store_path
             )
         else:
             print("Please specify valid system name")
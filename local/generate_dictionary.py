@@ -1,16 +1,216 @@
-from g2p_en import G2p
-from os.path import join
+import merge_dictionaries as mg
+import multiprocessing as mp
 
-def get_entry(word):
-    g2p = G2p()
+from functools import lru_cache
+from os import makedirs
+from os.path import abspath, dirname, isfile, join, splitext
 
-    sequence = " ".join(g2p(word))
+# Pronunciations generated so far, in the format of cmudict.0.7a, so that
+# each word only goes through the model once across runs
+default_cache_path = "data/cache/g2p.dict"
 
-    # write entry following format in cmudict.0.7a
+def format_entry(word, sequence):
+    """
+    Write an entry following the format in cmudict.0.7a
+    """
     entry = word + "  " + sequence
 
     return entry
 
+def generate_entries(
+    words,
+    workers = 1,
+    chunksize = 256,
+    cache_path = default_cache_path
+):
+    """
+    Generate the dictionary entries of a list of words. Only the words
+    missing from the pronunciation cache go through the model, and their
+    pronunciations are added to the cache as soon as they are ready.
+
+    Parameters
+    ----------
+    words : iterable of strings
+        Words to be pronounced
+    workers : int
+        Number of worker processes. Default is 1
+    chunksize : int
+        Number of words sent to a worker at a time. Default is 256
+    cache_path : string
+        Location of the pronunciation cache. Default is
+        data/cache/g2p.dict. None means no cache is used.
+
+    Returns
+    -------
+    entries : list of strings
+        Entry of each word, in the same order as the words
+    """
+    words = list(words)
+    sequences = dict()
+
+    if cache_path:
+        sequences = load_sequences(cache_path)
+        makedirs(dirname(abspath(cache_path)), exist_ok=True)
+        remove_partial_line(cache_path)
+
+    missing = list(dict.fromkeys(
+        word for word in words if word not in sequences
+    ))
+    print(f"Generating the pronunciations of {len(missing)} new words.")
+
+    new_sequences = zip(missing, iter_sequences(missing, workers, chunksize))
+    if cache_path:
+        with open(cache_path, mode='a') as cache_f:
+            for word, sequence in new_sequences:
+                sequences[word] = sequence
+                cache_f.write(format_entry(word, sequence) + "\n")
+    else:
+        sequences.update(new_sequences)
+
+    entries = [format_entry(word, sequences[word]) for word in words]
+
+    return entries
+
+def get_entry(word):
+    entry = format_entry(word, get_sequence(word))
+
+    return entry
+
+@lru_cache(maxsize=None)
+def get_g2p():
+    """
+    Load the grapheme-to-phoneme model, once per process
+    """
+    from g2p_en import G2p
+
+    return G2p()
+
+def get_sequence(word):
+    """
+    Get the space-separated phonemes of a word
+    """
+    g2p = get_g2p()
+
+    sequence = " ".join(g2p(word))
+
+    return sequence
+
+def iter_sequences(words, workers = 1, chunksize = 256):
+    """
+    Get the phonemes of a set of words, keeping the order of the words
+
+    Parameters
+    ----------
+    words : list of strings
+        Words to be pronounced
+    workers : int
+        Number of worker processes. Default is 1
+    chunksize : int
+        Number of words sent to a worker at a time. Default is 256
+
+    Yields
+    ------
+    sequence : string
+        Space-separated phonemes of each word
+    """
+    if workers > 1 and len(words) > chunksize:
+        # Each worker loads the model once, when it pronounces its first word
+        with mp.get_context("spawn").Pool(processes=workers) as pool:
+            yield from pool.imap(get_sequence, words, chunksize)
+    else:
+        for word in words:
+            yield get_sequence(word)
+
+def load_sequences(dict_path):
+    """
+    Load the pronunciations of a dictionary in the format of cmudict.0.7a
+
+    Parameters
+    ----------
+    dict_path : string
+        Location of the dictionary
+
+    Returns
+    -------
+    sequences : dict
+        Maps each word to its phonemes, or an empty dictionary if the file is
+        missing
+    """
+    sequences = dict()
+
+    if isfile(dict_path):
+        with open(dict_path, mode='r') as dict_f:
+            for line in dict_f:
+                # Skip the last line of an interrupted run, which lacks its
+                # line break
+                if not line.endswith("\n"):
+                    break
+                entry = line.rstrip("\n").split("  ", maxsplit=1)
+                if len(entry) == 2:
+                    sequences[entry[0]] = entry[1]
+
+    return sequences
+
+def remove_partial_line(file_path):
+    """
+    Remove the last line of a file if it lacks its line break, i.e. if it was
+    cut short by an interrupted run, so that new lines can be appended
+    """
+    if not isfile(file_path):
+        return
+
+    with open(file_path, mode='rb+') as file_f:
+        content = file_f.read()
+        if content and not content.endswith(b"\n"):
+            file_f.truncate(content.rfind(b"\n") + 1)
+
+def write_dictionary(
+    list_path,
+    dict_path,
+    workers = 1,
+    chunksize = 256,
+    cache_path = default_cache_path,
+    base_dict_path = None,
+    merged_path = None
+):
+    """
+    Generate the dictionary entries of the words of a list, one word per
+    line, and optionally merge them into an existing dictionary
+
+    Parameters
+    ----------
+    list_path : string
+        Location of the word list
+    dict_path : string
+        Location of the generated dictionary
+    workers, chunksize, cache_path
+        See generate_entries
+    base_dict_path : string
+        Location of the dictionary the generated entries are merged with,
+        e.g. cmudict.0.7a. Default is None, which means no merged dictionary
+        is written.
+    merged_path : string
+        Location of the merged dictionary. Default is None, which means it is
+        written next to the generated dictionary, e.g. words-merged.dict for
+        words.dict
+
+    Returns
+    -------
+    None
+    """
+    with open(list_path, mode='r') as list_f:
+        words = [line.strip() for line in list_f]
+
+    entries = generate_entries(words, workers, chunksize, cache_path)
+
+    with open(dict_path, mode='w') as dict_f:
+        dict_f.writelines(entry + "\n" for entry in entries)
+
+    if base_dict_path:
+        if merged_path is None:
+            merged_path = splitext(dict_path)[0] + "-merged.dict"
+        mg.merge_dictionaries([base_dict_path, dict_path], merged_path)
+
 def run_voa_example():
     list_dir = "data/voa/info"
     list_file = "voa_processed-transcript_words-not-in-cmu07a.txt"
@@ -19,15 +219,18 @@ def run_voa_example():
     dict_file = "voa_processed-transcript_words-not-in-cmu07a.dict"
     dict_path = join(list_dir, dict_file)
 
-    with open(list_path, mode='r') as list_f, \
-         open(dict_path, mode='w') as dict_f:
-        print("Generating phoneme sequences...\n")
-        for index, line in enumerate(list_f):
-            word = line.strip()
-            entry = get_entry(word)
+    workers = 1
+    cache_path = default_cache_path
+    # Set to e.g. the location of cmudict.0.7a to also write a merged lexicon
+    base_dict_path = None
+    merged_path = join(list_dir, "voa_processed-transcript_words-merged.dict")
 
-            dict_f.write(entry + "\n")
-        print("Done.")
+    print("Generating phoneme sequences...\n")
+    write_dictionary(
+        list_path, dict_path, workers, cache_path=cache_path,
+        base_dict_path=base_dict_path, merged_path=merged_path
+    )
+    print("Done.")
 
 def main():
     run_voa_example()
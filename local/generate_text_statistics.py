@@ -1,12 +1,10 @@
 import csv
+import punctuation_store as ps
 import textstat
 
 from compute_readability import limit_text_by_word_count
 from os import listdir
 from os.path import isfile, join, splitext
-from punctuator import Punctuator
-
-p = Punctuator('Demo-Europarl-EN.pcl')
 
 def format_text(text):
     formatted_text = textstat.remove_punctuation(text)
@@ -19,7 +17,8 @@ def limit_texts_from_dir(
     out_dir,
     is_punct = False,
     count_limit = 100,
-    is_save = True
+    is_save = True,
+    punct_store_path = None
 ):
     for entry in sorted(listdir(texts_dir)):
         text_path = join(texts_dir, entry)
@@ -31,12 +30,14 @@ def limit_texts_from_dir(
 
             if is_punct:
                 text = textstat.remove_punctuation(text)
-                text = p.punctuate(text.lower())
+                text = ps.punctuate(
+                    text.lower(), store_path = punct_store_path
+                )
 
             limited_text = \
                 limit_text_by_word_count(text,
                                          count_limit = count_limit,
-                                         is_save_sentences = is_save)
+                                         is_save = is_save)
             output_text = format_text(limited_text)
 
             out_path = join(out_dir, entry)
@@ -49,7 +50,8 @@ def limit_texts_from_list(
     out_dir,
     is_punct = False,
     count_limit = 100,
-    is_save = True
+    is_save = True,
+    punct_store_path = None
 ):
     with open(texts_list_path, 'r') as textlist_f:
         for entry in textlist_f:
@@ -57,7 +59,9 @@ def limit_texts_from_list(
 
             if is_punct:
                 text = textstat.remove_punctuation(text)
-                text = p.punctuate(text.lower())
+                text = ps.punctuate(
+                    text.lower(), store_path = punct_store_path
+                )
 
             limited_text = limit_text_by_word_count(
                 text,
@@ -109,7 +113,8 @@ def get_counts_from_dir(
     is_punct = False,
     is_limit = False,
     count_limit = 100,
-    is_save = True
+    is_save = True,
+    punct_store_path = None
 ):
     counts_list = []
 
@@ -125,13 +130,15 @@ def get_counts_from_dir(
 
             if is_punct:
                 text = textstat.remove_punctuation(text)
-                text = p.punctuate(text.lower())
+                text = ps.punctuate(
+                    text.lower(), store_path = punct_store_path
+                )
 
             if is_limit:
                 text = limit_text_by_word_count(
                     text,
                     count_limit = count_limit,
-                    is_save_sentences = is_save
+                    is_save = is_save
                 )
 
             counts = get_counts(text)
@@ -146,7 +153,8 @@ def get_counts_from_list(
     is_punct = False,
     is_limit = False,
     count_limit = 100,
-    is_save = True
+    is_save = True,
+    punct_store_path = None
 ):
     counts_list = []
 
@@ -158,13 +166,15 @@ def get_counts_from_list(
 
             if is_punct:
                 text = textstat.remove_punctuation(text)
-                text = p.punctuate(text.lower())
+                text = ps.punctuate(
+                    text.lower(), store_path = punct_store_path
+                )
 
             if is_limit:
                 text = limit_text_by_word_count(
                     text,
                     count_limit=count_limit,
-                    is_save_sentences=is_save
+                    is_save=is_save
                 )
 
             counts = get_counts(text)
@@ -221,6 +231,7 @@ def run_voa_example():
     #     writer.writerows(counts_list)
 
     is_punct = True
+    punct_store_path = "data/cache/punctuator.sqlite"  # punctuated texts
     texts_file = "voa-1000_google-web_T-chunks_T-period_hyp.txt"
     texts_path = join(asr_dir, texts_file)
     # hyp_dir = join(asr_dir, "hyps_lim-100")
@@ -229,7 +240,8 @@ def run_voa_example():
     #                       out_dir = hyp_dir,
     #                       is_punct = is_punct,
     #                       count_limit = count_limit,
-    #                       is_save = is_save)
+    #                       is_save = is_save,
+    #                       punct_store_path = punct_store_path)
     # print("DONE. Files saved in %s." % hyp_dir)
 
     is_limit = False
@@ -241,7 +253,8 @@ def run_voa_example():
         is_punct=is_punct,
         is_limit=is_limit,
         count_limit=count_limit,
-        is_save=is_save
+        is_save=is_save,
+        punct_store_path=punct_store_path
     )
 
     with open(counts_path, "w", newline = "") as counts_f:
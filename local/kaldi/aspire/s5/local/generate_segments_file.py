@@ -1,8 +1,14 @@
+import sys
+
 from os import listdir, mkdir
-from os.path import basename, dirname, isfile, join, splitext
+from os.path import abspath, basename, dirname, isfile, join, splitext
 
 from pydub import AudioSegment
-from pydub.silence import detect_nonsilent, split_on_silence
+
+# Silence detection is shared with transcribe_speech.py, in the local directory
+# at the root of the repository
+sys.path.insert(0, join(dirname(abspath(__file__)), "../../../.."))
+import segmentation as sg
 
 # settings for voa
 KEEP_SILENCE=500
@@ -27,11 +33,14 @@ def get_segments(utt_id, utt_loc):
     # to accommodate words ending in unvoiced fricatives (e.g., /s/)
     silence_thresh = speech_data.dBFS - 30
 
-    # Get timestamps of speech segments
-    segment_times = detect_nonsilent(speech_data, \
-                                     min_silence_len=MIN_SILENCE_LEN, \
-                                     silence_thresh=silence_thresh, \
-                                     seek_step=SEEK_STEP)
+    # Get timestamps of speech segments, without the silence padding
+    chunks = sg.iter_chunks(speech_data, \
+                            min_silence_len=MIN_SILENCE_LEN, \
+                            silence_thresh=silence_thresh, \
+                            keep_silence=KEEP_SILENCE, \
+                            seek_step=SEEK_STEP)
+    segment_times = [[chunk.speech_start, chunk.speech_end] \
+                     for chunk in chunks]
 
     for segment_time in segment_times:
         segment_id = utt_id + "_" + str(round(segment_time[0]/100)).zfill(5) \
@@ -0,0 +1,263 @@
+import csv
+import hashlib
+import pickle
+import re
+
+from functools import lru_cache
+from os.path import isfile, join
+
+wordlists_dir = "local/resources/wordlists"
+dale_list_path = join(wordlists_dir, "dale-chall-detailed.csv")
+headword_list_path = join(wordlists_dir, "bnc-coca_master-list-detailed.csv")
+compounds_path = join(wordlists_dir, "ogden_compound-words.csv")
+dep_markers_path = join(wordlists_dir, "en_dep_markers.txt")
+stopwords_path = join(wordlists_dir, "en_stopwords.txt")
+
+# Words left out of the one-syllable word count of the Linsear Write formula
+lw_ignore_words = frozenset(["the", "is", "are", "was", "were"])
+
+@lru_cache(maxsize=None)
+def get_compound_words(list_path=compounds_path):
+    """
+    Load the list of compound words and their components
+
+    Parameters
+    ----------
+    list_path : string
+        Location of the list of compound words, in CSV format with the
+        compound word followed by its space-separated components
+
+    Returns
+    -------
+    compound_words : dict
+        Maps each compound word to its components
+    """
+    with open(list_path, mode="r") as cw_f:
+        cw_reader = csv.reader(cw_f)
+        compound_words = {entry[0]:entry[1] for entry in cw_reader}
+
+    return compound_words
+
+@lru_cache(maxsize=None)
+def get_dale_index(list_path=dale_list_path, index_path=None):
+    """
+    Load the detailed Dale-Chall list of familiar words and index each of its
+    columns for constant-time membership checks. The list is only read once
+    per process, and the same index is shared by all the modules using it.
+
+    Parameters
+    ----------
+    list_path : string
+        Location of the detailed Dale-Chall list, with the columns word, stem,
+        lemma_n, lemma_v, lemma_a and lemma_r
+    index_path : string
+        Location of the binary version of the index, see get_headword_index.
+        Default is None, which means the index is only kept in memory.
+
+    Returns
+    -------
+    dale_index : dict
+        Maps each column name to the set of entries in that column
+    """
+    dale_index = None
+
+    if index_path:
+        dale_index = load_index_file(index_path, list_path)
+
+    if dale_index is None:
+        import pandas as pd
+
+        dale_df = pd.read_csv(list_path, header=0)
+
+        # Missing entries never matched a word in the column scans, so these
+        # are left out of the index
+        dale_index = {
+            column: frozenset(dale_df[column].dropna())
+            for column in dale_df.columns
+        }
+
+        if index_path:
+            save_index_file(dale_index, index_path, list_path)
+
+    return dale_index
+
+@lru_cache(maxsize=None)
+def get_dep_marker_pattern(list_path=dep_markers_path):
+    """
+    Load the list of dependent clause markers, compiled into a pattern that
+    matches any text starting with one of the markers
+
+    Parameters
+    ----------
+    list_path : string
+        Location of the comma-separated list of markers
+
+    Returns
+    -------
+    dep_pattern : class 're.Pattern'
+        Pattern matching the start of a dependent clause
+    """
+    with open(list_path, mode="r") as dep_f:
+        dep_markers = dep_f.read().strip().split(",")
+
+    return get_prefix_pattern(tuple(dep_markers))
+
+@lru_cache(maxsize=None)
+def get_headword_index(list_path=headword_list_path, index_path=None):
+    """
+    Load the detailed list of headwords and map the entries of each of its
+    columns to the corresponding headword class. The index is built once per
+    process, and can also be kept in a binary file so that later runs don't
+    need to parse the list again.
+
+    Parameters
+    ----------
+    list_path : string
+        Location of the detailed headword list, with the columns word, stem,
+        lemma_n, lemma_v, lemma_a, lemma_r and hw_class
+    index_path : string
+        Location of the binary version of the index. If the file is missing
+        or was built from a different version of the list, the index is
+        rebuilt from the list and saved here. Default is None, which means
+        the index is only kept in memory.
+
+    Returns
+    -------
+    hw_index : dict
+        Maps each column name to a dictionary of entries and their headword
+        class
+    """
+    hw_index = None
+
+    if index_path:
+        hw_index = load_index_file(index_path, list_path)
+
+    if hw_index is None:
+        import pandas as pd
+
+        hw_df = pd.read_csv(list_path, header=0)
+
+        # Keep the class of the first row where an entry appears, which is
+        # what the row-by-row search returned. The list is sorted by class,
+        # so this is also the lowest class of the entry.
+        hw_index = dict()
+        for column in hw_df.columns.drop("hw_class"):
+            column_index = dict()
+            for entry, hw_class in zip(hw_df[column], hw_df["hw_class"]):
+                if pd.notna(entry) and entry not in column_index:
+                    column_index[entry] = float(hw_class)
+            hw_index[column] = column_index
+
+        if index_path:
+            save_index_file(hw_index, index_path, list_path)
+
+    return hw_index
+
+def get_list_digest(list_path):
+    """
+    Get the SHA-1 digest of a word list, used to tell if a saved index is
+    still up to date
+    """
+    with open(list_path, mode="rb") as list_f:
+        list_digest = hashlib.sha1(list_f.read()).hexdigest()
+
+    return list_digest
+
+@lru_cache(maxsize=None)
+def get_prefix_pattern(prefixes):
+    """
+    Compile a pattern that matches any text starting with one of the given
+    prefixes, which is the same check as str.startswith(prefixes) but done
+    in a single pass over the text
+
+    Parameters
+    ----------
+    prefixes : tuple of strings
+        Prefixes to be matched literally
+
+    Returns
+    -------
+    prefix_pattern : class 're.Pattern'
+        Pattern to be used with match
+    """
+    # Like str.startswith(()), no prefixes match nothing, while an empty
+    # pattern would match everything
+    if not prefixes:
+        return re.compile(r"(?!)")
+
+    prefix_pattern = re.compile("|".join(
+        re.escape(prefix) for prefix in sorted(prefixes, key=len, reverse=True)
+    ))
+
+    return prefix_pattern
+
+@lru_cache(maxsize=None)
+def get_stopwords(list_path=stopwords_path):
+    """
+    Load the comma-separated list of stopwords into a set
+
+    Parameters
+    ----------
+    list_path : string
+        Location of the list of stopwords
+
+    Returns
+    -------
+    stopwords : frozenset
+        Set of stopwords
+    """
+    with open(list_path, mode="r") as sw_f:
+        stopwords = frozenset(sw_f.read().split(","))
+
+    return stopwords
+
+def load_index_file(index_path, list_path):
+    """
+    Load an index saved by save_index_file
+
+    Parameters
+    ----------
+    index_path : string
+        Location of the binary version of the index
+    list_path : string
+        Location of the word list the index was built from
+
+    Returns
+    -------
+    index : dict
+        Saved index, or None if the file is missing or if the word list has
+        changed since the index was saved
+    """
+    index = None
+
+    if isfile(index_path):
+        with open(index_path, mode="rb") as index_f:
+            saved = pickle.load(index_f)
+
+        if saved.get("list_digest") == get_list_digest(list_path):
+            index = saved["index"]
+
+    return index
+
+def save_index_file(index, index_path, list_path):
+    """
+    Save an index in binary format, together with the digest of the word list
+    it was built from
+
+    Parameters
+    ----------
+    index : dict
+        Index to be saved
+    index_path : string
+        Location of the binary version of the index
+    list_path : string
+        Location of the word list the index was built from
+
+    Returns
+    -------
+    None
+    """
+    saved = {"list_digest": get_list_digest(list_path), "index": index}
+
+    with open(index_path, mode="wb") as index_f:
+        pickle.dump(saved, index_f, protocol=pickle.HIGHEST_PROTOCOL)
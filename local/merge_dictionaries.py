@@ -0,0 +1,109 @@
+import argparse
+import re
+
+# Alternative pronunciations are numbered after the word, e.g. "word(1)"
+variant_pattern = re.compile(r"\([0-9]\)")
+
+def merge_dictionaries(dict_paths, merged_path = "merged.dict"):
+    """
+    Merge dictionaries in the format of cmudict.0.7a, reading each of them
+    only once. The pronunciations of each word are gathered from all the
+    dictionaries, without duplicates, and numbered again.
+
+    The merged dictionary is the same as the one written by the original
+    version of merge_dictionaries.sh, run in the C locale: words are sorted
+    by byte value, and so are the pronunciations of each word. A word with a
+    single pronunciation keeps its entry as it is. Otherwise, the first entry
+    is written with the leading and trailing whitespaces removed, and the
+    k-th alternative gets "(k)" before each double space.
+
+    Unlike the script, words are matched literally. The script matched them
+    as regular expressions, so words with characters such as "." or "("
+    were given the pronunciations of other words, or none at all.
+
+    Parameters
+    ----------
+    dict_paths : list of strings
+        Locations of the dictionaries to be merged
+    merged_path : string
+        Location of the merged dictionary. Default is merged.dict
+
+    Returns
+    -------
+    word_count : int
+        Number of words in the merged dictionary
+    """
+    words = set()
+    pronunciations = dict()
+
+    for dict_path in dict_paths:
+        for line in read_lines(dict_path):
+            word, space, rest = line.partition(" ")
+            words.add(variant_pattern.sub("", word))
+
+            # Only entries with a double space after the word are gathered,
+            # and alternatives are also filed under the word without their
+            # variant number
+            if space and rest.startswith(" "):
+                pronunciations.setdefault(word, set()).add(line)
+                if variant_pattern.fullmatch(word[-3:]):
+                    pronunciations.setdefault(word[:-3], set()).add(
+                        variant_pattern.sub("", line)
+                    )
+
+    word_count = 0
+    with open(merged_path, mode="w", encoding="latin-1", newline="") \
+            as merged_f:
+        for word in sorted(words):
+            entries = sorted(pronunciations.get(read_word(word), ()))
+            if entries:
+                word_count += 1
+
+            if len(entries) == 1:
+                merged_f.write(entries[0] + "\n")
+            else:
+                for alt_count, entry in enumerate(entries):
+                    entry = read_word(entry)
+                    if alt_count > 0:
+                        entry = entry.replace("  ", f"({alt_count})  ")
+                    merged_f.write(entry + "\n")
+
+    return word_count
+
+def read_lines(dict_path):
+    """
+    Read the lines of a dictionary without their line breaks. Bytes are
+    mapped one to one to characters, so any encoding is kept as it is and
+    sorting follows byte values.
+    """
+    with open(dict_path, mode="r", encoding="latin-1", newline="") as dict_f:
+        content = dict_f.read()
+
+    lines = content.split("\n")
+    if lines[-1] == "":
+        lines.pop()
+
+    return lines
+
+def read_word(text):
+    """
+    Process a line the way the shell's read builtin does, i.e. remove the
+    leading and trailing blanks and the backslash escapes
+    """
+    text = re.sub(r"\\(.)", r"\1", text.strip(" \t")).rstrip("\\")
+
+    return text
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Merge dictionaries in the format of cmudict.0.7a"
+    )
+    parser.add_argument("dict_paths", nargs="+")
+    parser.add_argument("--output", default="merged.dict")
+    args = parser.parse_args()
+
+    word_count = merge_dictionaries(args.dict_paths, args.output)
+    print(f"Merged the pronunciations of {word_count} words in {args.output}.")
+
+if __name__ == "__main__":
+    main()
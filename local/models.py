@@ -0,0 +1,149 @@
+from functools import lru_cache
+
+# Each model is loaded on first use and then shared by all the modules of the
+# process. The libraries themselves are also only imported on first use, so
+# scripts that never need a model don't pay for importing it.
+
+# Pipes not needed to find named entities, left out of the NER pass
+ner_disabled_pipes = ["tagger", "parser", "attribute_ruler", "lemmatizer"]
+
+def compare_entity_labels(nlp, tagged_tokens, entity_labels):
+    """
+    Compare the proper noun decisions made with the batched NER pass against
+    the ones made by running NER on each proper noun by itself
+
+    Parameters
+    ----------
+    nlp : spaCy pipeline
+        Pipeline used for NER
+    tagged_tokens : iterable of tuples
+        (word, pos) of each token of the text, as tagged by NLTK
+    entity_labels : dict
+        Labels found by the batched NER pass, see get_entity_labels
+
+    Returns
+    -------
+    divergences : list of tuples
+        (word, word_label, batch_label) for each proper noun where only one
+        of the two approaches finds a PERSON or GPE entity. A label is None
+        if no entity was found.
+    """
+    divergences = []
+
+    for word, word_pos in tagged_tokens:
+        if word_pos == "NNP":
+            word_ents = [ent.label_ for ent in nlp(word).ents]
+            word_label = word_ents[0] if word_ents else None
+            batch_label = entity_labels.get(word)
+
+            if (
+                (word_label in ["PERSON", "GPE"]) !=
+                (batch_label in ["PERSON", "GPE"])
+            ):
+                divergences.append((word, word_label, batch_label))
+
+    return divergences
+
+@lru_cache(maxsize=None)
+def get_enchant_dict(language="en_US"):
+    """
+    Load the Enchant spelling dictionary of a language
+    """
+    import enchant
+
+    return enchant.Dict(language)
+
+def get_entity_labels(nlp, sentences):
+    """
+    Find the named entities in a text by running NER on all of its sentences
+    in one batch
+
+    The labels are looked up with the tokens of NLTK's word_tokenize, which
+    doesn't always split the text the way spaCy does. Each entity is filed
+    under its spaCy tokens, and also under its whitespace-separated parts
+    with and without a final period, e.g. "Jean-Paul" (split by spaCy but not
+    by NLTK) and "U.S" (NLTK's token for "U.S." at the end of a sentence).
+    Tokens that NLTK splits further than spaCy, e.g. "Obama's", are only
+    found if the part NLTK looks up is also a spaCy token.
+
+    Parameters
+    ----------
+    nlp : spaCy pipeline
+        Pipeline used for NER
+    sentences : list of strings
+        Sentences of the text to be processed
+
+    Returns
+    -------
+    entity_labels : dict
+        Maps each token that is part of a named entity to the label of the
+        entity. If a token is found in several entities, the label of the
+        first one is kept.
+    """
+    entity_labels = dict()
+
+    for sent_doc in nlp.pipe(sentences, disable=ner_disabled_pipes):
+        for ent in sent_doc.ents:
+            parts = ent.text.split()
+            for token_text in (
+                [token.text for token in ent] + parts +
+                [part.rstrip(".") for part in parts]
+            ):
+                if token_text:
+                    entity_labels.setdefault(token_text, ent.label_)
+
+    return entity_labels
+
+@lru_cache(maxsize=None)
+def get_lemmatizer():
+    """
+    Load NLTK's WordNet lemmatizer
+    """
+    from nltk.stem import WordNetLemmatizer
+
+    return WordNetLemmatizer()
+
+@lru_cache(maxsize=None)
+def get_pos_tagger():
+    """
+    Get NLTK's POS tagger, i.e. nltk.pos_tag
+    """
+    from nltk import pos_tag
+
+    return pos_tag
+
+@lru_cache(maxsize=None)
+def get_sent_tokenizer():
+    """
+    Get NLTK's sentence tokenizer, i.e. nltk.tokenize.sent_tokenize
+    """
+    from nltk.tokenize import sent_tokenize
+
+    return sent_tokenize
+
+@lru_cache(maxsize=None)
+def get_spacy_model(model_name):
+    """
+    Load a spaCy pipeline, e.g. 'en_core_web_sm'
+    """
+    import spacy
+
+    return spacy.load(model_name)
+
+@lru_cache(maxsize=None)
+def get_stemmer():
+    """
+    Load NLTK's Porter stemmer
+    """
+    from nltk.stem import PorterStemmer
+
+    return PorterStemmer()
+
+@lru_cache(maxsize=None)
+def get_word_tokenizer():
+    """
+    Get NLTK's word tokenizer, i.e. nltk.tokenize.word_tokenize
+    """
+    from nltk.tokenize import word_tokenize
+
+    return word_tokenize
@@ -1,12 +1,15 @@
+import argparse
 import csv
-import enchant
-import re
+import json
+import lexicons as lex
+import models as md
+import multiprocessing as mp
+import os
 
-from nltk import pos_tag
-from nltk.corpus import words
-from nltk.corpus import wordnet as wn
-from nltk.stem import PorterStemmer,WordNetLemmatizer
-from os.path import join
+from bisect import bisect_left
+from functools import lru_cache
+from generate_dictionary import remove_partial_line
+from os.path import abspath, basename, dirname, isfile, join, splitext
 
 prefixes_path = "local/resources/wordlists/en_prefixes.txt"
 pre_f = open(prefixes_path, "r")
@@ -16,17 +19,183 @@ try:
 finally:
     pre_f.close()
 
-en_dict = enchant.Dict("en_US")
-lemmatizer = WordNetLemmatizer()
-porter = PorterStemmer()
+# The spelling dictionary, lemmatizer, stemmer and list of known roots are
+# loaded on first use. Stems and lemmas are kept for the most recent words.
+cache_size = 65536
 
-whitelist = list(wn.words()) + words.words()
+# Columns of the detailed word lists, followed by the other fields of the
+# source lists, e.g. the headword class of the BNC-COCA list
+detailed_columns = ["word", "stem", "lemma_n", "lemma_v", "lemma_a", "lemma_r"]
 
+# Entries enriched so far by build_detailed_list, kept out of the word lists
+checkpoint_dir = "data/cache"
+
+def build_detailed_list(
+    list_path,
+    new_list_path,
+    workers = 1,
+    chunksize = 64,
+    checkpoint_path = None,
+    index_path = None
+):
+    """
+    Build a detailed word list, with the stem and lemmas of each word, from a
+    list of words such as dale-chall.txt or bnc-coca_master-list.csv.
+
+    Each enriched entry is appended to a checkpoint as soon as it is ready,
+    so an interrupted build resumes where it stopped. The checkpoint is kept
+    afterwards, so rebuilding the list only enriches the entries that were
+    added or changed in the source list since the last build.
+
+    Parameters
+    ----------
+    list_path : string
+        Location of the source list, with one entry per line: a word,
+        optionally followed by comma-separated fields such as its headword
+        class
+    new_list_path : string
+        Location of the detailed list, in CSV format with a header row
+    workers : int
+        Number of worker processes. Default is 1
+    chunksize : int
+        Number of entries sent to a worker at a time. Default is 64
+    checkpoint_path : string
+        Location of the checkpoint, in JSON Lines format. Default is None,
+        which means the one given by get_checkpoint_path
+    index_path : string
+        Location of a binary index of the detailed list to be saved, see
+        lexicons.get_headword_index and lexicons.get_dale_index. Default is
+        None, which means no index is saved.
+
+    Returns
+    -------
+    new_count : int
+        Number of entries enriched, i.e. not found in the checkpoint
+    """
+    if checkpoint_path is None:
+        checkpoint_path = get_checkpoint_path(new_list_path)
+
+    with open(list_path, mode = "r") as list_f:
+        entries = [entry.strip() for entry in list_f if entry.strip()]
+
+    rows = load_checkpoint(checkpoint_path)
+    missing = list(dict.fromkeys(
+        entry for entry in entries if entry not in rows
+    ))
+    print(
+        f"Found {len(entries) - len(missing)} of {len(entries)} entries in "
+        f"the checkpoint."
+    )
+
+    # Drop the last line of an interrupted build before appending to it
+    os.makedirs(dirname(abspath(checkpoint_path)), exist_ok = True)
+    remove_partial_line(checkpoint_path)
+    with open(checkpoint_path, mode = "a") as checkpoint_f:
+        for entry, row in zip(missing, iter_enriched_entries(
+            missing, workers, chunksize
+        )):
+            rows[entry] = row
+            checkpoint_f.write(json.dumps([entry, row]) + "\n")
+            checkpoint_f.flush()
+
+    # Leave out the entries no longer in the source list
+    save_checkpoint(checkpoint_path, {entry: rows[entry] for entry in entries})
+
+    extra_count = len(entries[0].split(",")) - 1 if entries else 0
+    columns = detailed_columns + ["hw_class"] * min(extra_count, 1)
+    columns += [f"field_{index}" for index in range(2, extra_count + 1)]
+
+    temp_path = new_list_path + ".tmp"
+    with open(temp_path, mode = "w", newline = "") as new_list_f:
+        entry_writer = csv.writer(new_list_f, delimiter=',')
+        entry_writer.writerow(columns)
+        entry_writer.writerows(rows[entry] for entry in entries)
+    os.replace(temp_path, new_list_path)
+
+    if index_path:
+        if "hw_class" in columns:
+            lex.get_headword_index(new_list_path, index_path)
+        else:
+            lex.get_dale_index(new_list_path, index_path)
+
+    return len(missing)
+
+@lru_cache(maxsize=None)
+def compile_prefixes(prefixes):
+    """
+    Prepare a list of prefixes for remove_prefix
+
+    Parameters
+    ----------
+    prefixes : tuple of strings
+        Prefixes to be removed
+
+    Returns
+    -------
+    prefix_order : dict
+        Maps each prefix to its positions in the order the prefixes are
+        tried, i.e. from the longest to the shortest prefix
+    prefix_lengths : list of ints
+        Distinct lengths of the prefixes
+    """
+    prefix_order = dict()
+    for index, prefix in enumerate(sorted(prefixes, key=len, reverse=True)):
+        prefix_order.setdefault(prefix, []).append(index)
+
+    prefix_lengths = sorted(set(len(prefix) for prefix in prefix_order))
+
+    return prefix_order, prefix_lengths
+
+def enrich_entry(entry):
+    """
+    Add the stem and lemmas of the word of a list entry. Words unknown to the
+    spelling dictionary are replaced by the first suggestion, i.e. American
+    English spelling rules are used.
+
+    Parameters
+    ----------
+    entry : string
+        Word, optionally followed by comma-separated fields
+
+    Returns
+    -------
+    row : list of strings
+        Word, stem, noun, verb, adjective and adverb lemmas, followed by the
+        other fields of the entry
+    """
+    word, *fields = entry.strip().lower().split(",")
+    en_dict = md.get_enchant_dict("en_US")
+
+    if not en_dict.check(word):
+        # Use American English spelling rules
+        word = en_dict.suggest(word)[0].lower()
+
+    word_lemma_n = get_lemma(word, "n")
+    word_lemma_v = get_lemma(word, "v")
+    word_lemma_a = get_lemma(word, "a")
+    word_lemma_r = get_lemma(word, "r")
+    word_stem = get_stem(word)
+    row = [word, word_stem, word_lemma_n, word_lemma_v,
+           word_lemma_a, word_lemma_r] + fields
+
+    return row
+
+def get_checkpoint_path(new_list_path):
+    """
+    Get the default checkpoint of a detailed list, e.g.
+    data/cache/dale-chall-detailed-checkpoint.jsonl
+    """
+    list_name = splitext(basename(new_list_path))[0]
+    checkpoint_path = join(checkpoint_dir, list_name + "-checkpoint.jsonl")
+
+    return checkpoint_path
+
+@lru_cache(maxsize=cache_size)
 def get_lemma(word, raw_pos_tag):
     word_lemma = ""
 
     word_pos_tag = get_pos_tag_for_lemmatizer(raw_pos_tag)
-    word_lemma = lemmatizer.lemmatize(word, pos=word_pos_tag)
+    word_lemma = md.get_lemmatizer().lemmatize(word, pos=word_pos_tag)
 
     return word_lemma
 
@@ -46,23 +215,144 @@ def get_pos_tag_for_lemmatizer(raw_pos_tag):
 
 def get_stem(word, prefixes=en_prefixes):
 
-    word_stem = porter.stem(remove_prefix(word, prefixes, whitelist))
+    word_stem = stem_word(word, tuple(prefixes))
 
     return word_stem
 
+@lru_cache(maxsize=None)
+def get_whitelist():
+    """
+    Get the words of WordNet and of NLTK's word list, which are the roots
+    accepted when removing prefixes
+    """
+    from nltk.corpus import words
+    from nltk.corpus import wordnet as wn
+
+    whitelist = frozenset(wn.words()).union(words.words())
+
+    return whitelist
+
+def iter_enriched_entries(entries, workers = 1, chunksize = 64):
+    """
+    Enrich a set of list entries with enrich_entry, keeping their order
+
+    Parameters
+    ----------
+    entries : list of strings
+        Entries to be enriched
+    workers : int
+        Number of worker processes. Default is 1
+    chunksize : int
+        Number of entries sent to a worker at a time. Default is 64
+
+    Yields
+    ------
+    row : list of strings
+        Enriched version of each entry
+    """
+    if workers > 1 and len(entries) > chunksize:
+        # Each worker loads the spelling dictionary, lemmatizer and roots once
+        with mp.get_context("spawn").Pool(processes=workers) as pool:
+            yield from pool.imap(enrich_entry, entries, chunksize)
+    else:
+        for entry in entries:
+            yield enrich_entry(entry)
+
+def load_checkpoint(checkpoint_path):
+    """
+    Load the entries enriched by previous builds, see build_detailed_list
+
+    Parameters
+    ----------
+    checkpoint_path : string
+        Location of the checkpoint
+
+    Returns
+    -------
+    rows : dict
+        Maps each source entry to its enriched version
+    """
+    rows = dict()
+
+    if isfile(checkpoint_path):
+        with open(checkpoint_path, mode = "r") as checkpoint_f:
+            for line in checkpoint_f:
+                try:
+                    entry, row = json.loads(line)
+                except ValueError:
+                    # Last line of an interrupted build
+                    continue
+                rows[entry] = row
+
+    return rows
+
 def remove_prefix(word, prefixes, roots):
 
     original_word = word
+    prefix_order, prefix_lengths = compile_prefixes(tuple(prefixes))
+
+    # Prefixes are tried from the longest to the shortest, and each one found
+    # at the start of the word is removed before trying the next ones. The
+    # next prefix to remove is the first one in that order, after the last
+    # prefix removed, that the word starts with.
+    next_index = 0
+    while True:
+        found = []
+        for length in prefix_lengths:
+            if length > len(word):
+                break
+            indices = prefix_order.get(word[:length], [])
+            position = bisect_left(indices, next_index)
+            if position < len(indices):
+                found.append((indices[position], length))
+        if not found:
+            break
+
+        prefix_index, prefix_length = min(found)
 
-    for prefix in sorted(prefixes, key=len, reverse=True):
-        # Use subn to track the no. of substitution made.
         # Allow dash in between prefix and root.
-        word, nsub = re.subn("^{}[\-]?".format(prefix), "", word)
-        if nsub > 0 and word in roots:
+        word = word[prefix_length:]
+        if word.startswith("-"):
+            word = word[1:]
+        if word in roots:
             return word
 
+        next_index = prefix_index + 1
+
     return original_word
 
+def save_checkpoint(checkpoint_path, rows):
+    """
+    Replace a checkpoint with a set of enriched entries
+
+    Parameters
+    ----------
+    checkpoint_path : string
+        Location of the checkpoint
+    rows : dict
+        Maps each source entry to its enriched version
+
+    Returns
+    -------
+    None
+    """
+    temp_path = checkpoint_path + ".tmp"
+    with open(temp_path, mode = "w") as checkpoint_f:
+        for entry, row in rows.items():
+            checkpoint_f.write(json.dumps([entry, row]) + "\n")
+    os.replace(temp_path, checkpoint_path)
+
+@lru_cache(maxsize=cache_size)
+def stem_word(word, prefixes):
+    """
+    Stem a word after removing its prefixes, see get_stem
+    """
+    word_stem = md.get_stemmer().stem(
+        remove_prefix(word, prefixes, get_whitelist())
+    )
+
+    return word_stem
+
 def main():
     list_dir = "local/resources/wordlists"
     # list_file = "bnc-coca_master-list.csv"
@@ -70,34 +360,38 @@ def main():
     # new_list_file = "bnc-coca_master-list-detailed.csv"
     new_list_file = "dale-chall-detailed.csv"
 
-    list_path = join(list_dir, list_file)
-    new_list_path = join(list_dir, new_list_file)
+    parser = argparse.ArgumentParser(
+        description="Add the stems and lemmas of the words of a word list"
+    )
+    parser.add_argument("--list", default=join(list_dir, list_file))
+    parser.add_argument("--output", default=join(list_dir, new_list_file))
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--chunksize", type=int, default=64)
+    parser.add_argument(
+        "--checkpoint", default=None,
+        help="entries enriched so far, reused by later builds"
+    )
+    parser.add_argument(
+        "--index", default=None,
+        help="location of a binary index of the detailed list to be saved"
+    )
+    parser.add_argument(
+        "--rebuild", action="store_true",
+        help="enrich all the entries again, ignoring the checkpoint"
+    )
+    args = parser.parse_args()
 
-    with open(list_path, mode = "r") as list_f, \
-         open(new_list_path, mode = "w") as new_list_f:
-        entry_writer = csv.writer(new_list_f, delimiter=',')
+    checkpoint_path = args.checkpoint
+    if checkpoint_path is None:
+        checkpoint_path = get_checkpoint_path(args.output)
+    if args.rebuild and isfile(checkpoint_path):
+        os.remove(checkpoint_path)
 
-        for entry in list_f:
-            # word,headword_class = entry.strip().lower().split(",")
-            word = entry.strip().lower()
-
-            if not en_dict.check(word):
-                # Use American English spelling rules
-                word = en_dict.suggest(word)[0].lower()
-
-            # raw_pos_tag = pos_tag([word])[0][1]
-            # word_lemma = get_lemma(word, raw_pos_tag)
-            word_lemma_n = get_lemma(word, "n")
-            word_lemma_v = get_lemma(word, "v")
-            word_lemma_a = get_lemma(word, "a")
-            word_lemma_r = get_lemma(word, "r")
-            word_stem = get_stem(word)
-            # entry = [word, word_stem, word_lemma_n, word_lemma_v, 
-            #          word_lemma_a, word_lemma_r, headword_class]
-            entry = [word, word_stem, word_lemma_n, word_lemma_v, 
-                     word_lemma_a, word_lemma_r]
-
-            entry_writer.writerow(entry)
+    new_count = build_detailed_list(
+        args.list, args.output, args.workers, args.chunksize,
+        checkpoint_path, args.index
+    )
+    print(f"DONE. Enriched {new_count} entries, saved in {args.output}.")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,168 @@
+import hashlib
+import os
+import sqlite3
+
+from functools import lru_cache
+from os import makedirs
+from os.path import abspath, dirname, getmtime, getsize, isfile, join
+
+# Model used by all the scripts, from ottokart's punctuator2
+# (https://github.com/ottokart/punctuator2)
+default_model_file = 'Demo-Europarl-EN.pcl'
+
+# Punctuator models and store connections, opened on first use
+punctuators = dict()
+store_conns = dict()
+
+def get_key(text, model_digest):
+    key_source = model_digest + "\n" + text
+
+    return hashlib.sha256(key_source.encode("utf-8")).hexdigest()
+
+def get_model_digest(model_file=default_model_file):
+    """
+    Digest of the contents of a punctuator model, so that stored outputs are
+    not reused after the model is replaced, e.g. retrained under the same
+    name. The model file name is used if the model can't be found.
+    """
+    model_path = get_model_path(model_file)
+    if not isfile(model_path):
+        return model_file
+
+    return hash_file(model_path, getmtime(model_path), getsize(model_path))
+
+def get_model_path(model_file=default_model_file):
+    """
+    Find a punctuator model the way punctuator2 does, i.e. as a path or in
+    the punctuator data directory, without loading punctuator2. The model
+    file name is returned as it is if the model can't be found.
+    """
+    if isfile(model_file):
+        return model_file
+
+    data_dir = os.path.expanduser(
+        os.environ.get("PUNCTUATOR_DATA_DIR", "~/.punctuator")
+    )
+    model_path = join(data_dir, model_file)
+    if isfile(model_path):
+        return model_path
+
+    return model_file
+
+def get_punctuator(model_file=default_model_file):
+    """
+    Load a punctuator model, only once per process
+    """
+    if model_file not in punctuators:
+        from punctuator import Punctuator
+        punctuators[model_file] = Punctuator(model_file)
+
+    return punctuators[model_file]
+
+def get_store(store_path):
+    """
+    Open the store of punctuated texts, only once per process
+    """
+    if store_path not in store_conns:
+        makedirs(dirname(abspath(store_path)), exist_ok=True)
+
+        conn = sqlite3.connect(store_path, timeout=60)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS punctuations ("
+            "key TEXT PRIMARY KEY, model TEXT, output TEXT)"
+        )
+        store_conns[store_path] = conn
+
+    return store_conns[store_path]
+
+@lru_cache(maxsize=None)
+def hash_file(file_path, mtime, size):
+    """
+    Hash a file, once per process unless it is modified
+    """
+    file_hash = hashlib.sha256()
+
+    with open(file_path, mode="rb") as file_f:
+        for block in iter(lambda: file_f.read(1 << 20), b""):
+            file_hash.update(block)
+
+    return file_hash.hexdigest()
+
+def punctuate(text, model_file=default_model_file, store_path=None):
+    """
+    Punctuate a text with punctuator2, reusing the output stored for the same
+    text and model if a store is given
+
+    Parameters
+    ----------
+    text : string
+        Unpunctuated text, passed as is to the punctuator
+    model_file : string
+        Punctuator model to be used. Default is the Europarl English model
+    store_path : string
+        Location of the store of punctuated texts, see punctuate_texts.
+        Default is None, which means no store is used.
+
+    Returns
+    -------
+    punctuated_text : string
+        Punctuated version of the text
+    """
+    punctuated_text = punctuate_texts([text], model_file, store_path)[0]
+
+    return punctuated_text
+
+def punctuate_texts(texts, model_file=default_model_file, store_path=None):
+    """
+    Punctuate several texts with punctuator2, each distinct text only once.
+    With a store, outputs already in it are reused, and the new outputs are
+    saved to it together. The model is only loaded if some text is missing
+    from the store. Stored outputs are tied to the contents of the model, not
+    to its file name.
+
+    Parameters
+    ----------
+    texts : list of strings
+        Unpunctuated texts, passed as is to the punctuator
+    model_file : string
+        Punctuator model to be used. Default is the Europarl English model
+    store_path : string
+        Location of the store of punctuated texts, e.g.
+        data/cache/punctuator.sqlite. Default is None, which means no store is
+        used.
+
+    Returns
+    -------
+    punctuated_texts : list of strings
+        Punctuated version of each text, in the same order as the texts
+    """
+    model_digest = get_model_digest(model_file)
+    keys = [get_key(text, model_digest) for text in texts]
+    outputs = dict()
+
+    conn = None
+    if store_path:
+        conn = get_store(store_path)
+        for key in set(keys):
+            entry = conn.execute(
+                "SELECT output FROM punctuations WHERE key = ?", (key,)
+            ).fetchone()
+            if entry:
+                outputs[key] = entry[0]
+
+    new_entries = []
+    for key, text in zip(keys, texts):
+        if key not in outputs:
+            outputs[key] = get_punctuator(model_file).punctuate(text)
+            new_entries.append((key, model_file, outputs[key]))
+
+    if conn and new_entries:
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO punctuations VALUES (?, ?, ?)",
+                new_entries
+            )
+
+    punctuated_texts = [outputs[key] for key in keys]
+
+    return punctuated_texts
@@ -0,0 +1,309 @@
+import numpy as np
+import pandas as pd
+
+from os.path import join
+
+# Coefficients of each formula, as used in compute_readability
+default_coefficients = dict({
+    'dcr': dict({
+        'sent_len': 0.0496,
+        'dale_score': 0.1579,
+        'adjustment': 3.6365,
+        'cutoff': 0.05
+    }),
+    'fkgl': dict({
+        'sent_len': 0.39,
+        'word_len': 11.8,
+        'constant': -15.59
+    }),
+    'fre': dict({
+        'constant': 206.835,
+        'word_len': 84.6,
+        'sent_len': 1.015
+    }),
+    'lw': dict({
+        'sentence': 3.0,
+        'sample_size': 100
+    }),
+    'mer': dict()
+})
+
+# Counts needed by each formula, named as in the text statistics files
+formula_counts = dict({
+    'dcr': ["word_count", "sent_count", "not_in_dale_count"],
+    'fkgl': ["word_count", "sent_count", "syll_count"],
+    'fre': ["word_count", "sent_count", "syll_count"],
+    'lw': ["word_count", "sent_count", "monosyll_count"],
+    'mer': ["word_count", "sent_count", "miniw_count"]
+})
+
+def compute_scores_from_counts(
+    counts,
+    formulas = None,
+    coefficients = None,
+    count_names = None
+):
+    """
+    Compute readability scores for a whole corpus at once from the counts of
+    each document (or sample), without processing the texts again
+
+    Parameters
+    ----------
+    counts : DataFrame, dict or numpy array
+        Counts of each document, with the columns named as in the text
+        statistics files (e.g. data/voa/text_statistics-voa.csv). A 2D numpy
+        array needs count_names to name its columns.
+    formulas : list of strings
+        Formulas to be computed, from 'dcr', 'fkgl', 'fre', 'lw' and 'mer'.
+        Default is None, which means all the formulas whose counts are
+        available, except 'lw'. LW is only valid on 100-word samples, so it
+        has to be asked for explicitly, with the counts of such samples.
+    coefficients : dict
+        Coefficients replacing the default ones, e.g.
+        {'fre': {'constant': 200.0}}. Coefficients not given keep their
+        default values.
+    count_names : list of strings
+        Names of the columns of counts, if it is a 2D numpy array. The fields
+        of a structured or record array are used as they are.
+
+    Returns
+    -------
+    scores : DataFrame
+        One column per formula and one row per document, with the same index
+        as counts if it is a DataFrame
+    """
+    index = None
+
+    if isinstance(counts, pd.DataFrame):
+        index = counts.index
+    elif isinstance(counts, np.ndarray):
+        if counts.dtype.names is not None:
+            counts = {name: counts[name] for name in counts.dtype.names}
+        elif count_names is None:
+            raise ValueError(
+                "count_names is needed to name the columns of a numpy array."
+            )
+        else:
+            counts = dict(zip(count_names, np.atleast_2d(counts).T))
+
+    if formulas is None:
+        available = set(counts.keys())
+        formulas = [
+            formula for formula, names in formula_counts.items()
+            if formula != "lw" and available.issuperset(names)
+        ]
+
+    formula_functions = dict({
+        'dcr': dale_chall_from_counts,
+        'fkgl': flesch_kincaid_from_counts,
+        'fre': flesch_reading_ease_from_counts,
+        'lw': lensear_write_from_counts,
+        'mer': mcalpine_eflaw_from_counts
+    })
+
+    scores = dict()
+    for formula in formulas:
+        formula_coefficients = dict(default_coefficients[formula])
+        if coefficients:
+            formula_coefficients.update(coefficients.get(formula, dict()))
+
+        formula_args = [
+            np.asarray(counts[name], dtype=float)
+            for name in formula_counts[formula]
+        ]
+        scores[formula] = formula_functions[formula](
+            *formula_args, **formula_coefficients
+        )
+
+    return pd.DataFrame(scores, index=index)
+
+def dale_chall_from_counts(
+    word_count,
+    sent_count,
+    not_in_dale_count,
+    sent_len = 0.0496,
+    dale_score = 0.1579,
+    adjustment = 3.6365,
+    cutoff = 0.05
+):
+    """
+    Dale-Chall Readability (DCR) scores, computed as in
+    compute_readability.dale_chall_readability_raw
+
+    Parameters
+    ----------
+    word_count, sent_count, not_in_dale_count : numpy arrays
+        Number of words, sentences and words missing from the Dale-Chall list
+        of each document
+    sent_len, dale_score : float
+        Weights of the average sentence length and of the percentage of words
+        missing from the Dale-Chall list
+    adjustment : float
+        Added to the score when the percentage of missing words is above the
+        cut-off
+    cutoff : float
+        Percentage of missing words above which the adjustment is added
+
+    Returns
+    -------
+    scores : numpy array
+        DCR score of each document
+    """
+    ave_sent_len = word_count / sent_count
+    dale_percent = not_in_dale_count * 100 / word_count
+
+    scores = (sent_len * ave_sent_len) + (dale_score * dale_percent)
+    scores = np.where(dale_percent > cutoff, scores + adjustment, scores)
+
+    return scores
+
+def flesch_kincaid_from_counts(
+    word_count,
+    sent_count,
+    syll_count,
+    sent_len = 0.39,
+    word_len = 11.8,
+    constant = -15.59
+):
+    """
+    Flesch-Kincaid Grade Level (FKGL) scores, computed as in
+    compute_readability.flesch_kincaid_grade_level
+
+    Parameters
+    ----------
+    word_count, sent_count, syll_count : numpy arrays
+        Number of words, sentences and syllables of each document
+    sent_len, word_len : float
+        Weights of the average sentence length and of the average word length
+    constant : float
+        Constant term of the formula
+
+    Returns
+    -------
+    scores : numpy array
+        FKGL score of each document
+    """
+    ave_sent_len = word_count / sent_count
+    ave_word_len = syll_count / word_count
+
+    scores = (sent_len * ave_sent_len) + (word_len * ave_word_len) + constant
+
+    return scores
+
+def flesch_reading_ease_from_counts(
+    word_count,
+    sent_count,
+    syll_count,
+    constant = 206.835,
+    word_len = 84.6,
+    sent_len = 1.015
+):
+    """
+    Flesch Reading Ease (FRE) scores, computed as in
+    compute_readability.flesch_reading_ease
+
+    Parameters
+    ----------
+    word_count, sent_count, syll_count : numpy arrays
+        Number of words, sentences and syllables of each document
+    constant : float
+        Constant term of the formula
+    word_len, sent_len : float
+        Weights of the average word length and of the average sentence length
+
+    Returns
+    -------
+    scores : numpy array
+        FRE score of each document
+    """
+    ave_sent_len = word_count / sent_count
+    ave_word_len = syll_count / word_count
+
+    scores = constant - (word_len * ave_word_len) - (sent_len * ave_sent_len)
+
+    return scores
+
+def lensear_write_from_counts(
+    word_count,
+    sent_count,
+    monosyll_count,
+    sentence = 3.0,
+    sample_size = 100
+):
+    """
+    Lensear Write (LW) scores, computed as in compute_readability.lensear_write.
+    The counts must be taken from the LW sample of each document, i.e. its
+    first 100 words, with the one-syllable words counted without "the", "is",
+    "are", "was" and "were".
+
+    Parameters
+    ----------
+    word_count, sent_count, monosyll_count : numpy arrays
+        Number of words, sentences and one-syllable words of each sample
+    sentence : float
+        Points given for each sentence
+    sample_size : int
+        Number of words in a full sample. Scores of shorter samples are scaled
+        up to this size.
+
+    Returns
+    -------
+    scores : numpy array
+        LW score of each document
+    """
+    scores = monosyll_count + (sentence * sent_count)
+    scores = np.where(
+        word_count < sample_size,
+        scores * (float(sample_size) / word_count),
+        scores
+    )
+
+    return scores
+
+def mcalpine_eflaw_from_counts(word_count, sent_count, miniw_count):
+    """
+    McAlpine EFLAW readability (MER) scores, computed as in textstat, without
+    rounding
+
+    Parameters
+    ----------
+    word_count, sent_count, miniw_count : numpy arrays
+        Number of words, sentences and words of at most 3 letters of each
+        document
+
+    Returns
+    -------
+    scores : numpy array
+        MER score of each document, 0.0 for documents without sentences
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scores = (word_count + miniw_count) / sent_count
+
+    scores = np.where(sent_count == 0, 0.0, scores)
+
+    return scores
+
+def run_voa_example():
+    """
+    Sample run with the text statistics of the VOA Learning English materials
+    """
+    data_name = "voa"
+
+    main_dir = join("data", data_name)
+    counts_path = join(main_dir, f"text_statistics-{data_name}.csv")
+    scores_path = join(main_dir, f"formula_scores-{data_name}.csv")
+
+    counts = pd.read_csv(counts_path, header=0, index_col="id")
+
+    # The whole-text counts are not the LW sample counts, so LW is left out
+    scores = compute_scores_from_counts(
+        counts, formulas=["dcr", "fkgl", "fre", "mer"]
+    )
+    scores.to_csv(scores_path)
+    print("DONE. Scores saved in %s." % scores_path)
+
+def main():
+    run_voa_example()
+
+if __name__ == "__main__":
+    main()
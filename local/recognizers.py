@@ -0,0 +1,354 @@
+import abc
+import shlex
+import speech_recognition as sr
+import subprocess
+import tempfile
+import threading
+import time
+import zlib
+
+from os.path import abspath, dirname, join
+
+# Kaldi recipe with the ASpIRE chain model, see local/kaldi/aspire/s5/run_voa.sh
+kaldi_recipe_dir = join(dirname(abspath(__file__)), "kaldi/aspire/s5")
+
+class RecognizerBackend(abc.ABC):
+    """
+    Speech recognition backend driven by transcribe_speech. A backend
+    recognizes audio data one item at a time with recognize, or several at
+    once with recognize_batch, whose default implementation calls recognize on
+    each item. Backends with a high cost per call, e.g. loading a model,
+    override recognize_batch and set batch_size to the number of items they
+    should be given at a time.
+
+    Backends are shared by the recognition threads, so they must be
+    thread-safe. Subclasses must implement recognize.
+
+    """
+
+    batch_size = 1
+
+    @abc.abstractmethod
+    def recognize(self, speech_data):
+        """
+        Recognize audio data
+
+        Parameters
+        ----------
+        speech_data : class 'speech_recognition.AudioData'
+            Audio data to be recognized
+
+        Returns
+        -------
+        hypothesis : string
+            Recognizer's hypothesis
+
+        Raises
+        ------
+        speech_recognition.UnknownValueError
+            If the speech is unintelligible
+        speech_recognition.RequestError
+            If the recognizer failed, and can be tried again
+        """
+        raise NotImplementedError
+
+    def recognize_batch(self, speech_data_list):
+        """
+        Recognize several items of audio data
+
+        Parameters
+        ----------
+        speech_data_list : list of class 'speech_recognition.AudioData'
+            Audio data to be recognized
+
+        Returns
+        -------
+        hypotheses : list of strings
+            Recognizer's hypothesis of each item, or None for the items whose
+            speech is unintelligible
+
+        Raises
+        ------
+        speech_recognition.RequestError
+            If the recognizer failed, and can be tried again
+        """
+        hypotheses = []
+
+        for speech_data in speech_data_list:
+            try:
+                hypotheses.append(self.recognize(speech_data))
+            except sr.UnknownValueError:
+                hypotheses.append(None)
+
+        return hypotheses
+
+class FakeRecognizer(RecognizerBackend):
+    """
+    Deterministic stand-in for a recognition backend, for running and
+    benchmarking the pipeline offline. The hypothesis only depends on the
+    audio data, and the time taken by a real backend can be simulated.
+
+    Parameters
+    ----------
+    latency : float
+        Time taken to recognize each item, in seconds. Default is 0.0
+    batch_latency : float
+        Time taken by each call, e.g. to load a model, in seconds. Default is
+        0.0
+    batch_size : int
+        Number of items the backend should be given at a time. Default is 1
+
+    """
+
+    def __init__(self, latency=0.0, batch_latency=0.0, batch_size=1):
+        self.latency = latency
+        self.batch_latency = batch_latency
+        self.batch_size = batch_size
+
+    def get_hypothesis(self, speech_data):
+        frame_count = len(speech_data.frame_data) // speech_data.sample_width
+        seconds = frame_count / speech_data.sample_rate
+        checksum = zlib.crc32(speech_data.frame_data)
+
+        return f"fake hypothesis {checksum:08x} of {seconds:.2f} seconds"
+
+    def recognize(self, speech_data):
+        time.sleep(self.batch_latency + self.latency)
+
+        return self.get_hypothesis(speech_data)
+
+    def recognize_batch(self, speech_data_list):
+        time.sleep(self.batch_latency + self.latency * len(speech_data_list))
+
+        return [
+            self.get_hypothesis(speech_data)
+            for speech_data in speech_data_list
+        ]
+
+class KaldiRecognizer(RecognizerBackend):
+    """
+    Offline recognition with Kaldi's online2-wav-nnet3-latgen-faster and the
+    ASpIRE chain model, with the same settings as the Kaldi recipe in
+    local/kaldi/aspire/s5 (see run_voa.sh). Each batch is decoded by one run
+    of the decoder, so the model is loaded once per batch.
+
+    Parameters
+    ----------
+    recipe_dir : string
+        Directory of the Kaldi recipe, with its path.sh, model and graph
+    model_dir : string
+        Online decoding directory of the model, relative to recipe_dir
+    graph_dir : string
+        Decoding graph, relative to recipe_dir. Default is None, which means
+        the graph_pp directory of model_dir
+    sample_rate : int
+        Sample rate expected by the model. Audio data is resampled to it.
+        Default is 8000 Hz
+    batch_size : int
+        Number of items decoded by each run of the decoder. Default is 64
+
+    """
+
+    def __init__(
+        self,
+        recipe_dir = kaldi_recipe_dir,
+        model_dir = "exp/tdnn_7b_chain_online",
+        graph_dir = None,
+        sample_rate = 8000,
+        batch_size = 64
+    ):
+        self.recipe_dir = recipe_dir
+        self.model_dir = model_dir
+        self.graph_dir = graph_dir or join(model_dir, "graph_pp")
+        self.sample_rate = sample_rate
+        self.batch_size = batch_size
+        self.lock = threading.Lock()
+        self.words = None
+
+    def get_words(self):
+        """
+        Load the word symbol table of the graph, once
+        """
+        with self.lock:
+            if self.words is None:
+                words_path = join(self.recipe_dir, self.graph_dir, "words.txt")
+                with open(words_path, mode="r") as words_f:
+                    self.words = dict(
+                        reversed(line.split()) for line in words_f
+                    )
+
+        return self.words
+
+    def recognize(self, speech_data):
+        hypothesis = self.recognize_batch([speech_data])[0]
+        if hypothesis is None:
+            raise sr.UnknownValueError()
+
+        return hypothesis
+
+    def recognize_batch(self, speech_data_list):
+        words = self.get_words()
+        utt_ids = [f"utt{index:06d}" for index in range(len(speech_data_list))]
+
+        with tempfile.TemporaryDirectory() as work_dir:
+
+            with open(join(work_dir, "wav.scp"), mode="w") as wav_scp_f, \
+                 open(join(work_dir, "spk2utt"), mode="w") as spk2utt_f:
+                for utt_id, speech_data in zip(utt_ids, speech_data_list):
+                    wav_path = join(work_dir, f"{utt_id}.wav")
+                    with open(wav_path, mode="wb") as wav_f:
+                        wav_f.write(speech_data.get_wav_data(
+                            convert_rate=self.sample_rate, convert_width=2
+                        ))
+                    wav_scp_f.write(f"{utt_id} {wav_path}\n")
+                    # Each item is adapted to on its own
+                    spk2utt_f.write(f"{utt_id} {utt_id}\n")
+
+            lattices = "ark:" + join(work_dir, "lattices.ark")
+            one_best_path = join(work_dir, "one-best_symbols.txt")
+            self.run([
+                "online2-wav-nnet3-latgen-faster",
+                "--online=false",
+                "--do-endpointing=false",
+                "--frame-subsampling-factor=3",
+                f"--config={self.model_dir}/conf/online.conf",
+                "--max-active=7000",
+                "--beam=15.0",
+                "--lattice-beam=6.0",
+                "--acoustic-scale=1.0",
+                f"--word-symbol-table={self.graph_dir}/words.txt",
+                f"{self.model_dir}/final.mdl",
+                f"{self.graph_dir}/HCLG.fst",
+                "ark:" + join(work_dir, "spk2utt"),
+                "scp:" + join(work_dir, "wav.scp"),
+                lattices
+            ])
+            self.run([
+                "lattice-best-path",
+                f"--word-symbol-table={self.graph_dir}/words.txt",
+                lattices,
+                "ark,t:" + one_best_path
+            ])
+
+            # Items without a lattice, e.g. silence only, are left out
+            found = dict()
+            with open(one_best_path, mode="r") as one_best_f:
+                for line in one_best_f:
+                    utt_id, *symbols = line.split()
+                    found[utt_id] = " ".join(
+                        words.get(symbol, "<UNK>") for symbol in symbols
+                    )
+
+        return [found.get(utt_id) for utt_id in utt_ids]
+
+    def run(self, command):
+        """
+        Run a Kaldi command from the recipe directory, with its path.sh
+        """
+        result = subprocess.run(
+            ["bash", "-c", ". ./path.sh && " + shlex.join(command)],
+            cwd=self.recipe_dir, capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            error_lines = result.stderr.strip().splitlines()
+            raise sr.RequestError(
+                f"{command[0]} failed: "
+                f"{error_lines[-1] if error_lines else result.returncode}"
+            )
+
+class SpeechRecognitionBackend(RecognizerBackend):
+    """
+    Backend calling one of the recognize_* methods of
+    speech_recognition.Recognizer. Each thread gets its own Recognizer.
+
+    Parameters
+    ----------
+    method : string
+        Name of the method, e.g. "recognize_google"
+    **options
+        Keyword arguments of the method, e.g. language
+
+    """
+
+    def __init__(self, method, **options):
+        self.method = method
+        self.options = options
+        self.thread_data = threading.local()
+
+    def recognize(self, speech_data):
+        if not hasattr(self.thread_data, "recognizer"):
+            self.thread_data.recognizer = sr.Recognizer()
+
+        recognize_fn = getattr(self.thread_data.recognizer, self.method)
+
+        return recognize_fn(speech_data, **self.options)
+
+class GoogleRecognizer(SpeechRecognitionBackend):
+    """
+    Google Web Speech API, which needs network access
+    """
+
+    def __init__(self, **options):
+        super().__init__("recognize_google", **options)
+
+class SphinxRecognizer(SpeechRecognitionBackend):
+    """
+    CMU Sphinx, which runs offline with pocketsphinx
+    """
+
+    def __init__(self, **options):
+        super().__init__("recognize_sphinx", **options)
+
+# Backends available by name in transcribe_speech and benchmark_recognizers
+backends = dict({
+    'fake': FakeRecognizer,
+    'google': GoogleRecognizer,
+    'kaldi': KaldiRecognizer,
+    'sphinx': SphinxRecognizer
+})
+
+def get_backend(backend, **options):
+    """
+    Create a recognition backend
+
+    Parameters
+    ----------
+    backend : string or RecognizerBackend
+        Name of the backend in the registry, e.g. "google" or "kaldi". A
+        RecognizerBackend is returned as it is.
+    **options
+        Settings of the backend, see its class
+
+    Returns
+    -------
+    backend : RecognizerBackend
+        Backend ready to be used
+    """
+    if isinstance(backend, RecognizerBackend):
+        return backend
+
+    if backend not in backends:
+        raise ValueError(
+            f"Unknown recognizer backend {backend}, expected one of "
+            f"{', '.join(sorted(backends))}."
+        )
+
+    return backends[backend](**options)
+
+def register_backend(name, backend_class):
+    """
+    Make a recognition backend available by name
+
+    Parameters
+    ----------
+    name : string
+        Name of the backend
+    backend_class : class
+        Subclass of RecognizerBackend, or any function returning an instance
+        of it
+
+    Returns
+    -------
+    None
+    """
+    backends[name] = backend_class
@@ -0,0 +1,366 @@
+import argparse
+import hashlib
+import json
+import pickle
+import sqlite3
+import time
+
+from importlib import metadata
+from os import makedirs
+from os.path import abspath, dirname, isfile
+
+class ScoreCache:
+    """
+    Persistent store of the scores computed for each transcript. Entries are
+    addressed by a digest of the transcript text, the scoring function, its
+    options and the version of the resources used, so a changed transcript
+    or setting never reuses old scores.
+
+    The time each entry was last used is recorded when the cache is flushed
+    or closed, for all the entries read since then in one transaction, so
+    reading cached scores doesn't write to the database each time.
+
+    Parameters
+    ----------
+    cache_path : string
+        Location of the cache database, created if missing
+    function_name : string
+        Name of the function producing the scores, e.g.
+        "compute_readability.compute_scores"
+    options : dict
+        Options passed to the scoring function
+    version : string
+        Version of the code, word lists and models used for scoring, as given
+        by get_resource_version
+
+    """
+
+    def __init__(self, cache_path, function_name, options, version):
+        self.function_name = function_name
+        self.options = json.dumps(options, sort_keys=True)
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        self.used_keys = []
+
+        self.conn = open_cache(cache_path)
+
+    def close(self):
+        """
+        Flush the cache and close the database
+        """
+        self.flush()
+        self.conn.close()
+
+    def flush(self):
+        """
+        Record that the entries read since the last flush were used
+        """
+        if self.used_keys:
+            now = time.time()
+            with self.conn:
+                self.conn.executemany(
+                    "UPDATE scores SET last_used = ? WHERE key = ?",
+                    [(now, key) for key in self.used_keys]
+                )
+            self.used_keys = []
+
+    def get(self, text):
+        """
+        Get the cached scores of a transcript
+
+        Parameters
+        ----------
+        text : string
+            Transcript, as passed to the scoring function
+
+        Returns
+        -------
+        scores : list
+            Cached scores, or None if the transcript hasn't been scored with
+            the same function, options and resources
+        """
+        scores = None
+        key = self.get_key(text)
+
+        entry = self.conn.execute(
+            "SELECT scores FROM scores WHERE key = ?", (key,)
+        ).fetchone()
+
+        if entry:
+            self.hits += 1
+            scores = pickle.loads(entry[0])
+            self.used_keys.append(key)
+        else:
+            self.misses += 1
+
+        return scores
+
+    def get_key(self, text):
+        key_source = "\n".join([
+            self.function_name, self.options, self.version, text
+        ])
+
+        return hashlib.sha256(key_source.encode("utf-8")).hexdigest()
+
+    def get_stats(self):
+        """
+        Get the hit and miss counts of the cache
+
+        Returns
+        -------
+        stats : dict
+            Number of transcripts found in the cache and missing from it
+        """
+        stats = dict({'hits': self.hits, 'misses': self.misses})
+
+        return stats
+
+    def put(self, text, scores):
+        """
+        Store the scores of a transcript
+
+        Parameters
+        ----------
+        text : string
+            Transcript, as passed to the scoring function
+        scores : list
+            Scores returned by the scoring function
+
+        Returns
+        -------
+        None
+        """
+        now = time.time()
+
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO scores VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    self.get_key(text), self.function_name, self.options,
+                    self.version, pickle.dumps(scores), now, now
+                )
+            )
+
+def get_resource_version(resource_paths, packages):
+    """
+    Describe the resources that scores depend on, so that cached scores are
+    not reused after any of these changes
+
+    Parameters
+    ----------
+    resource_paths : list of strings
+        Files whose contents affect the scores, e.g. the scoring module and
+        the word lists. Missing files are described by their name only.
+    packages : list of strings
+        Installed packages whose versions affect the scores, e.g. textstat or
+        the spaCy models
+
+    Returns
+    -------
+    version : string
+        Digest of the contents of the files and the package versions
+    """
+    version_hash = hashlib.sha1()
+
+    for resource_path in resource_paths:
+        version_hash.update(resource_path.encode("utf-8"))
+        if isfile(resource_path):
+            with open(resource_path, mode="rb") as resource_f:
+                version_hash.update(resource_f.read())
+
+    for package in packages:
+        try:
+            package_version = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            package_version = "unknown"
+        version_hash.update(f"{package}=={package_version}".encode("utf-8"))
+
+    return version_hash.hexdigest()
+
+def inspect_cache(cache_path):
+    """
+    Summarize the contents of the cache
+
+    Parameters
+    ----------
+    cache_path : string
+        Location of the cache database
+
+    Returns
+    -------
+    summary : list of tuples
+        (function, version, options, entry count, last used) for each group
+        of entries, most recently used first
+    """
+    conn = open_cache(cache_path)
+
+    summary = conn.execute(
+        "SELECT function, version, options, COUNT(*), MAX(last_used) "
+        "FROM scores GROUP BY function, version, options "
+        "ORDER BY MAX(last_used) DESC"
+    ).fetchall()
+    conn.close()
+
+    return summary
+
+def invalidate_cache(cache_path, function_name=None, version=None):
+    """
+    Remove cached scores, e.g. after a change the resource version does not
+    capture
+
+    Parameters
+    ----------
+    cache_path : string
+        Location of the cache database
+    function_name : string
+        Only remove the entries of this scoring function. Default is None,
+        which means entries of all functions
+    version : string
+        Only remove the entries of this resource version. Default is None,
+        which means entries of all versions
+
+    Returns
+    -------
+    removed_count : int
+        Number of entries removed
+    """
+    conditions = []
+    values = []
+
+    if function_name:
+        conditions.append("function = ?")
+        values.append(function_name)
+    if version:
+        conditions.append("version = ?")
+        values.append(version)
+
+    query = "DELETE FROM scores"
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+
+    conn = open_cache(cache_path)
+    with conn:
+        removed_count = conn.execute(query, values).rowcount
+    conn.execute("VACUUM")
+    conn.close()
+
+    return removed_count
+
+def open_cache(cache_path):
+    makedirs(dirname(abspath(cache_path)), exist_ok=True)
+
+    conn = sqlite3.connect(cache_path)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS scores ("
+        "key TEXT PRIMARY KEY, function TEXT, options TEXT, version TEXT, "
+        "scores BLOB, created REAL, last_used REAL)"
+    )
+
+    return conn
+
+def prune_cache(cache_path, max_age_days=None, keep_versions=None):
+    """
+    Remove cached scores that are unlikely to be used again
+
+    Parameters
+    ----------
+    cache_path : string
+        Location of the cache database
+    max_age_days : float
+        Remove entries that have not been used in this many days. Default is
+        None, which means entries are kept regardless of age
+    keep_versions : int
+        For each scoring function, keep only the entries of this many of the
+        most recently used resource versions. Default is None, which means
+        entries of all versions are kept
+
+    Returns
+    -------
+    removed_count : int
+        Number of entries removed
+    """
+    removed_count = 0
+    conn = open_cache(cache_path)
+
+    with conn:
+        if max_age_days is not None:
+            cutoff = time.time() - (max_age_days * 24 * 60 * 60)
+            removed_count += conn.execute(
+                "DELETE FROM scores WHERE last_used < ?", (cutoff,)
+            ).rowcount
+
+        if keep_versions is not None:
+            functions = conn.execute(
+                "SELECT DISTINCT function FROM scores"
+            ).fetchall()
+
+            for (function_name,) in functions:
+                versions = conn.execute(
+                    "SELECT version FROM scores WHERE function = ? "
+                    "GROUP BY version ORDER BY MAX(last_used) DESC",
+                    (function_name,)
+                ).fetchall()
+
+                for (version,) in versions[keep_versions:]:
+                    removed_count += conn.execute(
+                        "DELETE FROM scores "
+                        "WHERE function = ? AND version = ?",
+                        (function_name, version)
+                    ).rowcount
+
+    conn.execute("VACUUM")
+    conn.close()
+
+    return removed_count
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Inspect and maintain the cache of transcript scores"
+    )
+    parser.add_argument("cache_path", help="location of the cache database")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("inspect", help="summarize the cached scores")
+
+    prune_parser = subparsers.add_parser(
+        "prune", help="remove old or outdated cached scores"
+    )
+    prune_parser.add_argument("--max-age-days", type=float)
+    prune_parser.add_argument("--keep-versions", type=int)
+
+    invalidate_parser = subparsers.add_parser(
+        "invalidate", help="remove cached scores unconditionally"
+    )
+    invalidate_parser.add_argument("--function")
+    invalidate_parser.add_argument("--version")
+
+    args = parser.parse_args()
+
+    if args.command == "inspect":
+        for function_name, version, options, count, last_used in \
+                inspect_cache(args.cache_path):
+            last_used = time.strftime(
+                "%Y-%m-%d %H:%M:%S", time.localtime(last_used)
+            )
+            print(
+                f"{function_name} {version[:12]} {options}: "
+                f"{count} entries, last used {last_used}"
+            )
+    elif args.command == "prune":
+        removed_count = prune_cache(
+            args.cache_path,
+            max_age_days=args.max_age_days,
+            keep_versions=args.keep_versions
+        )
+        print(f"Removed {removed_count} entries.")
+    elif args.command == "invalidate":
+        removed_count = invalidate_cache(
+            args.cache_path,
+            function_name=args.function,
+            version=args.version
+        )
+        print(f"Removed {removed_count} entries.")
+
+if __name__ == "__main__":
+    main()
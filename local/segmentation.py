@@ -0,0 +1,415 @@
+import numpy as np
+
+from pydub import silence
+from pydub.utils import db_to_float
+
+# Number of samples squared and summed at a time, which bounds the memory used
+# on long recordings
+block_size = 1 << 20
+
+class SpeechChunk:
+    """
+    Non-silent section of an audio segment, padded with some of the silence
+    around it. The chunk is a view on the audio segment: its samples are only
+    copied, or encoded, when a new audio segment or file is asked for.
+
+    Parameters
+    ----------
+    audio_segment : class 'pydub.AudioSegment'
+        Audio the chunk is taken from
+    start, end : int
+        Beginning and end of the chunk, padding included, in ms
+    speech_start, speech_end : int
+        Beginning and end of the non-silent section, in ms
+
+    """
+
+    def __init__(self, audio_segment, start, end, speech_start, speech_end):
+        self.audio_segment = audio_segment
+        self.start = start
+        self.end = end
+        self.speech_start = speech_start
+        self.speech_end = speech_end
+
+    def export(self, out_f, format = "wav"):
+        """
+        Encode the chunk into a file, see pydub.AudioSegment.export
+        """
+        return self.get_segment().export(out_f, format=format)
+
+    def get_raw_data(self):
+        """
+        Get the PCM data of the chunk, the same as the raw_data of
+        get_segment. This is a view on the data of the audio segment, unless
+        frames missing at its end have to be added as silence.
+        """
+        frame_width = self.audio_segment.frame_width
+        start_frame, end_frame = self.get_frames()
+
+        raw_data = memoryview(self.audio_segment.raw_data)[
+            start_frame * frame_width:end_frame * frame_width
+        ]
+        missing_frames = end_frame - start_frame - len(raw_data) // frame_width
+        if missing_frames and len(raw_data):
+            raw_data = bytes(raw_data) + bytes(missing_frames * frame_width)
+
+        return raw_data
+
+    def get_frames(self):
+        """
+        Get the first frame of the chunk and the frame after its end, as
+        found when slicing the audio segment
+        """
+        frame_rate = self.audio_segment.frame_rate
+        seg_len = len(self.audio_segment)
+
+        start_frame = int(min(self.start, seg_len) * (frame_rate / 1000.0))
+        end_frame = int(min(self.end, seg_len) * (frame_rate / 1000.0))
+
+        return start_frame, end_frame
+
+    def get_samples(self):
+        """
+        Get the samples of the chunk as an array sharing the data of the audio
+        segment, see get_samples
+        """
+        channels = self.audio_segment.channels
+        start_frame, end_frame = self.get_frames()
+
+        samples = get_samples(self.audio_segment)
+
+        return samples[start_frame * channels:end_frame * channels]
+
+    def get_segment(self):
+        """
+        Copy the chunk into a new audio segment
+        """
+        return self.audio_segment[self.start:self.end]
+
+def detect_nonsilent(
+    audio_segment,
+    min_silence_len = 1000,
+    silence_thresh = -16,
+    seek_step = 1
+):
+    """
+    Find the non-silent sections of an audio segment. This gives the same
+    [start, end] sections as pydub.silence.detect_nonsilent, but the silence
+    is detected with detect_silence.
+
+    Parameters
+    ----------
+    audio_segment : class 'pydub.AudioSegment'
+        Audio to be segmented
+    min_silence_len : int
+        Minimum length of a silence, in ms
+    silence_thresh : float
+        Upper bound for how quiet is silent, in dBFS
+    seek_step : int
+        Distance between the beginning of consecutive analysis windows, in ms
+
+    Returns
+    -------
+    nonsilent_ranges : list of lists
+        [start, end] of each non-silent section, in ms
+    """
+    silent_ranges = detect_silence(
+        audio_segment, min_silence_len, silence_thresh, seek_step
+    )
+    len_seg = len(audio_segment)
+
+    # if there is no silence, the whole thing is nonsilent
+    if not silent_ranges:
+        return [[0, len_seg]]
+
+    # short circuit when the whole audio segment is silent
+    if silent_ranges[0][0] == 0 and silent_ranges[0][1] == len_seg:
+        return []
+
+    prev_end_i = 0
+    nonsilent_ranges = []
+    for start_i, end_i in silent_ranges:
+        nonsilent_ranges.append([prev_end_i, start_i])
+        prev_end_i = end_i
+
+    if end_i != len_seg:
+        nonsilent_ranges.append([prev_end_i, len_seg])
+
+    if nonsilent_ranges[0] == [0, 0]:
+        nonsilent_ranges.pop(0)
+
+    return nonsilent_ranges
+
+def detect_silence(
+    audio_segment,
+    min_silence_len = 1000,
+    silence_thresh = -16,
+    seek_step = 1
+):
+    """
+    Find the silent sections of an audio segment, i.e. the sections where
+    every analysis window of min_silence_len ms has an RMS at or below the
+    threshold. This gives the same [start, end] sections as
+    pydub.silence.detect_silence, whose windows are sliced and measured one
+    by one, but the RMS of all the windows is computed at once from the
+    cumulative energy of the samples.
+
+    Parameters
+    ----------
+    audio_segment : class 'pydub.AudioSegment'
+        Audio to be segmented
+    min_silence_len : int
+        Minimum length of a silence, in ms
+    silence_thresh : float
+        Upper bound for how quiet is silent, in dBFS
+    seek_step : int
+        Distance between the beginning of consecutive analysis windows, in ms
+
+    Returns
+    -------
+    silent_ranges : list of lists
+        [start, end] of each silent section, in ms
+    """
+    # Sums of squares are only exact in 64 bits for 8- and 16-bit samples
+    if audio_segment.sample_width > 2:
+        return silence.detect_silence(
+            audio_segment, min_silence_len, silence_thresh, seek_step
+        )
+
+    seg_len = len(audio_segment)
+
+    # you can't have a silent portion of a sound that is longer than the sound
+    if seg_len < min_silence_len:
+        return []
+
+    # convert silence threshold to a float value (so we can compare it to rms)
+    silence_thresh = db_to_float(silence_thresh) * \
+        audio_segment.max_possible_amplitude
+
+    last_slice_start = seg_len - min_silence_len
+    slice_starts = np.arange(0, last_slice_start + 1, seek_step)
+
+    # guarantee last_slice_start is included in the range
+    # to make sure the last portion of the audio is searched
+    if last_slice_start % seek_step:
+        slice_starts = np.append(slice_starts, last_slice_start)
+
+    window_rms = get_window_rms(
+        get_samples(audio_segment), audio_segment.channels,
+        audio_segment.frame_rate, slice_starts, min_silence_len
+    )
+    silence_starts = slice_starts[window_rms <= silence_thresh]
+
+    # short circuit when there is no silence
+    if not len(silence_starts):
+        return []
+
+    # combine the silence we detected into ranges (start ms - end ms). Windows
+    # are combined unless they are neither consecutive nor overlapping.
+    steps = np.diff(silence_starts)
+    is_split = (steps != seek_step) & (steps > min_silence_len)
+    range_starts = np.append(silence_starts[0], silence_starts[1:][is_split])
+    range_ends = np.append(silence_starts[:-1][is_split], silence_starts[-1])
+
+    silent_ranges = [
+        [int(start), int(end) + min_silence_len]
+        for start, end in zip(range_starts, range_ends)
+    ]
+
+    return silent_ranges
+
+def get_cumulative_energies(samples, sample_ends):
+    """
+    Sum the squares of the samples up to each of a set of positions
+
+    Parameters
+    ----------
+    samples : numpy array
+        Samples of the audio
+    sample_ends : numpy array
+        Positions, in samples and in ascending order, up to which the squares
+        are summed (excluded)
+
+    Returns
+    -------
+    energies : numpy array
+        Sum of the squares of the samples before each position
+    """
+    energies = np.zeros(len(sample_ends), dtype=np.int64)
+    total = 0
+
+    for block_start in range(0, len(samples), block_size):
+        block = samples[block_start:block_start + block_size].astype(np.int64)
+        block_sums = np.cumsum(block * block)
+        block_end = block_start + len(block)
+
+        first = np.searchsorted(sample_ends, block_start, side="right")
+        last = np.searchsorted(sample_ends, block_end, side="right")
+        energies[first:last] = \
+            total + block_sums[sample_ends[first:last] - block_start - 1]
+        total += int(block_sums[-1])
+
+    return energies
+
+def get_samples(audio_segment):
+    """
+    Get the samples of an audio segment as an array sharing its raw data,
+    with the channels of each frame next to each other
+
+    Parameters
+    ----------
+    audio_segment : class 'pydub.AudioSegment'
+        Audio with 8- or 16-bit samples
+
+    Returns
+    -------
+    samples : numpy array
+        Samples of the audio, as read by audioop
+    """
+    sample_type = dict({1: np.int8, 2: np.int16})[audio_segment.sample_width]
+
+    # Frames cut short at the end of the data are left out, as in pydub
+    frame_count = int(audio_segment.frame_count())
+    samples = np.frombuffer(
+        audio_segment.raw_data, dtype=sample_type,
+        count=frame_count * audio_segment.channels
+    )
+
+    return samples
+
+def get_window_rms(samples, channels, frame_rate, window_starts, window_len):
+    """
+    Compute the RMS of windows of audio as audioop.rms does for the
+    corresponding slices of an AudioSegment, i.e. truncated to an integer,
+    with the frames missing at the end of the audio counted as silence
+
+    Parameters
+    ----------
+    samples : numpy array
+        Samples of the audio, see get_samples
+    channels : int
+        Number of channels of the audio
+    frame_rate : int
+        Number of frames per second
+    window_starts : numpy array
+        Beginning of each window, in ms
+    window_len : int
+        Length of the windows, in ms
+
+    Returns
+    -------
+    window_rms : numpy array
+        RMS of each window
+    """
+    frame_count = len(samples) // channels
+
+    # Convert positions in ms to frames exactly as AudioSegment slicing does
+    positions = np.arange(0, int(window_starts[-1]) + window_len + 1)
+    position_frames = (positions * (frame_rate / 1000.0)).astype(np.int64)
+    position_ends = np.minimum(position_frames, frame_count) * channels
+
+    energies = get_cumulative_energies(samples, position_ends)
+
+    start_frames = position_frames[window_starts]
+    end_frames = position_frames[window_starts + window_len]
+    sample_counts = (end_frames - start_frames) * channels
+    sums = energies[window_starts + window_len] - energies[window_starts]
+
+    # audioop sums the squares as doubles, which is exact as long as the sum
+    # of a window is below 2 ** 53
+    with np.errstate(divide="ignore", invalid="ignore"):
+        window_rms = np.sqrt(sums / sample_counts)
+    window_rms = np.where(
+        (sample_counts > 0) & (start_frames < frame_count), window_rms, 0
+    ).astype(np.int64)
+
+    return window_rms
+
+def iter_chunks(
+    audio_segment,
+    min_silence_len = 1000,
+    silence_thresh = -16,
+    keep_silence = 100,
+    seek_step = 1
+):
+    """
+    Split an audio segment on its silent sections, detecting the silence only
+    once. The chunks are the same as the ones of
+    pydub.silence.split_on_silence, but they are views on the audio segment.
+
+    Parameters
+    ----------
+    audio_segment : class 'pydub.AudioSegment'
+        Audio to be split
+    min_silence_len, silence_thresh, seek_step
+        See detect_silence
+    keep_silence : int or bool
+        Silence kept at the beginning and end of each chunk, in ms. When the
+        silence between two chunks is shorter than twice this, it is split
+        evenly between them. True keeps all the silence, False none of it.
+
+    Yields
+    ------
+    chunk : SpeechChunk
+        Each non-silent chunk of the audio, in order
+    """
+    if isinstance(keep_silence, bool):
+        keep_silence = len(audio_segment) if keep_silence else 0
+
+    speech_ranges = detect_nonsilent(
+        audio_segment, min_silence_len, silence_thresh, seek_step
+    )
+    output_ranges = [
+        [start - keep_silence, end + keep_silence]
+        for start, end in speech_ranges
+    ]
+
+    for range_i, range_ii in zip(output_ranges, output_ranges[1:]):
+        last_end = range_i[1]
+        next_start = range_ii[0]
+        if next_start < last_end:
+            range_i[1] = (last_end + next_start) // 2
+            range_ii[0] = range_i[1]
+
+    seg_len = len(audio_segment)
+    for (start, end), (speech_start, speech_end) in zip(
+        output_ranges, speech_ranges
+    ):
+        yield SpeechChunk(
+            audio_segment, max(start, 0), min(end, seg_len),
+            speech_start, speech_end
+        )
+
+def split_on_silence(
+    audio_segment,
+    min_silence_len = 1000,
+    silence_thresh = -16,
+    keep_silence = 100,
+    seek_step = 1
+):
+    """
+    Split an audio segment on its silent sections, as
+    pydub.silence.split_on_silence does, but with the chunks found by
+    iter_chunks
+
+    Parameters
+    ----------
+    audio_segment : class 'pydub.AudioSegment'
+        Audio to be split
+    min_silence_len, silence_thresh, keep_silence, seek_step
+        See iter_chunks
+
+    Returns
+    -------
+    chunks : list of class 'pydub.AudioSegment'
+        Non-silent chunks of the audio
+    """
+    chunks = [
+        chunk.get_segment()
+        for chunk in iter_chunks(
+            audio_segment, min_silence_len, silence_thresh, keep_silence,
+            seek_step
+        )
+    ]
+
+    return chunks
@@ -0,0 +1,349 @@
+import argparse
+import csv
+import importlib.util
+import lexicons as lex
+import mmap
+import numpy as np
+import re
+import struct
+import textstat as ts
+
+from array import array
+from collections import OrderedDict
+from os.path import isfile, join
+
+# Precompiled syllable counts of the words in the word lists, see
+# build_syllable_table
+syllable_table_path = join(lex.wordlists_dir, "syllable-counts.bin")
+table_magic = b"SYLTAB01"
+
+class SyllableCache:
+    """
+    Bounded store of the syllable counts of words, shared by all the scoring
+    modules. Words are keyed by their lowercase form, and the least recently
+    used words are dropped once the cache is full. Since a few words make up
+    most of any transcript, most words are only syllabified once.
+
+    Parameters
+    ----------
+    maxsize : int
+        Maximum number of words kept. Default is 65536 words
+    syllable_table : SyllableTable
+        Precompiled syllable counts, looked up before syllabifying words
+        missing from the cache. Default is None, which means all these words
+        are syllabified.
+
+    """
+
+    def __init__(self, maxsize=65536, syllable_table=None):
+        self.maxsize = maxsize
+        self.counts = OrderedDict()
+        self.syllable_table = syllable_table
+        self.hits = 0
+        self.misses = 0
+        self.table_hits = 0
+
+    def count(self, word):
+        """
+        Get the number of syllables of a word
+
+        Parameters
+        ----------
+        word : string
+            Word without punctuations
+
+        Returns
+        -------
+        count : int
+            Number of syllables of the word
+        """
+        key = word.lower()
+
+        if key in self.counts:
+            self.hits += 1
+            self.counts.move_to_end(key)
+            return self.counts[key]
+
+        self.misses += 1
+        count = None
+        if self.syllable_table is not None:
+            count = self.syllable_table.get(key)
+
+        if count is None:
+            count = syllabify_word(word)
+        else:
+            self.table_hits += 1
+
+        self.counts[key] = count
+        if len(self.counts) > self.maxsize:
+            self.counts.popitem(last=False)
+
+        return count
+
+    def get_stats(self):
+        """
+        Get the hit and miss counts of the cache, e.g. for sizing it
+
+        Returns
+        -------
+        stats : dict
+            Number of hits, misses (of which table_hits were found in the
+            precompiled table) and words currently kept
+        """
+        stats = dict({
+            'hits': self.hits,
+            'misses': self.misses,
+            'table_hits': self.table_hits,
+            'size': len(self.counts)
+        })
+
+        return stats
+
+class SyllableTable:
+    """
+    Read-only lookup table of precompiled syllable counts, built with
+    build_syllable_table. The file is memory-mapped, so opening it is
+    immediate and worker processes share the same pages.
+
+    The file holds an 8-byte magic string, the number of words N as a
+    little-endian uint32, N + 1 uint32 offsets into the key block, the key
+    block (the sorted UTF-8 lowercase words, back to back) and N uint8
+    syllable counts.
+
+    Parameters
+    ----------
+    table_path : string
+        Location of the table
+
+    """
+
+    def __init__(self, table_path):
+        with open(table_path, mode="rb") as table_f:
+            self.buffer = mmap.mmap(
+                table_f.fileno(), 0, access=mmap.ACCESS_READ
+            )
+
+        if self.buffer[:len(table_magic)] != table_magic:
+            raise ValueError(f"{table_path} is not a syllable table.")
+
+        header_size = len(table_magic) + 4
+        (self.word_count,) = struct.unpack_from(
+            "<I", self.buffer, len(table_magic)
+        )
+        self.offsets = np.frombuffer(
+            self.buffer, dtype="<u4", count=self.word_count + 1,
+            offset=header_size
+        )
+        self.keys_start = header_size + 4 * (self.word_count + 1)
+        self.counts_start = self.keys_start + int(self.offsets[-1])
+
+    def get(self, word):
+        """
+        Look up the syllable count of a word with a binary search
+
+        Parameters
+        ----------
+        word : string
+            Lowercase word without punctuations
+
+        Returns
+        -------
+        count : int
+            Number of syllables of the word, or None if the word is not in
+            the table
+        """
+        key = word.encode("utf-8")
+        low = 0
+        high = self.word_count
+
+        while low < high:
+            middle = (low + high) // 2
+            entry = self.get_key(middle)
+
+            if entry < key:
+                low = middle + 1
+            elif entry > key:
+                high = middle
+            else:
+                return self.buffer[self.counts_start + middle]
+
+        return None
+
+    def get_key(self, index):
+        key_start = self.keys_start + int(self.offsets[index])
+        key_end = self.keys_start + int(self.offsets[index + 1])
+
+        return self.buffer[key_start:key_end]
+
+def build_syllable_table(
+    table_path = syllable_table_path,
+    list_paths = (lex.dale_list_path, lex.headword_list_path),
+    dict_paths = ()
+):
+    """
+    Precompute the syllable counts of all the words in the word lists and
+    pronunciation dictionaries, and save them as a SyllableTable. The counts
+    are computed with syllabify_word, so they are the same as the ones
+    computed at scoring time.
+
+    Parameters
+    ----------
+    table_path : string
+        Location of the table to be built
+    list_paths : list of strings
+        Word lists in CSV format with a header row, e.g. the detailed
+        Dale-Chall and BNC-COCA lists. All their entries are included except
+        the headword classes.
+    dict_paths : list of strings
+        Pronunciation dictionaries in the format of cmudict.0.7a, e.g. the
+        ones made by generate_dictionary.py and merge_dictionaries.py. Lines
+        starting with ";;;" are comments.
+
+    Returns
+    -------
+    word_count : int
+        Number of words in the table
+    """
+    vocabulary = set()
+
+    for list_path in list_paths:
+        with open(list_path, mode="r", newline="") as list_f:
+            for row in csv.DictReader(list_f):
+                row.pop("hw_class", None)
+                vocabulary.update(entry for entry in row.values() if entry)
+
+    for dict_path in dict_paths:
+        with open(dict_path, mode="r") as dict_f:
+            for line in dict_f:
+                # Skip the comments and blank lines of cmudict
+                if line.startswith(";;;") or not line.strip():
+                    continue
+                word = line.split(" ", maxsplit=1)[0]
+                word = re.sub(r"\([0-9]+\)$", "", word)
+                if word:
+                    vocabulary.add(word)
+
+    words = sorted(
+        set(word.lower().encode("utf-8") for word in vocabulary)
+    )
+
+    offsets = np.zeros(len(words) + 1, dtype="<u4")
+    offsets[1:] = np.cumsum([len(word) for word in words])
+
+    # Unsigned bytes, which raise an error rather than wrap around
+    counts = array(
+        "B", [syllabify_word(word.decode("utf-8")) for word in words]
+    )
+
+    with open(table_path, mode="wb") as table_f:
+        table_f.write(table_magic)
+        table_f.write(struct.pack("<I", len(words)))
+        table_f.write(offsets.tobytes())
+        table_f.write(b"".join(words))
+        table_f.write(counts.tobytes())
+
+    return len(words)
+
+
+def count_word_syllables(word):
+    """
+    Get the number of syllables of a word, using the shared syllable cache
+
+    Parameters
+    ----------
+    word : string
+        Word without punctuations
+
+    Returns
+    -------
+    count : int
+        Number of syllables of the word
+    """
+    return syllable_cache.count(word)
+
+def get_syllabifier_path():
+    """
+    Find cainesap's syllabifier without importing it, so that the scores can
+    be tied to its version
+
+    Returns
+    -------
+    syllabifier_path : string
+        Location of its syllable3 module, or the name of the module if it
+        can't be found
+    """
+    syllabifier_name = "cainesap_syllabify.syllable3"
+
+    try:
+        spec = importlib.util.find_spec(syllabifier_name)
+    except (ImportError, ValueError):
+        spec = None
+
+    if spec is None or not spec.origin:
+        return syllabifier_name
+
+    return spec.origin
+
+def open_syllable_table(table_path = syllable_table_path):
+    """
+    Open a precompiled syllable table, if it has been built
+
+    Parameters
+    ----------
+    table_path : string
+        Location of the table
+
+    Returns
+    -------
+    syllable_table : SyllableTable
+        Opened table, or None if the file is missing
+    """
+    syllable_table = None
+
+    if isfile(table_path):
+        syllable_table = SyllableTable(table_path)
+
+    return syllable_table
+
+def syllabify_word(word):
+    """
+    Count the syllables of a word with cainesap's syllabifier. Words that it
+    cannot process are counted with textstat instead.
+    """
+    from cainesap_syllabify import syllable3
+
+    count = 0
+
+    syllables = syllable3.generate(word)
+    if syllables:
+        try:
+            count = len(list(syllables)[0])
+        except:
+            # print("WARNING: cannot process %s. Defaults to pyphen." \
+            #       % (word.upper()))
+            count = ts.syllable_count(word)
+            pass
+    return count
+
+# Cache used by count_word_syllables, one per process
+syllable_cache = SyllableCache(syllable_table=open_syllable_table())
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Precompute the syllable counts of the known vocabulary"
+    )
+    parser.add_argument(
+        "dict_paths", nargs="*",
+        help="pronunciation dictionaries in the format of cmudict.0.7a"
+    )
+    parser.add_argument(
+        "--output", default=syllable_table_path,
+        help="location of the syllable table"
+    )
+    args = parser.parse_args()
+
+    word_count = build_syllable_table(args.output, dict_paths=args.dict_paths)
+    print(f"Saved the syllable counts of {word_count} words in {args.output}.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import compute_readability as cr
+import numpy as np
+import pytest
+import re
+import textstat as ts
+
+texts = [
+    "",
+    "Hello",
+    "One sentence without a period",
+    "The cat sat. The dog ran! Did the bird fly? Yes.",
+    "Mr. Smith went to Washington. He arrived at 9.30 a.m. and left... "
+    "Soon after, it rained!!! Nobody knew why?! The end",
+    "Short. " * 80,
+    " ".join(
+        f"Sentence number {index} has a few more words than the last one "
+        f"{'and grows ' * index}."
+        for index in range(30)
+    ),
+]
+
+def limit_text_by_word_count_reference(
+    text,
+    count_limit = 100,
+    is_save = True
+):
+    # limit_text_by_word_count as it was before the word counts were added up
+    # one sentence at a time
+    if is_save:
+        current_count = 0
+        limited_text = ""
+
+        sentences = re.findall(r'\b[^.!?]+[.!?]*', text, re.UNICODE)
+
+        for sentence in sentences:
+            limited_text = limited_text + " " + sentence
+            current_count = ts.lexicon_count(limited_text)
+
+            if current_count >= count_limit:
+                break
+    else:
+        limited_text = " ".join(text.split()[:count_limit])
+
+    return limited_text
+
+@pytest.mark.parametrize("text", texts)
+@pytest.mark.parametrize("count_limit", [0, 1, 5, 100])
+@pytest.mark.parametrize("is_save", [True, False])
+def test_limit_text_by_word_count_matches_the_original(
+    text, count_limit, is_save
+):
+    assert cr.limit_text_by_word_count(text, count_limit, is_save) == \
+        limit_text_by_word_count_reference(text, count_limit, is_save)
+
+def test_text_document_gives_the_scores_of_each_formula():
+    pytest.importorskip("cainesap_syllabify")
+    pytest.importorskip("nltk")
+    pytest.importorskip("spacy")
+
+    formulas = [
+        cr.dale_chall_readability_raw,
+        cr.flesch_kincaid_grade_level,
+        cr.flesch_reading_ease,
+        cr.lensear_write,
+        cr.mcalpine_eflaw
+    ]
+    samplers = [
+        cr.compute_dcr, cr.compute_fkgl, cr.compute_fre, cr.compute_lw,
+        cr.compute_mer
+    ]
+
+    for text in texts[3:]:
+        scores = cr.compute_scores(text)
+
+        # Each formula parses the text on its own, as before TextDocument
+        sampled = [sampler(text) for sampler in samplers]
+        expected = [formula(text) for formula in formulas]
+        expected += [score for score, _ in sampled]
+        expected += [sample_scores for _, sample_scores in sampled]
+
+        assert len(scores) == len(expected)
+        for score, expected_score in zip(scores, expected):
+            np.testing.assert_allclose(score, expected_score)
@@ -0,0 +1,19 @@
+import generate_dictionary as gd
+
+def test_write_dictionary_merges_next_to_the_dictionary(tmp_path, monkeypatch):
+    monkeypatch.setattr(gd, "get_sequence", lambda word: "W ER1 D")
+
+    list_path = tmp_path / "words.txt"
+    list_path.write_text("WORD\n")
+    base_dict_path = tmp_path / "base.dict"
+    base_dict_path.write_text("ABC  EY1 B IY1 S IY1\n")
+    dict_path = tmp_path / "words.dict"
+
+    gd.write_dictionary(
+        str(list_path), str(dict_path), cache_path=None,
+        base_dict_path=str(base_dict_path)
+    )
+
+    merged_path = tmp_path / "words-merged.dict"
+    assert dict_path.read_text() == "WORD  W ER1 D\n"
+    assert merged_path.read_text() == "ABC  EY1 B IY1 S IY1\nWORD  W ER1 D\n"
@@ -0,0 +1,49 @@
+import merge_dictionaries as mg
+
+dict_one = (
+    "ABLE  EY1 B AH0 L\n"
+    "ABOUT  AH0 B AW1 T\n"
+    "ABOUT(1)  AH0 B AW2 T\n"
+    "READ  R EH1 D\n"
+    "TOMATO  T AH0 M EY1 T OW2\n"
+    "TOMATOES  T AH0 M EY1 T OW2 Z\n"
+)
+dict_two = (
+    "ABOUT  AH0 B AW1 T\n"
+    "READ  R IY1 D\n"
+    "TOMATO  T AH0 M AA1 T OW2\n"
+    "VOA  V IY1 OW1 EY1\n"
+    "ABLE  EY1 B AH0 L\n"
+    "ZEBRA  Z IY1 B R AH0\n"
+    "ZEBRA(1)  Z EH1 B R AH0\n"
+)
+
+# Written by the original merge_dictionaries.sh from the dictionaries above,
+# run with LC_ALL=C
+merged_by_script = (
+    "ABLE  EY1 B AH0 L\n"
+    "ABOUT  AH0 B AW1 T\n"
+    "ABOUT(1)  AH0 B AW2 T\n"
+    "READ  R EH1 D\n"
+    "READ(1)  R IY1 D\n"
+    "TOMATO  T AH0 M AA1 T OW2\n"
+    "TOMATO(1)  T AH0 M EY1 T OW2\n"
+    "TOMATOES  T AH0 M EY1 T OW2 Z\n"
+    "VOA  V IY1 OW1 EY1\n"
+    "ZEBRA  Z EH1 B R AH0\n"
+    "ZEBRA(1)  Z IY1 B R AH0\n"
+)
+
+def test_merge_dictionaries_matches_the_shell_script(tmp_path):
+    dict_one_path = tmp_path / "one.dict"
+    dict_one_path.write_text(dict_one)
+    dict_two_path = tmp_path / "two.dict"
+    dict_two_path.write_text(dict_two)
+    merged_path = tmp_path / "merged.dict"
+
+    word_count = mg.merge_dictionaries(
+        [str(dict_one_path), str(dict_two_path)], str(merged_path)
+    )
+
+    assert word_count == 7
+    assert merged_path.read_text() == merged_by_script
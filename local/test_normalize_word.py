@@ -0,0 +1,89 @@
+import json
+import normalize_word as nw
+import pytest
+import re
+
+from os.path import join
+
+wordlists_dir = "local/resources/wordlists"
+
+def enrich_entry(entry):
+    word, *fields = entry.split(",")
+    return [word, word + "-stem", word, word, word, word] + fields
+
+def test_build_detailed_list_appends_after_a_partial_line(
+    tmp_path, monkeypatch
+):
+    def interrupted_enrich_entry(entry):
+        if entry == "cherry":
+            raise KeyboardInterrupt
+        return enrich_entry(entry)
+
+    monkeypatch.setattr(nw, "enrich_entry", interrupted_enrich_entry)
+
+    list_path = tmp_path / "words.txt"
+    list_path.write_text("apple\nbanana\ncherry\n")
+    new_list_path = tmp_path / "words-detailed.csv"
+    checkpoint_path = tmp_path / "cache" / "words-checkpoint.jsonl"
+    checkpoint_path.parent.mkdir()
+    checkpoint_path.write_text(
+        json.dumps(["apple", enrich_entry("apple")]) + "\n"
+        + '["banana", ["ban'
+    )
+
+    with pytest.raises(KeyboardInterrupt):
+        nw.build_detailed_list(
+            str(list_path), str(new_list_path),
+            checkpoint_path=str(checkpoint_path)
+        )
+
+    assert nw.load_checkpoint(str(checkpoint_path)) == dict({
+        'apple': enrich_entry("apple"),
+        'banana': enrich_entry("banana")
+    })
+
+    monkeypatch.setattr(nw, "enrich_entry", enrich_entry)
+    new_count = nw.build_detailed_list(
+        str(list_path), str(new_list_path),
+        checkpoint_path=str(checkpoint_path)
+    )
+
+    assert new_count == 1
+    assert new_list_path.read_text().splitlines()[1:] == [
+        "apple,apple-stem,apple,apple,apple,apple",
+        "banana,banana-stem,banana,banana,banana,banana",
+        "cherry,cherry-stem,cherry,cherry,cherry,cherry",
+    ]
+
+def test_checkpoint_is_kept_out_of_the_word_lists():
+    assert nw.get_checkpoint_path(
+        "local/resources/wordlists/dale-chall-detailed.csv"
+    ) == "data/cache/dale-chall-detailed-checkpoint.jsonl"
+
+def remove_prefix_reference(word, prefixes, roots):
+    # remove_prefix as it was before the prefixes were compiled
+    original_word = word
+
+    for prefix in sorted(prefixes, key=len, reverse=True):
+        word, nsub = re.subn("^{}[\\-]?".format(prefix), "", word)
+        if nsub > 0 and word in roots:
+            return word
+
+    return original_word
+
+def test_remove_prefix_matches_the_regular_expressions():
+    roots_path = join(wordlists_dir, "dale-chall.txt")
+    words_path = join(wordlists_dir, "bnc-coca_master-list.csv")
+
+    with open(roots_path, mode = "r") as roots_f:
+        roots = set(line.strip().lower() for line in roots_f)
+    with open(words_path, mode = "r") as words_f:
+        words = [line.split(",")[0].strip().lower() for line in words_f]
+    words += [
+        "anti-war", "unhappy", "reunder", "overrun", "under-done", "co-op",
+        "superman", "ununhappy", "", "-", "up"
+    ]
+
+    for word in words:
+        assert nw.remove_prefix(word, nw.en_prefixes, roots) == \
+            remove_prefix_reference(word, nw.en_prefixes, roots), word
@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+pydub = pytest.importorskip("pydub")
+
+import segmentation as sg
+
+from pydub import silence
+
+def make_audio_segment(seed, frame_rate, channels, sample_width):
+    """
+    Noise in sections of random length and loudness, some of them silent
+    """
+    rng = np.random.default_rng(seed)
+    frame_count = int(rng.uniform(0.5, 4) * frame_rate)
+    amplitude = 100 if sample_width == 1 else 20000
+
+    envelope = np.zeros(frame_count)
+    position = 0
+    while position < frame_count:
+        section_len = int(rng.uniform(0.05, 1.0) * frame_rate)
+        envelope[position:position + section_len] = \
+            rng.choice([0.0, 0.002, 0.01, 0.3, 1.0])
+        position += section_len
+
+    samples = rng.standard_normal((frame_count, channels)) * amplitude
+    samples = (samples * envelope[:, None]).clip(-amplitude, amplitude)
+    samples = samples.astype(np.int8 if sample_width == 1 else np.int16)
+
+    return pydub.AudioSegment(
+        data=samples.tobytes(), sample_width=sample_width,
+        frame_rate=frame_rate, channels=channels
+    )
+
+audio_settings = [
+    (seed, frame_rate, channels, sample_width)
+    for seed, (frame_rate, channels, sample_width) in enumerate([
+        (8000, 1, 2), (16000, 1, 2), (44100, 2, 2), (11025, 1, 1),
+        (22050, 2, 1), (48000, 1, 2)
+    ])
+]
+
+@pytest.mark.parametrize(
+    "seed,frame_rate,channels,sample_width", audio_settings
+)
+@pytest.mark.parametrize("min_silence_len,seek_step", [(100, 1), (300, 10)])
+def test_segmentation_matches_pydub(
+    seed, frame_rate, channels, sample_width, min_silence_len, seek_step
+):
+    audio_segment = make_audio_segment(
+        seed, frame_rate, channels, sample_width
+    )
+    silence_thresh = audio_segment.dBFS - 30 if audio_segment.rms else -60
+
+    assert sg.detect_silence(
+        audio_segment, min_silence_len, silence_thresh, seek_step
+    ) == silence.detect_silence(
+        audio_segment, min_silence_len, silence_thresh, seek_step
+    )
+
+    nonsilent_ranges = silence.detect_nonsilent(
+        audio_segment, min_silence_len, silence_thresh, seek_step
+    )
+    assert sg.detect_nonsilent(
+        audio_segment, min_silence_len, silence_thresh, seek_step
+    ) == nonsilent_ranges
+
+    for keep_silence in [0, 100, True]:
+        chunks = list(sg.iter_chunks(
+            audio_segment, min_silence_len, silence_thresh, keep_silence,
+            seek_step
+        ))
+        expected_chunks = silence.split_on_silence(
+            audio_segment, min_silence_len, silence_thresh, keep_silence,
+            seek_step
+        )
+
+        assert [bytes(chunk.get_raw_data()) for chunk in chunks] == \
+            [chunk.raw_data for chunk in expected_chunks]
+        assert [[chunk.speech_start, chunk.speech_end] for chunk in chunks] \
+            == nonsilent_ranges
+
+def test_silent_and_empty_audio_match_pydub():
+    for audio_segment in [
+        pydub.AudioSegment.silent(duration=1500, frame_rate=8000),
+        pydub.AudioSegment.empty().set_frame_rate(8000)
+    ]:
+        assert sg.detect_nonsilent(audio_segment, 100, -60, 1) == \
+            silence.detect_nonsilent(audio_segment, 100, -60, 1)
@@ -0,0 +1,53 @@
+import syllables as sl
+
+def test_syllable_cache_syllabifies_the_original_word(monkeypatch):
+    syllabified = []
+
+    def syllabify_word(word):
+        syllabified.append(word)
+        return 2
+
+    monkeypatch.setattr(sl, "syllabify_word", syllabify_word)
+    cache = sl.SyllableCache()
+
+    assert cache.count("NASA") == 2
+    assert cache.count("nasa") == 2
+    assert syllabified == ["NASA"]
+    assert cache.get_stats() == dict({
+        'hits': 1, 'misses': 1, 'table_hits': 0, 'size': 1
+    })
+
+def test_syllable_cache_drops_the_least_recently_used_word(monkeypatch):
+    monkeypatch.setattr(sl, "syllabify_word", len)
+    cache = sl.SyllableCache(maxsize=2)
+
+    cache.count("a")
+    cache.count("bb")
+    cache.count("a")
+    cache.count("ccc")
+
+    assert list(cache.counts) == ["a", "ccc"]
+
+def test_build_syllable_table_skips_dictionary_comments(tmp_path, monkeypatch):
+    monkeypatch.setattr(sl, "syllabify_word", len)
+
+    list_path = tmp_path / "words.csv"
+    list_path.write_text("word,hw_class\nhouse,1\n")
+    dict_path = tmp_path / "words.dict"
+    dict_path.write_text(
+        ";;; # CMUdict  --  Major Version: 0.07\n"
+        "\n"
+        "TOMATO  T AH0 M EY1 T OW2\n"
+        "TOMATO(1)  T AH0 M AA1 T OW2\n"
+    )
+    table_path = tmp_path / "syllable-counts.bin"
+
+    word_count = sl.build_syllable_table(
+        str(table_path), [str(list_path)], [str(dict_path)]
+    )
+    syllable_table = sl.SyllableTable(str(table_path))
+
+    assert word_count == 2
+    assert syllable_table.get("house") == 5
+    assert syllable_table.get("tomato") == 6
+    assert syllable_table.get(";;;") is None
@@ -0,0 +1,123 @@
+import pytest
+import threading
+import time
+import types
+import wave
+
+sr = pytest.importorskip("speech_recognition")
+pytest.importorskip("pydub")
+
+import recognizers as rc
+import transcribe_speech as tsp
+
+class SlowFirstRecognizer(rc.FakeRecognizer):
+    """
+    Takes longer on the earlier utterances, so hypotheses are ready out of
+    order, and fails the first requests
+    """
+
+    def __init__(self, latencies, failures=0):
+        super().__init__()
+        self.latencies = latencies
+        self.failures = failures
+        self.lock = threading.Lock()
+
+    def recognize_batch(self, speech_data_list):
+        with self.lock:
+            if self.failures:
+                self.failures -= 1
+                raise sr.RequestError("service unavailable")
+
+        seconds = len(speech_data_list[0].frame_data) // 16000
+        time.sleep(self.latencies[seconds])
+
+        return [
+            self.get_hypothesis(speech_data)
+            for speech_data in speech_data_list
+        ]
+
+def write_wav_scp(tmp_path, utt_count):
+    wav_scp_path = tmp_path / "wav.scp"
+
+    with open(wav_scp_path, mode="w") as wav_scp_f:
+        for index in range(utt_count):
+            wav_path = tmp_path / f"utt{index}.wav"
+            with wave.open(str(wav_path), mode="wb") as wav_f:
+                wav_f.setnchannels(1)
+                wav_f.setsampwidth(2)
+                wav_f.setframerate(8000)
+                # Utterances differ in length, one more second each
+                wav_f.writeframes(bytes([index]) * 16000 * (index + 1))
+            wav_scp_f.write(f"utt{index} {wav_path}\n")
+
+    return wav_scp_path
+
+def get_expected_hypotheses(wav_scp_path):
+    expected = []
+
+    with open(wav_scp_path, mode="r") as wav_scp_f:
+        for entry in wav_scp_f:
+            utt_id,utt_loc = entry.strip().split(" ", maxsplit=1)
+            with sr.AudioFile(utt_loc) as source:
+                speech_data = sr.Recognizer().record(source)
+            hypothesis = rc.FakeRecognizer().get_hypothesis(speech_data)
+            expected.append(f"{utt_id} {hypothesis.upper()}")
+
+    return expected
+
+def test_transcribe_from_list_keeps_the_order_of_the_list(tmp_path):
+    wav_scp_path = write_wav_scp(tmp_path, 6)
+    sr_out_path = tmp_path / "hyp.txt"
+    backend = SlowFirstRecognizer([0.0, 0.3, 0.25, 0.2, 0.15, 0.1, 0.05])
+
+    tsp.transcribe_from_list(
+        str(wav_scp_path), str(sr_out_path), backend=backend, concurrency=4
+    )
+
+    assert sr_out_path.read_text().splitlines() == \
+        get_expected_hypotheses(wav_scp_path)
+
+def test_transcribe_from_list_retries_failed_requests(tmp_path, monkeypatch):
+    delays = []
+    monkeypatch.setattr(
+        tsp, "time", types.SimpleNamespace(sleep=delays.append)
+    )
+
+    wav_scp_path = write_wav_scp(tmp_path, 3)
+    sr_out_path = tmp_path / "hyp.txt"
+    backend = SlowFirstRecognizer([0.0] * 4, failures=2)
+
+    tsp.transcribe_from_list(
+        str(wav_scp_path), str(sr_out_path), backend=backend, concurrency=1,
+        retries=3, backoff=0.5
+    )
+
+    assert delays == [0.5, 1.0]
+    assert sr_out_path.read_text().splitlines() == \
+        get_expected_hypotheses(wav_scp_path)
+
+def test_transcribe_from_list_gives_up_after_the_last_retry(
+    tmp_path, monkeypatch
+):
+    delays = []
+    monkeypatch.setattr(
+        tsp, "time", types.SimpleNamespace(sleep=delays.append)
+    )
+
+    wav_scp_path = write_wav_scp(tmp_path, 1)
+    backend = SlowFirstRecognizer([0.0] * 2, failures=3)
+
+    with pytest.raises(sr.RequestError):
+        tsp.transcribe_from_list(
+            str(wav_scp_path), str(tmp_path / "hyp.txt"), backend=backend,
+            retries=2, backoff=0.5
+        )
+
+    assert delays == [0.5, 1.0]
+
+def test_recognizer_backends_must_implement_recognize():
+    class IncompleteRecognizer(rc.RecognizerBackend):
+        pass
+
+    with pytest.raises(TypeError):
+        IncompleteRecognizer()
@@ -1,22 +1,57 @@
-import csv
-import itertools
+import audioop
+import recognizers as rc
+import segmentation as sg
 import speech_recognition as sr
 import sys
+import time
 
-from os import listdir, mkdir
-from os.path import basename, dirname, isfile, join, splitext
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from os import mkdir
+from os.path import dirname, splitext
 
 from pydub import AudioSegment
-from pydub.silence import detect_nonsilent, split_on_silence
 
 # settings for voa
 KEEP_SILENCE=500
 MIN_SILENCE_LEN=1000
 SEEK_STEP=1
 
-def split_utterance(utt_id, utt_loc):
+def get_audio_data(chunk):
     """
-    This function splits an utterance based on silence regions via Pydub.
+    Prepare a speech chunk for the speech recognizer, without writing it to a
+    file. The audio data is the same as the one read from the exported chunk
+    with sr.AudioFile, i.e. 8-bit samples are unsigned and stereo audio is
+    mixed down to mono.
+
+    Parameters
+    ----------
+    chunk : segmentation.SpeechChunk
+    Speech chunk to be recognized
+
+    Returns
+    -------
+    speech_data : class 'speech_recognition.AudioData'
+    Audio data of the chunk
+
+    """
+    audio_segment = chunk.audio_segment
+    sample_width = audio_segment.sample_width
+
+    raw_data = bytes(chunk.get_raw_data())
+    if sample_width == 1:
+        raw_data = audioop.bias(raw_data, 1, 128)
+    if audio_segment.channels != 1:
+        raw_data = audioop.tomono(raw_data, sample_width, 1, 1)
+
+    return sr.AudioData(raw_data, audio_segment.frame_rate, sample_width)
+
+def split_utterance(utt_id, utt_loc, save_chunks=False):
+    """
+    This function splits an utterance based on silence regions, detected as in
+    Pydub (see segmentation.py).
     Criteria for determining when to split are defined by three variables:
 
     MIN_SILENCE_LEN - minimum silence duration
@@ -32,23 +67,29 @@ def split_utterance(utt_id, utt_loc):
     splitting
     utt_loc : string
     Path of the utterance to be split
+    save_chunks : bool
+    Whether the speech chunks are also exported to a chunks directory next to
+    the utterance. Default is False, which means the chunks are only kept in
+    memory
 
     Returns
     -------
-    chunk_locs : list
-    List of the locations of all speech chunks defined after segmentation
+    chunks : list
+    List of the IDs and segmentation.SpeechChunk of all speech chunks defined
+    after segmentation
 
     """
     utt_dir = dirname(utt_loc)
     utt_ext = splitext(utt_loc)[1]
     chunks_dir = utt_dir + "/chunks"
 
-    chunk_locs = list()
+    chunks = list()
 
-    try:
-        mkdir(chunks_dir)
-    except(FileExistsError):
-        pass
+    if save_chunks:
+        try:
+            mkdir(chunks_dir)
+        except(FileExistsError):
+            pass
 
     speech_data = getattr(AudioSegment, "from_" + utt_ext[1:])(utt_loc)
 
@@ -57,34 +98,154 @@ def split_utterance(utt_id, utt_loc):
     # to accommodate words ending in unvoiced fricatives (e.g., /s/)
     silence_thresh = speech_data.dBFS - 30
 
-    # Get timestamps of speech chunks to be used for filename generation
-    chunk_times = detect_nonsilent(
-        speech_data, 
-        min_silence_len=MIN_SILENCE_LEN,
-        silence_thresh=silence_thresh,
-        seek_step=SEEK_STEP
-    )
-
-    # Speech chunks defined are padded by silence dictated by KEEP_SILENCE
-    chunks = split_on_silence(
-        speech_data, 
+    # Speech chunks defined are padded by silence dictated by KEEP_SILENCE.
+    # Their timestamps, without the padding, are used for naming the chunks
+    speech_chunks = sg.iter_chunks(
+        speech_data,
         min_silence_len=MIN_SILENCE_LEN,
         silence_thresh=silence_thresh,
         keep_silence=KEEP_SILENCE,
         seek_step=SEEK_STEP
     )
 
-    for chunk_time, chunk in zip(chunk_times, chunks):
-        chunk_id = f"{utt_id}-{str(round(chunk_time[0]/10)).zfill(5)}-{str(round(chunk_time[1]/10)).zfill(5)}"
-        chunk_loc = f"{chunks_dir}/{chunk_id}{utt_ext}"
+    for chunk in speech_chunks:
+        chunk_id = f"{utt_id}-{str(round(chunk.speech_start/10)).zfill(5)}-{str(round(chunk.speech_end/10)).zfill(5)}"
 
-        chunk.export(chunk_loc, format=utt_ext[1:])
-        chunk_locs.append(chunk_loc)
+        if save_chunks:
+            chunk_loc = f"{chunks_dir}/{chunk_id}{utt_ext}"
+            chunk.export(chunk_loc, format=utt_ext[1:])
+        chunks.append((chunk_id, chunk))
 
-    return chunk_locs
+    return chunks
 
 
-def transcribe_from_list(wav_scp_file, sr_out_file, split=False):
+def submit_utterance(
+    executor,
+    utt_id,
+    utt_loc,
+    split,
+    save_chunks,
+    transcribe,
+    batch_size=1
+):
+    """
+    Queue the recognition of an utterance, or of each of its speech chunks
+
+    Parameters
+    ----------
+    executor : class 'concurrent.futures.ThreadPoolExecutor'
+    Pool of recognition threads
+    utt_id : string
+    Utterance ID
+    utt_loc : string
+    Path of the utterance
+    split : bool
+    Whether the utterance is split into speech chunks first
+    save_chunks : bool
+    Whether the speech chunks are also exported to files
+    transcribe : function
+    transcribe_batch, with the recognition settings
+    batch_size : int
+    Number of chunks given to the recognizer at a time. Default is 1
+
+    Returns
+    -------
+    futures : list
+    Hypotheses of the utterance, or of each batch of its chunks in order, as
+    concurrent.futures.Future objects
+
+    """
+    if split:
+        print(f"{sys.argv[0]}: Splitting utterance {utt_id} into chunks...")
+        chunks = split_utterance(utt_id, utt_loc, save_chunks)
+        print("Done.")
+
+        print(f"{sys.argv[0]}: Deriving hypothesis for utterance {utt_id}...")
+        futures = []
+        for batch_start in range(0, len(chunks), batch_size):
+            batch = chunks[batch_start:batch_start + batch_size]
+            futures.append(executor.submit(
+                transcribe,
+                [chunk_id for chunk_id, chunk in batch],
+                [get_audio_data(chunk) for chunk_id, chunk in batch]
+            ))
+    else:
+        print(f"{sys.argv[0]}: Deriving hypothesis for utterance {utt_id}...")
+        futures = [
+            executor.submit(transcribe_utterance, utt_id, utt_loc, transcribe)
+        ]
+
+    return futures
+
+def transcribe_batch(
+    utt_ids,
+    speech_data_list,
+    backend="google",
+    retries=0,
+    backoff=1.0
+):
+    """
+    Run a batch of audio data through a speech recognizer at once. Requests
+    that fail, e.g. because the recognition service can't be reached, are
+    tried again after a delay that doubles each time.
+
+    Parameters
+    ----------
+    utt_ids : list of strings
+    Utterance IDs, used to refer to the utterances to be recognized
+    speech_data_list : list of class 'speech_recognition.AudioData'
+    Audio data of each utterance
+    backend : string or recognizers.RecognizerBackend
+    Recognition backend, or its name in recognizers.backends. Default is
+    "google", i.e. the Google Web Speech API
+    retries : int
+    Number of times a failed request is tried again. Default is 0
+    backoff : float
+    Delay before the first new try, in seconds. Default is 1.0
+
+    Returns
+    -------
+    sr_outputs : list of strings
+    Speech recognizer's hypothesis of each utterance. An empty string is
+    returned for the utterances that weren't processed
+
+    """
+    backend = rc.get_backend(backend)
+
+    for attempt in range(retries + 1):
+        try:
+            hypotheses = backend.recognize_batch(speech_data_list)
+            break
+
+        except sr.RequestError as error:
+            if attempt == retries:
+                raise
+            delay = backoff * 2 ** attempt
+            print(
+                f"{sys.argv[0]}: Request for {', '.join(utt_ids)} failed "
+                f"({error}), trying again in {delay:.1f} s..."
+            )
+            time.sleep(delay)
+
+    sr_outputs = []
+    for utt_id, hypothesis in zip(utt_ids, hypotheses):
+        if hypothesis is None:
+            print(f"{sys.argv[0]}: Could not process {utt_id}.")
+            hypothesis = ""
+        sr_outputs.append(hypothesis.upper())
+
+    return sr_outputs
+
+def transcribe_from_list(
+    wav_scp_file,
+    sr_out_file,
+    split=False,
+    save_chunks=False,
+    backend="google",
+    concurrency=1,
+    retries=3,
+    backoff=1.0
+):
     """
     This function transcribes a set of recordings listed in a text file. The
     text file follows the format of Kaldi's wav.scp file. Each line corresponds
@@ -96,6 +257,12 @@ def transcribe_from_list(wav_scp_file, sr_out_file, split=False):
     The utterance_ID is specified to facilitate the calculation of the word
     error rate (WER) later on.
 
+    Up to concurrency utterances or chunks are recognized at the same time,
+    while the next utterances are being split. Hypotheses are still written in
+    the order of the list, and the chunks of an utterance are joined in order.
+    Backends that recognize several chunks at once, e.g. Kaldi, are given the
+    chunks of an utterance in batches.
+
     Parameters
     ----------
     wav_scp_file : string
@@ -110,54 +277,54 @@ def transcribe_from_list(wav_scp_file, sr_out_file, split=False):
 
     <utterance_ID> <recognizer_hypothesis>
 
+    split : bool
+    Whether the utterances are split into speech chunks, which are recognized
+    separately
+    save_chunks : bool
+    Whether the speech chunks are also exported to files, see split_utterance
+    backend : string or recognizers.RecognizerBackend
+    Recognition backend, or its name in recognizers.backends, e.g. "kaldi"
+    for offline recognition. Default is "google"
+    concurrency : int
+    Maximum number of requests to the recognizer at a time. Default is 1
+    retries, backoff
+    Handling of failed requests, see transcribe_batch
+
     Returns
     -------
     None
 
     """
-    original_stdout = sys.stdout
-
-    with open(sr_out_file, 'w') as sr_out_f:
-        with open(wav_scp_file, 'r') as wav_in_f:
-            for entry in wav_in_f:
-                utt_id,utt_loc = entry.strip().split(" ", maxsplit=1)
-
-                if split:
-                    sr_partials = list()
-                    print(
-                        f"{sys.argv[0]}: Splitting utterance "
-                        f"{utt_id} into chunks..."
-                    )
-                    chunk_locs = split_utterance(utt_id, utt_loc)
-                    print("Done.")
-
-                    print(
-                        f"{sys.argv[0]}: Deriving hypothesis "
-                        f"for utterance {utt_id}..."
-                    )
-                    for chunk_loc in chunk_locs:
-                        chunk_id = basename(chunk_loc).split(".")[0]
-
-                        sr_partial = transcribe_utterance(chunk_id, chunk_loc)
-                        sr_partials.append(sr_partial.upper() + ".")
-
-                    sr_output = " ".join(sr_partials)
-
-                else:
-                    print(
-                        f"{sys.argv[0]}: Deriving hypothesis "
-                        f"for utterance {utt_id}..."
-                    )
-                    sr_output = transcribe_utterance(utt_id, utt_loc)
-
-                sys.stdout = sr_out_f
-                print(f"{utt_id} {sr_output}")
-                sys.stdout = original_stdout
-                print("Done.")
-
-def transcribe_utterance(utt_id, utt_loc):
+    backend = rc.get_backend(backend)
+    transcribe = partial(
+        transcribe_batch, backend=backend, retries=retries, backoff=backoff
+    )
+
+    # Utterances waiting for their hypotheses to be written. Only a few are
+    # split ahead, so that their audio doesn't pile up in memory.
+    pending = deque()
+
+    with open(sr_out_file, 'w') as sr_out_f, \
+         open(wav_scp_file, 'r') as wav_in_f, \
+         ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for entry in wav_in_f:
+            utt_id,utt_loc = entry.strip().split(" ", maxsplit=1)
+
+            futures = submit_utterance(
+                executor, utt_id, utt_loc, split, save_chunks, transcribe,
+                backend.batch_size
+            )
+            pending.append((utt_id, futures))
+
+            while len(pending) > concurrency:
+                write_hypothesis(sr_out_f, *pending.popleft(), split)
+
+        while pending:
+            write_hypothesis(sr_out_f, *pending.popleft(), split)
+
+def transcribe_utterance(utt_id, utt_loc, transcribe=transcribe_batch):
     """
-    Run an utterance through the speech recognizer in the Google Web Speech API
+    Run an utterance through the speech recognizer
 
     Parameters
     ----------
@@ -165,6 +332,9 @@ def transcribe_utterance(utt_id, utt_loc):
     Utterance ID, used to refer to the utterance to be recognized
     utt_loc : string
     Path of the utterance to be recognized
+    transcribe : function
+    transcribe_batch, or a functools.partial of it with the recognition
+    settings. Default is transcribe_batch, which uses the Google Web Speech API
 
     Returns
     -------
@@ -173,7 +343,6 @@ def transcribe_utterance(utt_id, utt_loc):
     utterance wasn't processed
 
     """
-    sr.output = ""
     r = sr.Recognizer()
 
     speech_file = sr.AudioFile(utt_loc)
@@ -181,23 +350,56 @@ def transcribe_utterance(utt_id, utt_loc):
     with speech_file as source:
         speech_data = r.record(source)
 
-    try:
-        sr_output = r.recognize_google(speech_data).upper()
-        sr_output = sr_output.upper()
-        return sr_output
+    return transcribe([utt_id], [speech_data])[0]
+
+def write_hypothesis(sr_out_f, utt_id, futures, split):
+    """
+    Wait for the hypothesis of an utterance, or of all its chunks, and write
+    it to the output file
+
+    Parameters
+    ----------
+    sr_out_f : file object
+    Output file for recognizer hypotheses
+    utt_id : string
+    Utterance ID
+    futures : list
+    Hypotheses of the utterance or of its chunks, see submit_utterance
+    split : bool
+    Whether the utterance was split into speech chunks
+
+    Returns
+    -------
+    None
 
-    except sr.UnknownValueError:
-        print(f"{sys.argv[0]}: Could not process {utt_id}.")
-        return ""
+    """
+    if split:
+        sr_output = " ".join(
+            hypothesis + "." for future in futures
+            for hypothesis in future.result()
+        )
+    else:
+        sr_output = futures[0].result()
+
+    sr_out_f.write(f"{utt_id} {sr_output}\n")
+    sr_out_f.flush()
+    print(f"{sys.argv[0]}: Saved hypothesis for utterance {utt_id}.")
 
 def main():
     is_split = True     # files are split into chunks before transcription
+    is_save_chunks = False  # chunks are also saved as audio files
+    backend = "google"  # recognizer, e.g. "kaldi" or "sphinx" for offline
+                        # use, see recognizers.backends
+    concurrency = 4     # requests sent to the recognizer at a time
 
     wav_scp_file = ""   # list of utterances to be transcribed
                         # line format is <utterance_ID> <utterance_location>
     sr_out_file = ""    # output file for recognizer hypotheses
 
-    transcribe_from_list(wav_scp_file, sr_out_file, split=is_split)
+    transcribe_from_list(
+        wav_scp_file, sr_out_file, split=is_split, save_chunks=is_save_chunks,
+        backend=backend, concurrency=concurrency
+    )
 
 if __name__ == "__main__":
     main()